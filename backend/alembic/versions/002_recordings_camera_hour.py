@@ -0,0 +1,64 @@
+"""002 — recordings: composite (camera_id, recording_date, hour) unique index.
+
+Also creates the recordings table (and its hour column) on databases where it only
+ever existed through create_all / migrate_hour.py. Duplicate hour rows are collapsed
+to the newest one before the constraint is added; their files are left on disk.
+
+Revision ID: 002_recordings_camera_hour
+Revises: 001_initial
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision: str = "002_recordings_camera_hour"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONSTRAINT = "uq_recordings_camera_date_hour"
+
+
+def upgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+
+    if not insp.has_table("recordings"):
+        op.create_table(
+            "recordings",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True),
+            sa.Column("camera_id", UUID(as_uuid=True), sa.ForeignKey("cameras.id"), nullable=False),
+            sa.Column("recording_date", sa.Date, nullable=False),
+            sa.Column("hour", sa.SmallInteger, nullable=False, server_default="0"),
+            sa.Column("filename", sa.String, nullable=False),
+            sa.Column("duration_seconds", sa.Float, nullable=True),
+            sa.Column("size_bytes", sa.Integer, nullable=True),
+            sa.Column("status", sa.String, nullable=False, server_default="available"),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_recordings_recording_date", "recordings", ["recording_date"])
+    else:
+        if "hour" not in {c["name"] for c in insp.get_columns("recordings")}:
+            op.add_column("recordings", sa.Column("hour", sa.SmallInteger, nullable=False, server_default="0"))
+        if any(uc["name"] == CONSTRAINT for uc in insp.get_unique_constraints("recordings")):
+            return
+
+    # Keep the newest row of each (camera, date, hour); probes/previews cascade
+    op.execute(
+        """
+        DELETE FROM recordings r
+        USING recordings o
+        WHERE o.camera_id = r.camera_id
+          AND o.recording_date = r.recording_date
+          AND o.hour = r.hour
+          AND (COALESCE(o.created_at, 'epoch'), o.id) > (COALESCE(r.created_at, 'epoch'), r.id)
+        """
+    )
+    # The constraint's unique index doubles as the (camera_id, recording_date, hour) lookup index
+    op.create_unique_constraint(CONSTRAINT, "recordings", ["camera_id", "recording_date", "hour"])
+
+
+def downgrade() -> None:
+    op.drop_constraint(CONSTRAINT, "recordings", type_="unique")
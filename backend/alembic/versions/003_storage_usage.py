@@ -0,0 +1,83 @@
+"""003 — retention: per-camera policies, storage-usage index and its trigger.
+
+Also widens recordings.size_bytes to BIGINT: a Frigate hour directory of a
+high-bitrate camera can exceed 2 GiB.
+
+Revision ID: 003_storage_usage
+Revises: 002_recordings_camera_hour
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision: str = "003_storage_usage"
+down_revision: Union[str, None] = "002_recordings_camera_hour"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column("recordings", "size_bytes", type_=sa.BigInteger, existing_nullable=True)
+
+    op.create_table(
+        "retention_policies",
+        sa.Column("camera_id", UUID(as_uuid=True), sa.ForeignKey("cameras.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("max_age_days", sa.Integer, nullable=True),
+        sa.Column("max_bytes", sa.BigInteger, nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_table(
+        "storage_usage",
+        sa.Column("camera_id", UUID(as_uuid=True), sa.ForeignKey("cameras.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("recording_date", sa.Date, primary_key=True),
+        sa.Column("bytes", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("recordings", sa.Integer, nullable=False, server_default="0"),
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION recordings_storage_usage() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.filename NOT LIKE 'frigate:%' THEN
+                UPDATE storage_usage
+                   SET bytes = bytes - COALESCE(OLD.size_bytes, 0), recordings = recordings - 1
+                 WHERE camera_id = OLD.camera_id AND recording_date = OLD.recording_date;
+                DELETE FROM storage_usage
+                 WHERE camera_id = OLD.camera_id AND recording_date = OLD.recording_date AND recordings <= 0;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.filename NOT LIKE 'frigate:%' THEN
+                INSERT INTO storage_usage (camera_id, recording_date, bytes, recordings)
+                VALUES (NEW.camera_id, NEW.recording_date, COALESCE(NEW.size_bytes, 0), 1)
+                ON CONFLICT (camera_id, recording_date) DO UPDATE
+                   SET bytes = storage_usage.bytes + EXCLUDED.bytes,
+                       recordings = storage_usage.recordings + 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE TRIGGER trg_recordings_storage_usage
+        AFTER INSERT OR DELETE OR UPDATE OF camera_id, recording_date, size_bytes, filename ON recordings
+        FOR EACH ROW EXECUTE FUNCTION recordings_storage_usage();
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO storage_usage (camera_id, recording_date, bytes, recordings)
+        SELECT camera_id, recording_date, COALESCE(SUM(size_bytes), 0), COUNT(*)
+        FROM recordings
+        WHERE filename NOT LIKE 'frigate:%'
+        GROUP BY camera_id, recording_date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_recordings_storage_usage ON recordings")
+    op.execute("DROP FUNCTION IF EXISTS recordings_storage_usage()")
+    op.drop_table("storage_usage")
+    op.drop_table("retention_policies")
+    op.alter_column("recordings", "size_bytes", type_=sa.Integer, existing_nullable=True)
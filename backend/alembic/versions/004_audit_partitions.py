@@ -0,0 +1,97 @@
+"""004 — audit_log: range-partitioned by month on created_at.
+
+The existing table is renamed, a partitioned audit_log is created with one
+partition per month already in use (plus the next one and a DEFAULT catch-all),
+and the rows are copied over. The primary key becomes (id, created_at) because a
+partitioned table's unique keys must include the partition column.
+
+Revision ID: 004_audit_partitions
+Revises: 003_storage_usage
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "004_audit_partitions"
+down_revision: Union[str, None] = "003_storage_usage"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE audit_log RENAME TO audit_log_unpartitioned")
+    op.execute("ALTER TABLE audit_log_unpartitioned RENAME CONSTRAINT audit_log_pkey TO audit_log_unpartitioned_pkey")
+    op.execute(
+        "DROP INDEX IF EXISTS ix_audit_action, ix_audit_created, ix_audit_log_action, ix_audit_log_created_at"
+    )
+
+    op.execute(
+        """
+        CREATE TABLE audit_log (
+            id UUID NOT NULL,
+            site_id UUID REFERENCES sites (id),
+            actor_user_id UUID REFERENCES users (id),
+            action VARCHAR(64) NOT NULL,
+            resource_type VARCHAR(64),
+            resource_id VARCHAR(128),
+            ip VARCHAR(45),
+            user_agent TEXT,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            meta JSONB,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("CREATE INDEX ix_audit_log_action ON audit_log (action)")
+    op.execute("CREATE INDEX ix_audit_log_created_at ON audit_log (created_at)")
+    op.execute("CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT")
+
+    # Monthly partitions (UTC) from the oldest row through next month
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            m timestamptz := date_trunc('month', COALESCE(
+                (SELECT min(created_at) FROM audit_log_unpartitioned), now()) AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+            last timestamptz := date_trunc('month', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' + interval '1 month';
+        BEGIN
+            WHILE m <= last LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF audit_log FOR VALUES FROM (%L) TO (%L)',
+                    'audit_log_' || to_char(m AT TIME ZONE 'UTC', 'YYYY_MM'), m, m + interval '1 month'
+                );
+                m := m + interval '1 month';
+            END LOOP;
+        END
+        $$
+        """
+    )
+
+    op.execute("INSERT INTO audit_log SELECT * FROM audit_log_unpartitioned")
+    op.execute("DROP TABLE audit_log_unpartitioned")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE audit_log RENAME TO audit_log_partitioned")
+    op.execute("ALTER TABLE audit_log_partitioned RENAME CONSTRAINT audit_log_pkey TO audit_log_partitioned_pkey")
+    op.execute(
+        """
+        CREATE TABLE audit_log (
+            id UUID PRIMARY KEY,
+            site_id UUID REFERENCES sites (id),
+            actor_user_id UUID REFERENCES users (id),
+            action VARCHAR(64) NOT NULL,
+            resource_type VARCHAR(64),
+            resource_id VARCHAR(128),
+            ip VARCHAR(45),
+            user_agent TEXT,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            meta JSONB
+        )
+        """
+    )
+    op.execute("INSERT INTO audit_log SELECT * FROM audit_log_partitioned")
+    op.execute("DROP TABLE audit_log_partitioned")
+    op.execute("CREATE INDEX ix_audit_action ON audit_log (action)")
+    op.execute("CREATE INDEX ix_audit_created ON audit_log (created_at)")
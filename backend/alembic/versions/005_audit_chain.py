@@ -0,0 +1,57 @@
+"""005 — audit_log hash chain and Merkle checkpoints.
+
+Adds seq/prev_hash/hash to audit_log (existing rows stay unchained, seq NULL), the
+single-row chain head that writers lock, and the per-block checkpoint table.
+
+Revision ID: 005_audit_chain
+Revises: 004_audit_partitions
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "005_audit_chain"
+down_revision: Union[str, None] = "004_audit_partitions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("audit_log", sa.Column("seq", sa.BigInteger(), nullable=True))
+    op.add_column("audit_log", sa.Column("prev_hash", sa.String(64), nullable=True))
+    op.add_column("audit_log", sa.Column("hash", sa.String(64), nullable=True))
+    op.create_index("ix_audit_log_seq", "audit_log", ["seq"])
+
+    op.create_table(
+        "audit_chain_head",
+        sa.Column("id", sa.SmallInteger(), primary_key=True),
+        sa.Column("seq", sa.BigInteger(), nullable=False),
+        sa.Column("hash", sa.String(64), nullable=False),
+    )
+    op.execute("INSERT INTO audit_chain_head (id, seq, hash) VALUES (1, 0, repeat('0', 64))")
+
+    op.create_table(
+        "audit_checkpoints",
+        sa.Column("block_no", sa.Integer(), primary_key=True),
+        sa.Column("first_seq", sa.BigInteger(), nullable=False),
+        sa.Column("last_seq", sa.BigInteger(), nullable=False),
+        sa.Column("first_created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("merkle_root", sa.String(64), nullable=False),
+        sa.Column("last_hash", sa.String(64), nullable=False),
+        sa.Column("digest", sa.String(64), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_audit_checkpoints_last_created_at", "audit_checkpoints", ["last_created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_checkpoints_last_created_at", table_name="audit_checkpoints")
+    op.drop_table("audit_checkpoints")
+    op.drop_table("audit_chain_head")
+    op.drop_index("ix_audit_log_seq", table_name="audit_log")
+    op.drop_column("audit_log", "hash")
+    op.drop_column("audit_log", "prev_hash")
+    op.drop_column("audit_log", "seq")
@@ -0,0 +1,37 @@
+"""006 — audit_log indexes for filtered keyset paging and meta free-text search.
+
+Replaces the single-column action/created_at indexes with (created_at, id),
+(actor_user_id, created_at, id) and (action, created_at, id), and adds a GIN index
+over the string and numeric values of meta.
+
+Revision ID: 006_audit_query_indexes
+Revises: 005_audit_chain
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "006_audit_query_indexes"
+down_revision: Union[str, None] = "005_audit_chain"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+META_TSVECTOR = """jsonb_to_tsvector('simple'::regconfig, meta, '["string", "numeric"]'::jsonb)"""
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX ix_audit_log_created_id ON audit_log (created_at, id)")
+    op.execute("CREATE INDEX ix_audit_log_actor_created ON audit_log (actor_user_id, created_at, id)")
+    op.execute("CREATE INDEX ix_audit_log_action_created ON audit_log (action, created_at, id)")
+    op.execute(f"CREATE INDEX ix_audit_log_meta_fts ON audit_log USING gin ({META_TSVECTOR})")
+    op.execute("DROP INDEX IF EXISTS ix_audit_log_action, ix_audit_log_created_at")
+
+
+def downgrade() -> None:
+    op.execute("CREATE INDEX ix_audit_log_action ON audit_log (action)")
+    op.execute("CREATE INDEX ix_audit_log_created_at ON audit_log (created_at)")
+    op.execute(
+        "DROP INDEX IF EXISTS ix_audit_log_meta_fts, ix_audit_log_action_created, "
+        "ix_audit_log_actor_created, ix_audit_log_created_id"
+    )
@@ -0,0 +1,36 @@
+"""008 — frigate_sync_runs: single-flight record of Frigate event syncs.
+
+Revision ID: 008_frigate_sync_runs
+Revises: 007_revoked_tokens
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+revision: str = "008_frigate_sync_runs"
+down_revision: Union[str, None] = "007_revoked_tokens"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "frigate_sync_runs",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("trigger", sa.String(16), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("new_events", sa.Integer(), nullable=True),
+        sa.Column("joined", sa.Integer(), nullable=True),
+        sa.Column("skipped_ticks", sa.Integer(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_frigate_sync_runs_started_at", "frigate_sync_runs", ["started_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_frigate_sync_runs_started_at", table_name="frigate_sync_runs")
+    op.drop_table("frigate_sync_runs")
@@ -0,0 +1,61 @@
+"""009 — jobs: durable background job queue.
+
+Revision ID: 009_jobs
+Revises: 008_frigate_sync_runs
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+revision: str = "009_jobs"
+down_revision: Union[str, None] = "008_frigate_sync_runs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("queue", sa.String(32), nullable=False),
+        sa.Column("kind", sa.String(64), nullable=False),
+        sa.Column("key", sa.String(255), nullable=True),
+        sa.Column("payload", JSONB, nullable=True),
+        sa.Column("priority", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(16), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=True),
+        sa.Column("max_attempts", sa.Integer(), nullable=True),
+        sa.Column("run_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("worker", sa.String(128), nullable=True),
+        sa.Column("progress", JSONB, nullable=True),
+        sa.Column("result", JSONB, nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+    )
+    op.create_index(
+        "ix_jobs_claim", "jobs", ["queue", sa.text("priority DESC"), "run_at"],
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+    op.create_index(
+        "ix_jobs_running", "jobs", ["queue", "heartbeat_at"],
+        postgresql_where=sa.text("status = 'running'"),
+    )
+    op.create_index(
+        "ux_jobs_active_key", "jobs", ["kind", "key"], unique=True,
+        postgresql_where=sa.text("key IS NOT NULL AND status IN ('queued', 'running')"),
+    )
+    op.create_index("ix_jobs_finished_at", "jobs", ["finished_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_finished_at", table_name="jobs")
+    op.drop_index("ux_jobs_active_key", table_name="jobs")
+    op.drop_index("ix_jobs_running", table_name="jobs")
+    op.drop_index("ix_jobs_claim", table_name="jobs")
+    op.drop_table("jobs")
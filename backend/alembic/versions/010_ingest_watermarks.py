@@ -0,0 +1,28 @@
+"""010 — ingest_watermarks: resume point of the incremental Frigate recording scan.
+
+Revision ID: 010_ingest_watermarks
+Revises: 009_jobs
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "010_ingest_watermarks"
+down_revision: Union[str, None] = "009_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingest_watermarks",
+        sa.Column("source", sa.String(64), primary_key=True),
+        sa.Column("position", sa.String(255), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ingest_watermarks")
@@ -0,0 +1,52 @@
+"""011 — media_probes: cached ffprobe results for recordings and evidence exports.
+
+Revision ID: 011_media_probes
+Revises: 010_ingest_watermarks
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+revision: str = "011_media_probes"
+down_revision: Union[str, None] = "010_ingest_watermarks"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "media_probes",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("path", sa.String(1024), nullable=False, unique=True),
+        sa.Column(
+            "recording_id", UUID(as_uuid=True), sa.ForeignKey("recordings.id", ondelete="CASCADE"), nullable=True,
+        ),
+        sa.Column(
+            "evidence_id", UUID(as_uuid=True), sa.ForeignKey("evidence_exports.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("mtime", sa.Float(), nullable=False),
+        sa.Column("duration_seconds", sa.Float(), nullable=True),
+        sa.Column("container", sa.String(64), nullable=True),
+        sa.Column("video_codec", sa.String(32), nullable=True),
+        sa.Column("audio_codec", sa.String(32), nullable=True),
+        sa.Column("width", sa.Integer(), nullable=True),
+        sa.Column("height", sa.Integer(), nullable=True),
+        sa.Column("fps", sa.Float(), nullable=True),
+        sa.Column("bit_rate", sa.BigInteger(), nullable=True),
+        sa.Column("keyframes", JSONB, nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("probed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_media_probes_recording_id", "media_probes", ["recording_id"])
+    op.create_index("ix_media_probes_evidence_id", "media_probes", ["evidence_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_media_probes_evidence_id", table_name="media_probes")
+    op.drop_index("ix_media_probes_recording_id", table_name="media_probes")
+    op.drop_table("media_probes")
@@ -0,0 +1,37 @@
+"""012 — recording_previews: generated poster/sprite/VTT previews per recording.
+
+Revision ID: 012_recording_previews
+Revises: 011_media_probes
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+revision: str = "012_recording_previews"
+down_revision: Union[str, None] = "011_media_probes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recording_previews",
+        sa.Column(
+            "recording_id", UUID(as_uuid=True), sa.ForeignKey("recordings.id", ondelete="CASCADE"), primary_key=True,
+        ),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("interval_seconds", sa.Float(), nullable=False),
+        sa.Column("tiles", sa.Integer(), nullable=True),
+        sa.Column("columns", sa.Integer(), nullable=True),
+        sa.Column("tile_width", sa.Integer(), nullable=True),
+        sa.Column("tile_height", sa.Integer(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("generated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("recording_previews")
@@ -0,0 +1,37 @@
+"""013 — recording_transcodes: outcome of moving each recording to the cold tier.
+
+Revision ID: 013_recording_transcodes
+Revises: 012_recording_previews
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+revision: str = "013_recording_transcodes"
+down_revision: Union[str, None] = "012_recording_previews"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recording_transcodes",
+        sa.Column(
+            "recording_id", UUID(as_uuid=True), sa.ForeignKey("recordings.id", ondelete="CASCADE"), primary_key=True,
+        ),
+        sa.Column("codec", sa.String(32), nullable=False),
+        sa.Column("source_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("output_bytes", sa.BigInteger(), nullable=True),
+        sa.Column("media_seconds", sa.Float(), nullable=True),
+        sa.Column("cpu_seconds", sa.Float(), nullable=True),
+        sa.Column("wall_seconds", sa.Float(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("transcoded_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("recording_transcodes")
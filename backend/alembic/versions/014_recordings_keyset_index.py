@@ -0,0 +1,29 @@
+"""014 — recordings: (recording_date, hour, camera_id) index for unfiltered keyset paging.
+
+GET /api/recordings without camera_id orders by (recording_date, hour, camera_id)
+descending; the unique (camera_id, recording_date, hour) index cannot serve that
+order. The new index also covers date-only filters, so it replaces
+ix_recordings_recording_date.
+
+Revision ID: 014_recordings_keyset_index
+Revises: 013_recording_transcodes
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "014_recordings_keyset_index"
+down_revision: Union[str, None] = "013_recording_transcodes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX ix_recordings_date_hour_camera ON recordings (recording_date, hour, camera_id)")
+    op.execute("DROP INDEX IF EXISTS ix_recordings_recording_date")
+
+
+def downgrade() -> None:
+    op.execute("CREATE INDEX ix_recordings_recording_date ON recordings (recording_date)")
+    op.execute("DROP INDEX IF EXISTS ix_recordings_date_hour_camera")
@@ -0,0 +1,30 @@
+"""015 — media_probes: re-probe Frigate hours for their real keyframe times.
+
+Probes of Frigate segment directories stored the segment start offsets as keyframes.
+They are now read through the concat list HLS packaging uses; deleting the old rows
+makes the prober pick those hours up again.
+
+Revision ID: 015_frigate_probe_keyframes
+Revises: 014_recordings_keyset_index
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "015_frigate_probe_keyframes"
+down_revision: Union[str, None] = "014_recordings_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "DELETE FROM media_probes p USING recordings r "
+        "WHERE p.recording_id = r.id AND r.filename LIKE 'frigate:%'"
+    )
+
+
+def downgrade() -> None:
+    # Rows come back on the next probe pass, in the new format
+    pass
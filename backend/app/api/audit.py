@@ -1,40 +1,215 @@
 """Audit log endpoints (SuperAdmin only)."""
 
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
+import base64
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, text, tuple_
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.core.deps import CurrentUser
-from app.models.user import UserRole
-from app.models.audit import AuditLog
-from app.schemas.audit import AuditOut
+from app.database import ReadSessionLocal, get_db
+from app.core import replica
+from app.core.deps import CurrentUser, audit
+from app.core.replica import get_read_db
+from app.models.user import User, UserRole
+from app.models.audit import META_TSVECTOR, AuditLog
+from app.schemas.audit import AuditOut, AuditVerifyOut
+from app.services.audit_archive import search_archives
+from app.services.audit_chain import verify
 
 router = APIRouter(prefix="/api/audit", tags=["audit"])
 
+EXPORT_FIELDS = (
+    "id", "created_at", "site_id", "actor_user_id", "action", "resource_type",
+    "resource_id", "ip", "user_agent", "seq", "hash", "meta",
+)
+EXPORT_BATCH = 1000
+
+
+def _aware(dt: datetime | None) -> datetime | None:
+    return dt.replace(tzinfo=timezone.utc) if dt and dt.tzinfo is None else dt
+
+
+def _require_superadmin(user: User) -> None:
+    if user.role != UserRole.SUPERADMIN.value:
+        raise HTTPException(status_code=403, detail="SuperAdmin required")
+
+
+def _field(row, name: str):
+    return row.get(name) if isinstance(row, dict) else getattr(row, name)
+
+
+def _encode_cursor(row) -> str:
+    raw = f"{_field(row, 'created_at').isoformat()}|{_field(row, 'id')}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created, row_id = raw.split("|")
+        return _aware(datetime.fromisoformat(created)), uuid.UUID(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _query(db: Session, from_dt, to_dt, actor, action, q):
+    query = db.query(AuditLog)
+    if from_dt:
+        query = query.filter(AuditLog.created_at >= from_dt)
+    if to_dt:
+        query = query.filter(AuditLog.created_at <= to_dt)
+    if action:
+        query = query.filter(AuditLog.action == action)
+    if actor:
+        query = query.filter(AuditLog.actor_user_id == actor)
+    if q:
+        # Same expression as ix_audit_log_meta_fts so the GIN index is used
+        query = query.filter(META_TSVECTOR.op("@@")(func.websearch_to_tsquery(text("'simple'::regconfig"), q)))
+    return query
+
+
+def _newest_first(query, before: tuple[datetime, uuid.UUID] | None):
+    if before:
+        query = query.filter(tuple_(AuditLog.created_at, AuditLog.id) < tuple_(*before))
+    return query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+
 
 @router.get("", response_model=list[AuditOut])
 def list_audit(
     user: CurrentUser,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     from_dt: datetime | None = None,
     to_dt: datetime | None = None,
     actor: str | None = None,
     action: str | None = None,
+    q: str | None = Query(None, description="Free-text search over meta values"),
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0),
+    cursor: str | None = None,
+    offset: int = Query(0, ge=0, deprecated=True),
+    include_archived: bool = True,
 ):
-    if user.role != UserRole.SUPERADMIN.value:
-        raise HTTPException(status_code=403, detail="SuperAdmin required")
+    """
+    Newest first; past the rows still in audit_log, continues into archived months.
+    Pass the X-Next-Cursor response header back as ?cursor= for the next page.
+    """
+    _require_superadmin(user)
+    from_dt, to_dt = _aware(from_dt), _aware(to_dt)
+    before = _decode_cursor(cursor) if cursor else None
+
+    query = _query(db, from_dt, to_dt, actor, action, q)
+    page = _newest_first(query, before)
+    if offset:
+        page = page.offset(offset)
+    rows = page.limit(limit).all()
+
+    if len(rows) < limit and include_archived:
+        # Archived months are all older than the live table: skip what the live rows consumed
+        skip = max(0, offset - query.count()) if offset and not rows else 0
+        if rows:
+            before = (rows[-1].created_at, rows[-1].id)
+        archived = search_archives(
+            from_dt, to_dt, action, actor, q,
+            before=(before[0], str(before[1])) if before else None,
+        )
+        rows = rows + list(islice(archived, skip, skip + limit - len(rows)))
+
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
+    return rows
+
+
+def _export_rows(from_dt, to_dt, actor, action, q, include_archived, replica):
+    """All matching entries newest first, live rows then archives, without buffering."""
+    db = ReadSessionLocal()
+    db.info["replica"] = replica
+    try:
+        query = _newest_first(_query(db, from_dt, to_dt, actor, action, q), None)
+        yield from query.yield_per(EXPORT_BATCH)
+    finally:
+        db.close()
+    if include_archived:
+        yield from search_archives(from_dt, to_dt, action, actor, q)
 
-    q = db.query(AuditLog)
-    if from_dt:
-        q = q.filter(AuditLog.created_at >= from_dt)
-    if to_dt:
-        q = q.filter(AuditLog.created_at <= to_dt)
-    if action:
-        q = q.filter(AuditLog.action == action)
-    if actor:
-        q = q.filter(AuditLog.actor_user_id == actor)
 
-    return q.order_by(AuditLog.created_at.desc()).offset(offset).limit(limit).all()
+def _export_value(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _ndjson(rows):
+    for row in rows:
+        yield json.dumps({k: _export_value(_field(row, k)) for k in EXPORT_FIELDS}, separators=(",", ":")) + "\n"
+
+
+def _csv(rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        values = [_export_value(_field(row, k)) for k in EXPORT_FIELDS]
+        values[-1] = json.dumps(values[-1]) if values[-1] is not None else ""
+        writer.writerow(values)
+        if buf.tell() >= 64 * 1024:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+@router.get("/export")
+def export_audit(
+    user: CurrentUser,
+    request: Request,
+    db: Session = Depends(get_db),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    from_dt: datetime | None = None,
+    to_dt: datetime | None = None,
+    actor: str | None = None,
+    action: str | None = None,
+    q: str | None = Query(None, description="Free-text search over meta values"),
+    include_archived: bool = True,
+):
+    """Stream every matching entry (newest first) as NDJSON or CSV."""
+    _require_superadmin(user)
+    from_dt, to_dt = _aware(from_dt), _aware(to_dt)
+    audit(
+        db, action="audit_export", user=user, request=request,
+        meta={"format": format, "from": str(from_dt) if from_dt else None, "to": str(to_dt) if to_dt else None,
+              "actor": actor, "action": action, "q": q},
+    )
+    rows = _export_rows(from_dt, to_dt, actor, action, q, include_archived, replica.use_replica(request))
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    if format == "csv":
+        body, media_type = _csv(rows), "text/csv"
+    else:
+        body, media_type = _ndjson(rows), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="audit_{stamp}.{format}"'},
+    )
+
+
+@router.get("/verify", response_model=AuditVerifyOut)
+def verify_audit(
+    user: CurrentUser,
+    db: Session = Depends(get_db),
+    from_dt: datetime | None = None,
+    to_dt: datetime | None = None,
+    checkpoints_only: bool = Query(False, description="Check checkpoints and block boundaries only; ok is null"),
+):
+    """Check the hash chain over a time range; reports the first broken link."""
+    _require_superadmin(user)
+    return verify(db, _aware(from_dt), _aware(to_dt), checkpoints_only=checkpoints_only)
@@ -1,34 +1,77 @@
 """Auth endpoints — login, refresh, MFA enroll/verify."""
 
 from datetime import datetime, timezone
+from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.core import verify_password, create_access_token, create_refresh_token, decode_token
-from app.core.deps import get_current_user, audit, CurrentUser
-from app.core.mfa import enroll_totp, verify_totp, is_mfa_enabled
-from app.models.user import User
+from app.database import get_async_db, get_db
+from app.core import auth_cache, revocation, create_access_token, create_refresh_token, decode_token
+from app.core.deps import get_current_user, audit, CurrentUser, RequireSuperAdmin, oauth2_scheme
+from app.core.mfa import enroll_totp, verify_totp
+from app.core.passwords import PasswordPoolBusy, check_password_async, make_hash_async, needs_rehash
+from app.core.passwords import stats as password_stats
+from app.core.throttle import TokenBucketLimiter
+from app.config import get_settings
+from app.models.user import MfaTotp, User
 from app.schemas.auth import LoginResponse, MfaEnrollResponse, MfaVerifyRequest, MfaVerifyResponse
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
+settings = get_settings()
+
+_ip_limiter = TokenBucketLimiter(settings.login_ip_burst, settings.login_ip_per_minute)
+_account_limiter = TokenBucketLimiter(settings.login_account_burst, settings.login_account_per_minute)
+# A zero refill rate waits forever (inf); Retry-After still needs a finite number
+MAX_RETRY_AFTER_SECONDS = 3600
+
+
+def _throttle(request: Request, username: str) -> None:
+    """Per-IP and per-account token buckets, checked before any database or bcrypt work."""
+    ip = request.client.host if request.client else "unknown"
+    wait = max(_ip_limiter.take(ip), _account_limiter.take(username.strip().lower()))
+    if wait:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(max(1, int(min(wait, MAX_RETRY_AFTER_SECONDS) + 0.999)))},
+        )
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(
+async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    # async so a login waiting on bcrypt holds no threadpool thread
+    _throttle(request, form_data.username)
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    try:
+        valid = user is not None and await check_password_async(form_data.password, user.password_hash)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login temporarily unavailable",
+            headers={"Retry-After": "1"},
+        )
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account disabled")
 
-    mfa_required = is_mfa_enabled(db, user.id)
+    if needs_rehash(user.password_hash):
+        # Upgrade to the configured cost while the plaintext is at hand; best effort
+        try:
+            user.password_hash = await make_hash_async(form_data.password)
+        except PasswordPoolBusy:
+            pass
+
+    mfa_required = bool(await db.scalar(select(MfaTotp.enabled).where(MfaTotp.user_id == user.id)))
 
     token_data = {"sub": str(user.id), "role": user.role}
 
@@ -40,9 +83,10 @@ def login(
     refresh = create_refresh_token(token_data)
 
     user.last_login_at = datetime.now(timezone.utc)
-    db.commit()
+    await db.commit()
 
-    audit(db, action="login", user=user, request=request)
+    # submit() may block on a full queue; keep it off the event loop
+    await run_in_threadpool(audit, db, action="login", user=user, request=request)
 
     return LoginResponse(
         access_token=access,
@@ -52,8 +96,20 @@ def login(
 
 
 @router.post("/logout")
-def logout(request: Request, user: CurrentUser, db: Session = Depends(get_db)):
-    audit(db, action="logout", user=user, request=request)
+def logout(
+    request: Request,
+    user: CurrentUser,
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Session = Depends(get_db),
+    refresh_token: str | None = None,
+):
+    """Revoke the presented access token and, if given, the caller's refresh token."""
+    revoked = revocation.revoke(db, decode_token(token) or {}, reason="logout")
+    if refresh_token:
+        payload = decode_token(refresh_token)
+        if payload and payload.get("type") == "refresh" and payload.get("sub") == str(user.id):
+            revocation.revoke(db, payload, reason="logout")
+    audit(db, action="logout", user=user, request=request, meta={"revoked": revoked})
     return {"detail": "Logged out"}
 
 
@@ -65,6 +121,8 @@ def refresh_token(
     payload = decode_token(refresh_token)
     if not payload or payload.get("type") != "refresh":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    if revocation.is_revoked(payload.get("jti")):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
 
     user_id = payload.get("sub")
     user = db.query(User).filter(User.id == user_id).first()
@@ -81,7 +139,7 @@ def refresh_token(
 @router.post("/mfa/totp/enroll", response_model=MfaEnrollResponse)
 def mfa_enroll(user: CurrentUser, db: Session = Depends(get_db), request: Request = None):
     result = enroll_totp(db, user)
-    audit(db, action="mfa_enroll", user=user, request=request)
+    audit(db, action="mfa_enroll", user=user, request=request, durable=True)
     return MfaEnrollResponse(**result)
 
 
@@ -106,3 +164,13 @@ def mfa_verify(
         access_token=create_access_token(token_data),
         refresh_token=create_refresh_token(token_data),
     )
+
+
+@router.get("/cache-stats", dependencies=[RequireSuperAdmin])
+def auth_cache_stats():
+    """Hit rates of this worker's user and token caches, and password pool/throttle state."""
+    return {
+        **auth_cache.stats(),
+        "passwords": password_stats(),
+        "throttle": {"ip": _ip_limiter.stats(), "account": _account_limiter.stats()},
+    }
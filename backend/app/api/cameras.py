@@ -1,21 +1,52 @@
 """Camera CRUD endpoints."""
 
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.core.deps import CurrentUser, audit
+from app.database import get_async_db, get_db
+from app.core.deps import AsyncCurrentUser, CurrentUser, audit
 from app.models.user import UserRole
 from app.models.camera import Camera
-from app.schemas.camera import CameraCreate, CameraUpdate, CameraOut
+from app.schemas.camera import CameraCreate, CameraUpdate, CameraOut, TimelineOut
+from app.services.timeline import camera_timeline
 
 router = APIRouter(prefix="/api/cameras", tags=["cameras"])
 
+MAX_TIMELINE_DAYS = 62
+
 
 @router.get("", response_model=list[CameraOut])
-def list_cameras(user: CurrentUser, db: Session = Depends(get_db)):
-    return db.query(Camera).all()
+async def list_cameras(user: AsyncCurrentUser, db: AsyncSession = Depends(get_async_db)):
+    return (await db.scalars(select(Camera))).all()
+
+
+@router.get("/{camera_id}/timeline", response_model=TimelineOut)
+def get_timeline(
+    camera_id: uuid.UUID,
+    user: CurrentUser,
+    db: Session = Depends(get_db),
+    from_date: date = Query(...),
+    to_date: date | None = None,
+):
+    """Recorded-hour bitmaps and per-label event intervals for each day in the range."""
+    to_date = to_date or from_date
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="to_date must not be before from_date")
+    if (to_date - from_date).days >= MAX_TIMELINE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range too large (max {MAX_TIMELINE_DAYS} days)")
+    if not db.query(Camera.id).filter(Camera.id == camera_id).first():
+        raise HTTPException(status_code=404, detail="Camera not found")
+    return TimelineOut(
+        camera_id=camera_id,
+        from_date=from_date,
+        to_date=to_date,
+        days=camera_timeline(db, camera_id, from_date, to_date),
+    )
 
 
 @router.post("", response_model=CameraOut, status_code=status.HTTP_201_CREATED)
@@ -5,24 +5,40 @@ from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import httpx
 
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.config import get_settings
-from app.core.deps import CurrentUser, audit
+from app.core import metrics
+from app.core.deps import AsyncCurrentUser, CurrentUser, audit
+from app.core.replica import get_async_read_db
 from app.models.event import Event
-from app.schemas.event import EventOut
-from app.services.frigate_sync import sync_events_from_frigate
+from app.schemas.event import (
+    EventOut, EventRecordingOut, EventRecordingLookup, EventSyncOut, SyncRunOut, SyncStatusOut,
+)
+from app.services import frigate_sync
+from app.services import seek_index
 
 router = APIRouter(prefix="/api/events", tags=["events"])
 settings = get_settings()
 
+MAX_LOOKUP_EVENTS = 500
+
+
+def _seek(db: Session, ev: Event) -> EventRecordingOut:
+    hit = seek_index.resolve(db, ev.camera_id, ev.start_time)
+    if hit is None:
+        return EventRecordingOut(event_id=ev.id)
+    return EventRecordingOut(event_id=ev.id, recording_id=hit[0], offset_seconds=round(hit[1], 3))
+
 
 @router.get("", response_model=list[EventOut])
-def list_events(
-    user: CurrentUser,
-    db: Session = Depends(get_db),
+async def list_events(
+    user: AsyncCurrentUser,
+    db: AsyncSession = Depends(get_async_read_db),
     camera_id: uuid.UUID | None = None,
     label: str | None = None,
     has_clip: bool | None = None,
@@ -32,48 +48,85 @@ def list_events(
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
 ):
-    q = db.query(Event)
+    q = select(Event)
     if camera_id:
-        q = q.filter(Event.camera_id == camera_id)
+        q = q.where(Event.camera_id == camera_id)
     if label:
-        q = q.filter(Event.label == label)
+        q = q.where(Event.label == label)
     if has_clip is not None:
-        q = q.filter(Event.has_clip == has_clip)
+        q = q.where(Event.has_clip == has_clip)
     if has_snapshot is not None:
-        q = q.filter(Event.has_snapshot == has_snapshot)
+        q = q.where(Event.has_snapshot == has_snapshot)
     if from_dt:
-        q = q.filter(Event.start_time >= from_dt)
+        q = q.where(Event.start_time >= from_dt)
     if to_dt:
-        q = q.filter(Event.start_time <= to_dt)
+        q = q.where(Event.start_time <= to_dt)
     q = q.order_by(Event.start_time.desc())
-    return q.offset(offset).limit(limit).all()
+    return (await db.scalars(q.offset(offset).limit(limit))).all()
+
+
+async def _get_event(db: AsyncSession, event_id: uuid.UUID) -> Event:
+    ev = await db.get(Event, event_id)
+    if not ev:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return ev
+
+
+@router.post("/recordings", response_model=list[EventRecordingOut])
+def resolve_event_recordings(body: EventRecordingLookup, user: CurrentUser, db: Session = Depends(get_db)):
+    """Batch version of GET /{event_id}/recording for event lists."""
+    if len(body.event_ids) > MAX_LOOKUP_EVENTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_LOOKUP_EVENTS} events per lookup")
+    events = db.query(Event).filter(Event.id.in_(body.event_ids)).all()
+    return [_seek(db, ev) for ev in events]
 
 
 @router.get("/{event_id}", response_model=EventOut)
-def get_event(event_id: uuid.UUID, user: CurrentUser, db: Session = Depends(get_db)):
+async def get_event(event_id: uuid.UUID, user: AsyncCurrentUser, db: AsyncSession = Depends(get_async_read_db)):
+    return await _get_event(db, event_id)
+
+
+@router.get("/{event_id}/recording", response_model=EventRecordingOut)
+def get_event_recording(event_id: uuid.UUID, user: CurrentUser, db: Session = Depends(get_db)):
+    """Recording covering the event start and the offset to seek to."""
     ev = db.query(Event).filter(Event.id == event_id).first()
     if not ev:
         raise HTTPException(status_code=404, detail="Event not found")
-    return ev
+    out = _seek(db, ev)
+    if out.recording_id is None:
+        raise HTTPException(status_code=404, detail="No recording covers this event")
+    return out
 
 
-@router.post("/sync")
+@router.post("/sync", response_model=EventSyncOut)
 def trigger_sync(user: CurrentUser, request: Request, db: Session = Depends(get_db)):
-    """Manually trigger a sync from Frigate API."""
-    count = sync_events_from_frigate(db)
-    audit(db, action="events_sync", user=user, request=request, meta={"synced": count})
-    return {"synced": count}
+    """Manually trigger a sync from Frigate API; joins the sync already running, if any."""
+    try:
+        run, shared = frigate_sync.run_sync("manual")
+    except frigate_sync.SyncBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    count = run.new_events or 0
+    audit(db, action="events_sync", user=user, request=request,
+          meta={"synced": count, "run_id": str(run.id), "shared": shared})
+    return EventSyncOut(synced=count, shared=shared, run=SyncRunOut.model_validate(run))
+
+
+@router.get("/sync/status", response_model=SyncStatusOut)
+def sync_status(user: CurrentUser, db: Session = Depends(get_db)):
+    """Recent Frigate sync runs, with the callers each absorbed."""
+    return SyncStatusOut(**frigate_sync.flight_stats(), recent=frigate_sync.recent_runs(db))
 
 
 @router.get("/{event_id}/snapshot")
-async def proxy_snapshot(event_id: uuid.UUID, user: CurrentUser, db: Session = Depends(get_db)):
+async def proxy_snapshot(event_id: uuid.UUID, user: AsyncCurrentUser, db: AsyncSession = Depends(get_async_db)):
     """Proxy snapshot from Frigate so frontend never talks to Frigate directly."""
-    ev = db.query(Event).filter(Event.id == event_id).first()
-    if not ev:
-        raise HTTPException(status_code=404, detail="Event not found")
+    ev = await _get_event(db, event_id)
+    await db.close()  # don't hold a pooled connection while Frigate responds
 
     url = f"{settings.frigate_base_url}/api/events/{ev.frigate_event_id}/snapshot.jpg"
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=metrics.AsyncFrigateTransport()) as client:
         resp = await client.get(url, timeout=15)
     if resp.status_code != 200:
         raise HTTPException(status_code=502, detail="Frigate snapshot unavailable")
@@ -84,14 +137,13 @@ async def proxy_snapshot(event_id: uuid.UUID, user: CurrentUser, db: Session = D
 
 
 @router.get("/{event_id}/clip")
-async def proxy_clip(event_id: uuid.UUID, user: CurrentUser, db: Session = Depends(get_db)):
+async def proxy_clip(event_id: uuid.UUID, user: AsyncCurrentUser, db: AsyncSession = Depends(get_async_db)):
     """Proxy clip mp4 from Frigate."""
-    ev = db.query(Event).filter(Event.id == event_id).first()
-    if not ev:
-        raise HTTPException(status_code=404, detail="Event not found")
+    ev = await _get_event(db, event_id)
+    await db.close()  # don't hold a pooled connection while Frigate responds
 
     url = f"{settings.frigate_base_url}/api/events/{ev.frigate_event_id}/clip.mp4"
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=metrics.AsyncFrigateTransport()) as client:
         resp = await client.get(url, timeout=60)
     if resp.status_code != 200:
         raise HTTPException(status_code=502, detail="Frigate clip unavailable")
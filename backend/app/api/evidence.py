@@ -2,23 +2,29 @@
 
 import uuid
 import hashlib
-import json
 import os
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import httpx
 
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.config import get_settings
-from app.core.deps import CurrentUser, audit
+from app.core import metrics
+from app.core.deps import AsyncCurrentUser, CurrentUser, audit
 from app.models.user import UserRole
 from app.models.event import Event
 from app.models.evidence import EvidenceExport
 from app.models.camera import Camera
+from app.models.media import MediaProbe
 from app.schemas.evidence import EvidenceExportRequest, EvidenceOut, EvidenceManifest
+from app.schemas.job import JobOut
+from app.schemas.recording import MediaProbeOut
+from app.services import evidence_export
 
 router = APIRouter(prefix="/api/evidence", tags=["evidence"])
 settings = get_settings()
@@ -32,63 +38,37 @@ def _require_admin(user):
 @router.post("/export", response_model=EvidenceOut, status_code=201)
 async def export_evidence(
     body: EvidenceExportRequest,
-    user: CurrentUser,
+    user: AsyncCurrentUser,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     _require_admin(user)
 
-    ev = db.query(Event).filter(Event.id == body.event_id).first()
+    ev = await db.get(Event, body.event_id)
     if not ev:
         raise HTTPException(status_code=404, detail="Event not found")
+    camera = await db.get(Camera, ev.camera_id)
+    await db.commit()  # release the connection during the download
 
     # Download clip from Frigate
-    url = f"{settings.frigate_base_url}/api/events/{ev.frigate_event_id}/clip.mp4"
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, timeout=120)
+    async with httpx.AsyncClient(transport=metrics.AsyncFrigateTransport()) as client:
+        resp = await client.get(evidence_export.clip_url(ev), timeout=120)
     if resp.status_code != 200:
         raise HTTPException(status_code=502, detail="Cannot download clip from Frigate")
 
     clip_data = resp.content
 
-    # Compute SHA-256
-    sha256 = hashlib.sha256(clip_data).hexdigest()
-
-    # Save to evidence vault
+    # Compute SHA-256 and save to evidence vault, off the event loop
+    sha256 = await run_in_threadpool(lambda: hashlib.sha256(clip_data).hexdigest())
     evidence_id = uuid.uuid4()
-    day_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    export_dir = os.path.join(settings.evidence_dir, "exports", day_str)
-    os.makedirs(export_dir, exist_ok=True)
-
-    clip_path = os.path.join(export_dir, f"export_{evidence_id}.mp4")
-    hash_path = os.path.join(export_dir, f"export_{evidence_id}.sha256")
-
-    with open(clip_path, "wb") as f:
-        f.write(clip_data)
-    with open(hash_path, "w") as f:
-        f.write(sha256)
-
-    # Get camera info for manifest
-    camera = db.query(Camera).filter(Camera.id == ev.camera_id).first()
+    export_dir = evidence_export.export_dir()
+    clip_path = await run_in_threadpool(evidence_export.write_export, export_dir, evidence_id, clip_data, sha256)
 
     # Create manifest
-    manifest = {
-        "evidence_id": str(evidence_id),
-        "event_id": str(ev.id),
-        "frigate_event_id": ev.frigate_event_id,
-        "sha256": sha256,
-        "size_bytes": len(clip_data),
-        "content_type": "video/mp4",
-        "requested_by_email": user.email,
-        "requested_at": datetime.now(timezone.utc).isoformat(),
-        "reason": body.reason,
-        "camera_name": camera.name if camera else None,
-        "event_label": ev.label,
-        "event_start_time": ev.start_time.isoformat() if ev.start_time else None,
-    }
-    manifest_path = os.path.join(export_dir, f"manifest_{evidence_id}.json")
-    with open(manifest_path, "w") as f:
-        json.dump(manifest, f, indent=2)
+    manifest = evidence_export.build_manifest(
+        evidence_id, ev, camera, sha256, len(clip_data), user.email, body.reason,
+    )
+    await run_in_threadpool(evidence_export.write_manifest, export_dir, evidence_id, manifest)
 
     # Record in DB
     export_record = EvidenceExport(
@@ -102,10 +82,12 @@ async def export_evidence(
         reason=body.reason,
     )
     db.add(export_record)
-    db.commit()
-    db.refresh(export_record)
+    await db.commit()
+    await db.refresh(export_record)
 
-    audit(
+    # Durable: waits for the audit writer, so not on the event loop
+    await run_in_threadpool(
+        audit,
         db,
         action="evidence_export",
         user=user,
@@ -113,11 +95,30 @@ async def export_evidence(
         resource_type="evidence",
         resource_id=str(evidence_id),
         meta={"event_id": str(ev.id), "sha256": sha256},
+        durable=True,
     )
 
     return export_record
 
 
+@router.post("/export/jobs", response_model=JobOut, status_code=202)
+def queue_evidence_export(
+    body: EvidenceExportRequest,
+    user: CurrentUser,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """Export in worker.py instead of inline; poll GET /api/jobs/{job_id}, whose result has the evidence_id."""
+    _require_admin(user)
+    if db.get(Event, body.event_id) is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    job, created = evidence_export.enqueue_export(db, body.event_id, user, body.reason)
+    if created:
+        audit(db, action="evidence_export_queued", user=user, request=request,
+              meta={"event_id": str(body.event_id), "job_id": str(job.id)})
+    return job
+
+
 @router.get("/{evidence_id}/download")
 def download_evidence(
     evidence_id: uuid.UUID,
@@ -145,6 +146,7 @@ def download_evidence(
         request=request,
         resource_type="evidence",
         resource_id=str(evidence_id),
+        durable=True,
     )
 
     return FileResponse(
@@ -187,6 +189,15 @@ def get_manifest(
     )
 
 
+@router.get("/{evidence_id}/media", response_model=MediaProbeOut)
+def get_evidence_media(evidence_id: uuid.UUID, user: CurrentUser, db: Session = Depends(get_db)):
+    _require_admin(user)
+    probe = db.query(MediaProbe).filter(MediaProbe.evidence_id == evidence_id).first()
+    if not probe:
+        raise HTTPException(status_code=404, detail="Media metadata not available yet")
+    return probe
+
+
 @router.get("", response_model=list[EvidenceOut])
 def list_evidence(user: CurrentUser, db: Session = Depends(get_db)):
     _require_admin(user)
@@ -0,0 +1,74 @@
+"""Background job endpoints — queue depth/latency, job status and manual retry."""
+
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.core.deps import CurrentUser, audit
+from app.models.job import Job
+from app.models.user import UserRole
+from app.schemas.job import JobOut, QueueStatsOut
+from app.services import job_queue
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def _require_admin(user):
+    if user.role not in [UserRole.SUPERADMIN.value, UserRole.ADMIN.value]:
+        raise HTTPException(status_code=403, detail="Admin required")
+
+
+@router.get("", response_model=list[JobOut])
+def list_jobs(
+    user: CurrentUser,
+    db: Session = Depends(get_db),
+    queue: str | None = None,
+    kind: str | None = None,
+    status: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    _require_admin(user)
+    q = db.query(Job)
+    if queue:
+        q = q.filter(Job.queue == queue)
+    if kind:
+        q = q.filter(Job.kind == kind)
+    if status:
+        q = q.filter(Job.status == status)
+    return q.order_by(Job.created_at.desc()).limit(limit).all()
+
+
+@router.get("/stats", response_model=list[QueueStatsOut])
+def queue_stats(user: CurrentUser, db: Session = Depends(get_db)):
+    """Per queue: jobs ready/delayed/running, last-hour throughput and wait/run time percentiles."""
+    _require_admin(user)
+    return job_queue.stats(db)
+
+
+@router.get("/{job_id}", response_model=JobOut)
+def get_job(job_id: uuid.UUID, user: CurrentUser, db: Session = Depends(get_db)):
+    _require_admin(user)
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/{job_id}/retry", response_model=JobOut)
+def retry_job(job_id: uuid.UUID, user: CurrentUser, request: Request, db: Session = Depends(get_db)):
+    """Requeue a failed job with a fresh attempt budget."""
+    _require_admin(user)
+    if db.get(Job, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        job = job_queue.retry(db, job_id)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Another job with the same key is already active")
+    if job is None:
+        raise HTTPException(status_code=409, detail="Only failed jobs can be retried")
+    audit(db, action="job_retry", user=user, request=request, meta={"job_id": str(job_id), "kind": job.kind})
+    return job
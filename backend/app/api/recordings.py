@@ -1,21 +1,32 @@
-"""Recordings endpoints — list, upload, play, and simulate daily recordings."""
+"""Recordings endpoints — list, upload, play (file or HLS), ingest from Frigate, and simulate daily recordings."""
 
+import base64
 import os
+import subprocess
 import uuid
-import shutil
 from datetime import date, datetime, timezone, timedelta
+from zoneinfo import ZoneInfo
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File, Form
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_async_db, get_db
+from app.core.replica import get_async_read_db
 from app.config import get_settings
-from app.core.deps import CurrentUser, audit
+from app.core.deps import AsyncCurrentUser, CurrentUser, audit, user_for_token
 from app.models.recording import Recording
 from app.models.camera import Camera
+from app.models.media import MediaProbe
 from app.models.user import UserRole
-from app.schemas.recording import RecordingOut
+from app.schemas.recording import ColdTierStats, RecordingOut, RecordingJobOut, MediaProbeOut
+from app.services import cache_bus, clips, cold_tier, hls, previews, recording_jobs, seek_index, timeline
+from app.services.frigate_ingest import ingest_frigate_recordings
+from app.services.recording_store import recording_path, segment_files
 
 router = APIRouter(prefix="/api/recordings", tags=["recordings"])
 
@@ -26,17 +37,78 @@ def _require_admin(user):
         raise HTTPException(status_code=403, detail="Admin required")
 settings = get_settings()
 
-RECORDINGS_DIR = os.environ.get("RECORDINGS_DIR", "/recordings")
+RECORDINGS_DIR = settings.recordings_dir
+HLS_PLAYLIST_TYPE = "application/vnd.apple.mpegurl"
 
 
 def _ensure_dir():
     os.makedirs(RECORDINGS_DIR, exist_ok=True)
 
 
+def _stream_segments(dirpath: str):
+    """Concatenate a Frigate segment directory with stream copy (no re-encode)."""
+    listing = "".join(f"file '{p}'\n" for p in segment_files(dirpath))
+    proc = subprocess.Popen(
+        [
+            "ffmpeg", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-protocol_whitelist", "file,pipe", "-i", "pipe:0",
+            "-c", "copy", "-movflags", "frag_keyframe+empty_moov", "-f", "mp4", "pipe:1",
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        proc.stdin.write(listing.encode())
+        proc.stdin.close()
+        while chunk := proc.stdout.read(64 * 1024):
+            yield chunk
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def _media_user(request: Request, token: str | None, db: Session):
+    """Resolve the user from the Authorization header or a ?token= query parameter.
+
+    Both go through the same checks as every other endpoint: signature and type,
+    revocation (logout) and an active account.
+    """
+    auth_header = request.headers.get("authorization", "")
+    if auth_header.startswith("Bearer "):
+        token = auth_header[7:]
+    # Otherwise the query string token (for <video> elements)
+    if not token:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    return user_for_token(token, db)
+
+
+def _get_recording_or_404(db: Session, recording_id: uuid.UUID) -> Recording:
+    rec = db.query(Recording).filter(Recording.id == recording_id).first()
+    if not rec:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    return rec
+
+
+def _encode_cursor(rec: Recording) -> str:
+    raw = f"{rec.recording_date.isoformat()}|{rec.hour}|{rec.camera_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[date, int, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        d, h, cam = raw.split("|")
+        return date.fromisoformat(d), int(h), uuid.UUID(cam)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("", response_model=list[RecordingOut])
-def list_recordings(
-    user: CurrentUser,
-    db: Session = Depends(get_db),
+async def list_recordings(
+    user: AsyncCurrentUser,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
     camera_id: uuid.UUID | None = None,
     recording_date: date | None = None,
     from_date: date | None = None,
@@ -44,24 +116,141 @@ def list_recordings(
     hour_from: int | None = Query(None, ge=0, le=23),
     hour_to: int | None = Query(None, ge=0, le=23),
     limit: int = Query(200, ge=1, le=500),
-    offset: int = Query(0, ge=0),
+    cursor: str | None = None,
+    offset: int = Query(0, ge=0, deprecated=True),
 ):
-    """List recordings with optional filters by camera, date range, and hour range."""
-    q = db.query(Recording)
+    """
+    List recordings with optional filters by camera, date range, and hour range.
+    Newest first; pass the X-Next-Cursor response header back as ?cursor= for the next page.
+    """
+    q = select(Recording)
     if camera_id:
-        q = q.filter(Recording.camera_id == camera_id)
+        q = q.where(Recording.camera_id == camera_id)
     if recording_date:
-        q = q.filter(Recording.recording_date == recording_date)
+        q = q.where(Recording.recording_date == recording_date)
     if from_date:
-        q = q.filter(Recording.recording_date >= from_date)
+        q = q.where(Recording.recording_date >= from_date)
     if to_date:
-        q = q.filter(Recording.recording_date <= to_date)
+        q = q.where(Recording.recording_date <= to_date)
     if hour_from is not None:
-        q = q.filter(Recording.hour >= hour_from)
+        q = q.where(Recording.hour >= hour_from)
     if hour_to is not None:
-        q = q.filter(Recording.hour <= hour_to)
-    q = q.order_by(Recording.recording_date.desc(), Recording.hour.asc())
-    return q.offset(offset).limit(limit).all()
+        q = q.where(Recording.hour <= hour_to)
+
+    # Keyset order: a backward scan of uq_recordings_camera_date_hour for one camera,
+    # of ix_recordings_date_hour_camera otherwise
+    if camera_id:
+        key = (Recording.recording_date, Recording.hour)
+    else:
+        key = (Recording.recording_date, Recording.hour, Recording.camera_id)
+    if cursor:
+        after = _decode_cursor(cursor)
+        q = q.where(tuple_(*key) < tuple_(*after[:len(key)]))
+    q = q.order_by(*(c.desc() for c in key))
+    if offset:
+        q = q.offset(offset)
+
+    rows = (await db.scalars(q.limit(limit))).all()
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
+    return rows
+
+
+@router.get("/jobs", response_model=list[RecordingJobOut])
+def list_recording_jobs(user: CurrentUser, db: Session = Depends(get_db)):
+    """Recent recording simulation jobs, newest first."""
+    return recording_jobs.list_jobs(db)
+
+
+@router.get("/jobs/{job_id}", response_model=RecordingJobOut)
+def get_recording_job(job_id: uuid.UUID, user: CurrentUser, db: Session = Depends(get_db)):
+    job = recording_jobs.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/cold-tier", response_model=ColdTierStats)
+def get_cold_tier_stats(user: CurrentUser, db: Session = Depends(get_db)):
+    """Space saved and encode throughput of the cold-tier transcoder."""
+    return cold_tier.cold_tier_stats(db)
+
+
+@router.get("/hls/camera/{camera_id}/index.m3u8")
+def camera_hls_playlist(
+    camera_id: uuid.UUID,
+    request: Request,
+    from_date: date,
+    to_date: date | None = None,
+    db: Session = Depends(get_db),
+    token: str | None = Query(None, description="JWT token for browser media elements"),
+):
+    """One HLS playlist over a camera's consecutive hourly recordings (from_date..to_date)."""
+    _media_user(request, token, db)
+    to_date = to_date or from_date
+    recs = (
+        db.query(Recording)
+        .filter(
+            Recording.camera_id == camera_id,
+            Recording.recording_date >= from_date,
+            Recording.recording_date <= to_date,
+        )
+        .order_by(Recording.recording_date.asc(), Recording.hour.asc())
+        .limit(settings.hls_max_playlist_hours + 1)
+        .all()
+    )
+    if not recs:
+        raise HTTPException(status_code=404, detail="No recordings in range")
+    if len(recs) > settings.hls_max_playlist_hours:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range too large (max {settings.hls_max_playlist_hours} hourly recordings)",
+        )
+    return Response(
+        hls.camera_playlist(db, recs, router.prefix, token),
+        media_type=HLS_PLAYLIST_TYPE,
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@router.get("/clip")
+def get_clip(
+    request: Request,
+    camera_id: uuid.UUID,
+    start: datetime,
+    end: datetime,
+    db: Session = Depends(get_db),
+    token: str | None = Query(None, description="JWT token for browser media elements"),
+):
+    """Cut [start, end) for a camera out of its hourly recordings (stream copy, cached).
+    Naive timestamps are taken in the site timezone."""
+    user = _media_user(request, token, db)
+    tz = ZoneInfo(settings.tz)
+    start = start if start.tzinfo else start.replace(tzinfo=tz)
+    end = end if end.tzinfo else end.replace(tzinfo=tz)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if (end - start).total_seconds() > settings.clip_max_seconds:
+        raise HTTPException(status_code=400, detail=f"Clip too long (max {settings.clip_max_seconds} s)")
+
+    try:
+        path = clips.extract_clip(db, camera_id, start, end)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No recordings cover the requested range")
+    except RuntimeError:
+        raise HTTPException(status_code=502, detail="Clip extraction failed")
+
+    # Players fetch in byte ranges; audit the initial request only
+    if request.headers.get("range", "bytes=0-").startswith("bytes=0-"):
+        audit(db, action="recording_clip", user=user, request=request,
+              meta={"camera_id": str(camera_id), "start": start.isoformat(), "end": end.isoformat()})
+
+    return FileResponse(
+        path,
+        media_type="video/mp4",
+        filename=f"clip_{start.strftime('%Y%m%dT%H%M%S')}_{end.strftime('%H%M%S')}.mp4",
+        content_disposition_type="inline",
+    )
 
 
 @router.get("/{recording_id}", response_model=RecordingOut)
@@ -72,6 +261,15 @@ def get_recording(recording_id: uuid.UUID, user: CurrentUser, db: Session = Depe
     return rec
 
 
+@router.get("/{recording_id}/media", response_model=MediaProbeOut)
+def get_recording_media(recording_id: uuid.UUID, user: CurrentUser, db: Session = Depends(get_db)):
+    """Probed codec, resolution, bitrate and keyframe times (404 until the prober has run)."""
+    probe = db.query(MediaProbe).filter(MediaProbe.recording_id == recording_id).first()
+    if not probe:
+        raise HTTPException(status_code=404, detail="Media metadata not available yet")
+    return probe
+
+
 @router.get("/{recording_id}/play")
 def play_recording(
     recording_id: uuid.UUID,
@@ -82,36 +280,21 @@ def play_recording(
     """Stream the recording MP4 file for playback in the browser.
     Accepts auth via Authorization header OR ?token= query parameter
     (needed because <video> tags cannot send custom headers)."""
-    from app.core import decode_token as _decode
-    from app.models.user import User
-
-    user = None
-    # Try Authorization header first
-    auth_header = request.headers.get("authorization", "")
-    if auth_header.startswith("Bearer "):
-        jwt_token = auth_header[7:]
-        payload = _decode(jwt_token)
-        if payload and payload.get("type") == "access":
-            uid = payload.get("sub")
-            if uid:
-                user = db.query(User).filter(User.id == uuid.UUID(uid)).first()
-    # Fallback: query string token (for <video> elements)
-    if user is None and token:
-        payload = _decode(token)
-        if payload and payload.get("type") == "access":
-            uid = payload.get("sub")
-            if uid:
-                user = db.query(User).filter(User.id == uuid.UUID(uid)).first()
-    if user is None:
-        raise HTTPException(status_code=401, detail="Authentication required")
-    rec = db.query(Recording).filter(Recording.id == recording_id).first()
-    if not rec:
-        raise HTTPException(status_code=404, detail="Recording not found")
+    _media_user(request, token, db)
+    rec = _get_recording_or_404(db, recording_id)
 
-    filepath = os.path.join(RECORDINGS_DIR, rec.filename)
+    filepath = recording_path(rec.filename)
     if not os.path.exists(filepath):
         raise HTTPException(status_code=404, detail="Recording file not found on disk")
 
+    if os.path.isdir(filepath):
+        # Frigate hour: remux its segments into one fragmented MP4 on the fly
+        return StreamingResponse(
+            _stream_segments(filepath),
+            media_type="video/mp4",
+            headers={"Content-Disposition": f'inline; filename="{rec.filename.split(":", 1)[-1].replace("/", "_")}.mp4"'},
+        )
+
     file_size = os.path.getsize(filepath)
     return FileResponse(
         filepath,
@@ -124,14 +307,84 @@ def play_recording(
     )
 
 
+@router.get("/{recording_id}/hls/index.m3u8")
+def recording_hls_playlist(
+    recording_id: uuid.UUID,
+    request: Request,
+    db: Session = Depends(get_db),
+    token: str | None = Query(None, description="JWT token for browser media elements"),
+):
+    """fMP4 HLS playlist for one recording; packaged on first request (stream copy)."""
+    _media_user(request, token, db)
+    rec = _get_recording_or_404(db, recording_id)
+    try:
+        body = hls.recording_playlist(rec, token)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Recording file not found on disk")
+    except RuntimeError:
+        raise HTTPException(status_code=502, detail="HLS packaging failed")
+    return Response(body, media_type=HLS_PLAYLIST_TYPE, headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/{recording_id}/hls/{segment}")
+def recording_hls_segment(
+    recording_id: uuid.UUID,
+    segment: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    token: str | None = Query(None, description="JWT token for browser media elements"),
+):
+    _media_user(request, token, db)
+    rec = _get_recording_or_404(db, recording_id)
+    try:
+        path = hls.segment_path(rec, segment)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Segment not found")
+    except RuntimeError:
+        raise HTTPException(status_code=502, detail="HLS packaging failed")
+    # Segments are immutable for a given source file; the cache key changes if it is replaced
+    return FileResponse(path, media_type="video/mp4", headers={"Cache-Control": "private, max-age=3600"})
+
+
+@router.get("/{recording_id}/previews/{name}")
+def get_recording_preview(
+    recording_id: uuid.UUID,
+    name: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    token: str | None = Query(None, description="JWT token for browser media elements"),
+):
+    """Poster frame (poster.jpg), sprite sheet (sprite.jpg) or WebVTT thumbnail track (thumbs.vtt)."""
+    _media_user(request, token, db)
+    if name not in previews.PREVIEW_FILES:
+        raise HTTPException(status_code=404, detail="Unknown preview")
+    path = previews.preview_path(recording_id, name)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Preview not generated yet")
+
+    # Previews only change if the recording is replaced; FileResponse adds an ETag for revalidation
+    headers = {"Cache-Control": "private, max-age=604800"}
+    if name == previews.VTT:
+        return Response(previews.vtt_with_token(recording_id, token), media_type="text/vtt", headers=headers)
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
+
+
+def _save_upload(dest_path: str, content: bytes) -> int:
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    with open(dest_path, "wb") as f:
+        f.write(content)
+    return os.path.getsize(dest_path)
+
+
 @router.post("/upload", response_model=RecordingOut)
 async def upload_recording(
-    user: CurrentUser,
+    user: AsyncCurrentUser,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     file: UploadFile = File(...),
     camera_id: str = Form(...),
     recording_date: str = Form(...),
+    hour: int = Form(0, ge=0, le=23),
     duration_seconds: float = Form(None),
 ):
     """Upload a recording file (MP4/MKV) and register it in the system."""
@@ -139,54 +392,66 @@ async def upload_recording(
     _ensure_dir()
 
     # Validate camera
-    cam = db.query(Camera).filter(Camera.id == uuid.UUID(camera_id)).first()
+    cam = await db.get(Camera, uuid.UUID(camera_id))
     if not cam:
         raise HTTPException(status_code=404, detail="Camera not found")
 
     rec_date = date.fromisoformat(recording_date)
+    taken = await db.scalar(
+        select(Recording.id).where(
+            Recording.camera_id == cam.id, Recording.recording_date == rec_date, Recording.hour == hour
+        )
+    )
+    if taken:
+        raise HTTPException(status_code=409, detail="A recording already exists for this camera and hour")
 
-    # Create directory for this date
-    date_dir = os.path.join(RECORDINGS_DIR, rec_date.isoformat())
-    os.makedirs(date_dir, exist_ok=True)
-
-    # Save file
+    # Save file under a directory for this date
     safe_name = f"{cam.frigate_name}_{rec_date.isoformat()}_{uuid.uuid4().hex[:8]}.mp4"
-    dest_path = os.path.join(date_dir, safe_name)
+    dest_path = os.path.join(RECORDINGS_DIR, rec_date.isoformat(), safe_name)
     relative_path = f"{rec_date.isoformat()}/{safe_name}"
-
-    with open(dest_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-
-    file_size = os.path.getsize(dest_path)
+    file_size = await run_in_threadpool(_save_upload, dest_path, await file.read())
 
     rec = Recording(
         id=uuid.uuid4(),
         camera_id=uuid.UUID(camera_id),
         recording_date=rec_date,
+        hour=hour,
         filename=relative_path,
         duration_seconds=duration_seconds,
         size_bytes=file_size,
         status="available",
     )
     db.add(rec)
-    db.commit()
-    db.refresh(rec)
-
-    audit(db, action="recording_upload", user=user, request=request,
-          meta={"recording_id": str(rec.id), "camera": cam.frigate_name, "date": rec_date.isoformat()})
+    await db.execute(cache_bus.recordings_changed(rec.camera_id, rec_date))
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Lost a race with another upload or the Frigate ingest for the same hour
+        await db.rollback()
+        os.remove(dest_path)
+        raise HTTPException(status_code=409, detail="A recording already exists for this camera and hour")
+    await db.refresh(rec)
+    timeline.invalidate(rec.camera_id, rec_date)
+    seek_index.add(rec.camera_id, rec.id, rec.filename, rec.recording_date, rec.hour, rec.duration_seconds)
+
+    # submit() may block on a full queue; keep it off the event loop
+    await run_in_threadpool(
+        audit, db, action="recording_upload", user=user, request=request,
+        meta={"recording_id": str(rec.id), "camera": cam.frigate_name, "date": rec_date.isoformat(), "hour": hour},
+    )
 
     return rec
 
 
-@router.post("/simulate")
+@router.post("/simulate", response_model=RecordingJobOut, status_code=202)
 def simulate_daily_recording(
     user: CurrentUser,
     request: Request,
     db: Session = Depends(get_db),
 ):
     """Simulate 24 hours of recordings (one per hour) for yesterday for each camera.
-    Each hour gets a short video with timestamp overlay — simulates a real NVR system."""
+    Each hour gets a short video with timestamp overlay — simulates a real NVR system.
+    Runs as a queued job in worker.py; poll GET /api/recordings/jobs/{job_id} for progress."""
     _require_admin(user)
     _ensure_dir()
 
@@ -196,74 +461,24 @@ def simulate_daily_recording(
     if not cameras:
         raise HTTPException(status_code=400, detail="No cameras configured")
 
-    # Check for sample videos to use as base
-    sample_dir = "/samples"
-    sample_files = []
-    if os.path.exists(sample_dir):
-        sample_files = [f for f in os.listdir(sample_dir) if f.endswith(('.mp4', '.mkv'))]
-
-    # Delete any existing recordings for yesterday (clean re-simulate)
-    existing = db.query(Recording).filter(Recording.recording_date == yesterday).all()
-    for ex in existing:
-        fpath = os.path.join(RECORDINGS_DIR, ex.filename)
-        if os.path.exists(fpath):
-            os.remove(fpath)
-        db.delete(ex)
-    if existing:
-        db.commit()
-
-    created_count = 0
-    for cam in cameras:
-        date_dir = os.path.join(RECORDINGS_DIR, yesterday.isoformat())
-        os.makedirs(date_dir, exist_ok=True)
-
-        for hour in range(24):
-            safe_name = f"{cam.frigate_name}_{yesterday.isoformat()}_H{hour:02d}.mp4"
-            dest_path = os.path.join(date_dir, safe_name)
-
-            if sample_files:
-                # Copy sample as base
-                src = os.path.join(sample_dir, sample_files[hour % len(sample_files)])
-                shutil.copy2(src, dest_path)
-                # Get duration from file
-                duration = 30.0
-            else:
-                duration = 15.0
-                os.system(
-                    f'ffmpeg -y -f lavfi -i "testsrc2=size=1280x720:rate=15:duration=15" '
-                    f'-vf "drawtext=text=\'{cam.frigate_name} {yesterday} {hour:02d}\\:00\':fontcolor=white:fontsize=28:'
-                    f'x=10:y=10:box=1:boxcolor=black@0.6:boxborderw=5" '
-                    f'-c:v libx264 -preset ultrafast -crf 30 '
-                    f'"{dest_path}" 2>/dev/null'
-                )
-
-            if os.path.exists(dest_path):
-                file_size = os.path.getsize(dest_path)
-                rec = Recording(
-                    id=uuid.uuid4(),
-                    camera_id=cam.id,
-                    recording_date=yesterday,
-                    hour=hour,
-                    filename=f"{yesterday.isoformat()}/{safe_name}",
-                    duration_seconds=duration,
-                    size_bytes=file_size,
-                    status="available",
-                )
-                db.add(rec)
-                created_count += 1
-
-    db.commit()
+    job, created = recording_jobs.enqueue_simulation(db, yesterday, [(c.id, c.frigate_name) for c in cameras])
+    if not created:
+        return job
+    camera_names = [c.frigate_name for c in cameras]
 
     audit(db, action="recording_simulate", user=user, request=request,
-          meta={"date": yesterday.isoformat(), "cameras": [c.frigate_name for c in cameras],
-                "segments": created_count})
+          meta={"date": yesterday.isoformat(), "cameras": camera_names, "job_id": job["id"]})
+
+    return job
 
-    return {
-        "date": yesterday.isoformat(),
-        "cameras": [c.frigate_name for c in cameras],
-        "count": created_count,
-        "message": f"Simulación completada: {created_count} segmentos horarios ({len(cameras)} cámaras × 24 horas) para {yesterday.isoformat()}"
-    }
+
+@router.post("/ingest")
+def trigger_ingest(user: CurrentUser, request: Request, db: Session = Depends(get_db)):
+    """Manually index new Frigate recording segments (normally run by the scheduler)."""
+    _require_admin(user)
+    result = ingest_frigate_recordings(db)
+    audit(db, action="recording_ingest", user=user, request=request, meta=result)
+    return result
 
 
 @router.delete("/{recording_id}")
@@ -278,13 +493,17 @@ def delete_recording(
     if not rec:
         raise HTTPException(status_code=404, detail="Recording not found")
 
-    # Delete file
-    filepath = os.path.join(RECORDINGS_DIR, rec.filename)
-    if os.path.exists(filepath):
+    # Delete file (Frigate segments are left to Frigate's own retention)
+    filepath = recording_path(rec.filename)
+    if os.path.isfile(filepath):
         os.remove(filepath)
+    previews.remove_previews(rec.id)
 
     db.delete(rec)
+    db.execute(cache_bus.recordings_changed(rec.camera_id, rec.recording_date))
     db.commit()
+    timeline.invalidate(rec.camera_id, rec.recording_date)
+    seek_index.remove(rec.camera_id, rec.id)
 
     audit(db, action="recording_delete", user=user, request=request,
           meta={"recording_id": str(recording_id)})
@@ -0,0 +1,75 @@
+"""Retention endpoints — storage usage per camera, policies, dry-run report and manual runs."""
+
+import uuid
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.core.deps import CurrentUser, audit
+from app.models.camera import Camera
+from app.models.retention import RetentionPolicy
+from app.models.user import UserRole
+from app.schemas.retention import RetentionPolicyIn, RetentionPolicyOut, RetentionReport
+from app.services.retention import apply_retention, camera_policies, usage_by_camera
+
+router = APIRouter(prefix="/api/retention", tags=["retention"])
+
+
+def _require_admin(user):
+    if user.role not in [UserRole.SUPERADMIN.value, UserRole.ADMIN.value]:
+        raise HTTPException(status_code=403, detail="Admin required")
+
+
+@router.get("", response_model=RetentionReport)
+def retention_report(user: CurrentUser, db: Session = Depends(get_db)):
+    """Dry run: what the next retention pass would evict, per camera and overall."""
+    _require_admin(user)
+    return apply_retention(db, dry_run=True)
+
+
+@router.post("/run", response_model=RetentionReport)
+def run_retention(user: CurrentUser, request: Request, db: Session = Depends(get_db)):
+    _require_admin(user)
+    report = apply_retention(db)
+    audit(db, action="retention_run", user=user, request=request,
+          meta={"recordings": report["recordings"], "bytes": report["bytes"]})
+    return report
+
+
+@router.get("/policies", response_model=list[RetentionPolicyOut])
+def list_policies(user: CurrentUser, db: Session = Depends(get_db)):
+    _require_admin(user)
+    usage = usage_by_camera(db)
+    return [
+        {"camera_id": cam_id, "usage_bytes": usage.get(cam_id, 0), **p}
+        for cam_id, p in camera_policies(db).items()
+    ]
+
+
+@router.put("/policies/{camera_id}", response_model=RetentionPolicyOut)
+def set_policy(
+    camera_id: uuid.UUID,
+    body: RetentionPolicyIn,
+    user: CurrentUser,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    _require_admin(user)
+    if not db.query(Camera.id).filter(Camera.id == camera_id).first():
+        raise HTTPException(status_code=404, detail="Camera not found")
+
+    policy = db.get(RetentionPolicy, camera_id)
+    if policy is None:
+        policy = RetentionPolicy(camera_id=camera_id)
+        db.add(policy)
+    policy.max_age_days = body.max_age_days
+    policy.max_bytes = body.max_bytes
+    policy.updated_at = datetime.now(timezone.utc)
+    db.commit()
+
+    audit(db, action="retention_policy_update", user=user, request=request,
+          resource_type="camera", resource_id=str(camera_id), meta=body.model_dump())
+    return {"camera_id": camera_id, "usage_bytes": usage_by_camera(db).get(camera_id, 0),
+            **camera_policies(db)[camera_id]}
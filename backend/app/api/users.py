@@ -2,18 +2,33 @@
 
 import uuid
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.database import get_db
-from app.core import hash_password
+from app.core import auth_cache
 from app.core.deps import get_current_user, audit, CurrentUser
-from app.core.mfa import is_mfa_enabled
+from app.core.passwords import PasswordPoolBusy, make_hash
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserUpdate, UserOut
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
+def _hash(password: str) -> str:
+    try:
+        return make_hash(password)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Password hashing busy", headers={"Retry-After": "1"}
+        )
+
+
+def _user_out(u: User) -> UserOut:
+    out = UserOut.model_validate(u)
+    out.mfa_enabled = u.mfa is not None and u.mfa.enabled
+    return out
+
+
 def _require_superadmin(user: CurrentUser):
     if user.role != UserRole.SUPERADMIN.value:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="SuperAdmin required")
@@ -28,13 +43,16 @@ def list_users(
     limit: int = Query(50, ge=1, le=200),
 ):
     _require_superadmin(user)
-    users = db.query(User).filter(User.tenant_id == user.tenant_id).offset(skip).limit(limit).all()
-    result = []
-    for u in users:
-        out = UserOut.model_validate(u)
-        out.mfa_enabled = is_mfa_enabled(db, u.id)
-        result.append(out)
-    return result
+    # MFA rows for the whole page in one extra query instead of one per user
+    users = (
+        db.query(User)
+        .options(selectinload(User.mfa))
+        .filter(User.tenant_id == user.tenant_id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [_user_out(u) for u in users]
 
 
 @router.post("", response_model=UserOut, status_code=status.HTTP_201_CREATED)
@@ -52,13 +70,14 @@ def create_user(
     new_user = User(
         tenant_id=user.tenant_id,
         email=body.email,
-        password_hash=hash_password(body.password),
+        password_hash=_hash(body.password),
         role=body.role,
     )
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
-    audit(db, action="user_create", user=user, request=request, resource_type="user", resource_id=str(new_user.id))
+    audit(db, action="user_create", user=user, request=request, resource_type="user", resource_id=str(new_user.id),
+          durable=True)
     return UserOut.model_validate(new_user)
 
 
@@ -71,7 +90,12 @@ def update_user(
     db: Session = Depends(get_db),
 ):
     _require_superadmin(user)
-    target = db.query(User).filter(User.id == user_id, User.tenant_id == user.tenant_id).first()
+    target = (
+        db.query(User)
+        .options(joinedload(User.mfa))
+        .filter(User.id == user_id, User.tenant_id == user.tenant_id)
+        .first()
+    )
     if not target:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -79,12 +103,12 @@ def update_user(
         target.role = body.role
     if body.is_active is not None:
         target.is_active = body.is_active
+    db.execute(auth_cache.user_changed(target.id))
     db.commit()
-    db.refresh(target)
-    audit(db, action="user_update", user=user, request=request, resource_type="user", resource_id=str(user_id))
-    out = UserOut.model_validate(target)
-    out.mfa_enabled = is_mfa_enabled(db, target.id)
-    return out
+    auth_cache.invalidate_user(target.id)
+    audit(db, action="user_update", user=user, request=request, resource_type="user", resource_id=str(user_id),
+          durable=True)
+    return _user_out(target)
 
 
 @router.post("/{user_id}/reset-password")
@@ -102,7 +126,10 @@ def reset_password(
     if not new_password:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="new_password required")
 
-    target.password_hash = hash_password(new_password)
+    target.password_hash = _hash(new_password)
+    db.execute(auth_cache.user_changed(target.id))
     db.commit()
-    audit(db, action="password_reset", user=user, request=request, resource_type="user", resource_id=str(user_id))
+    auth_cache.invalidate_user(target.id)
+    audit(db, action="password_reset", user=user, request=request, resource_type="user", resource_id=str(user_id),
+          durable=True)
     return {"detail": "Password reset"}
@@ -0,0 +1,172 @@
+"""Auth cache — resolved users and decoded access tokens, per process.
+
+get_current_user would otherwise decode the JWT and load the user row on every
+request (thumbnails, Range requests, list calls). Both are cached here with a short
+TTL and LRU bound. Code that changes a user (update, password reset, MFA) executes
+user_changed() in its transaction and calls invalidate_user() after the commit: the
+pg_notify is delivered on commit and every worker process's listener drops the user
+too. A listener that (re)connects drops all users, since it may have missed messages.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+import psycopg
+import structlog
+from sqlalchemy import Select, func, select
+
+from app.config import get_settings
+from app.database import libpq_url
+
+log = structlog.get_logger()
+settings = get_settings()
+
+CHANNEL = "user_changed"
+LISTEN_POLL_SECONDS = 5
+RECONNECT_SECONDS = (1, 2, 5, 10, 30)
+
+_thread: threading.Thread | None = None
+_stopping = threading.Event()
+
+
+class _TTLCache:
+    """LRU dict whose entries expire; thread-safe, counts hits and misses."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value, ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+_users = _TTLCache(settings.auth_cache_max_users)
+_tokens = _TTLCache(settings.auth_cache_max_tokens)
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def get_token(token: str) -> dict | None:
+    return _tokens.get(_token_key(token))
+
+
+def put_token(token: str, payload: dict) -> None:
+    # Never outlive the token itself
+    ttl = settings.auth_cache_ttl_seconds
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - time.time())
+    _tokens.put(_token_key(token), payload, ttl)
+
+
+def get_user(user_id: uuid.UUID):
+    return _users.get(user_id)
+
+
+def put_user(user) -> None:
+    _users.put(user.id, user, settings.auth_cache_ttl_seconds)
+
+
+def invalidate_user(user_id: uuid.UUID) -> None:
+    """Drop the user in this process (after the commit; other processes hear user_changed)."""
+    _users.pop(user_id)
+
+
+def user_changed(user_id: uuid.UUID) -> Select:
+    """Statement to execute before committing a change to a user."""
+    return select(func.pg_notify(CHANNEL, str(user_id)))
+
+
+def clear() -> None:
+    _users.clear()
+    _tokens.clear()
+
+
+def stats() -> dict:
+    return {
+        "ttl_seconds": settings.auth_cache_ttl_seconds,
+        "users": _users.stats(),
+        "tokens": _tokens.stats(),
+    }
+
+
+def _listen() -> None:
+    attempt = 0
+    while not _stopping.is_set():
+        try:
+            with psycopg.connect(libpq_url(), autocommit=True) as conn:
+                conn.execute(f"LISTEN {CHANNEL}")
+                _users.clear()
+                attempt = 0
+                while not _stopping.is_set():
+                    for notify in conn.notifies(timeout=LISTEN_POLL_SECONDS):
+                        try:
+                            _users.pop(uuid.UUID(notify.payload))
+                        except ValueError:
+                            _users.clear()
+        except Exception as e:
+            delay = RECONNECT_SECONDS[min(attempt, len(RECONNECT_SECONDS) - 1)]
+            attempt += 1
+            log.warning("auth_cache_listener_error", error=str(e), retry_in=delay)
+            _stopping.wait(delay)
+
+
+def start() -> None:
+    global _thread
+    if _thread is None:
+        _stopping.clear()
+        _thread = threading.Thread(target=_listen, name="auth-cache", daemon=True)
+        _thread.start()
+
+
+def stop() -> None:
+    global _thread
+    _stopping.set()
+    if _thread is not None:
+        _thread.join(LISTEN_POLL_SECONDS + 1)
+        _thread = None
@@ -5,33 +5,75 @@ from typing import Annotated
 
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.core import decode_token
+from app.database import get_async_db, get_db
+from app.core import auth_cache, decode_token, revocation
 from app.models.user import User, UserRole
-from app.models.audit import AuditLog
+from app.services import audit_sink
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db),
-) -> User:
-    payload = decode_token(token)
-    if payload is None or payload.get("type") != "access":
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user_id = payload.get("sub")
-    if not user_id:
+def _token_user_id(token: str) -> uuid.UUID:
+    """Decoded (and cached) access token -> user ID; 401 if invalid or revoked."""
+    payload = auth_cache.get_token(token)
+    if payload is None:
+        payload = decode_token(token)
+        if payload is None or payload.get("type") != "access":
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        auth_cache.put_token(token, payload)
+    if revocation.is_revoked(payload.get("jti")):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    try:
+        return uuid.UUID(payload.get("sub") or "")
+    except ValueError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
-    user = db.query(User).filter(User.id == uuid.UUID(user_id)).first()
+
+
+def _usable(user: User | None) -> User:
     if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
     return user
 
 
+def user_for_token(token: str, db: Session) -> User:
+    """Active user of a valid, unrevoked access token (401 otherwise), through the auth caches."""
+    user_id = _token_user_id(token)
+    cached = auth_cache.get_user(user_id)
+    if cached is None:
+        cached = _usable(db.query(User).filter(User.id == user_id).first())
+        # Cache a detached copy so nothing done with this session can alter it
+        db.expunge(cached)
+        auth_cache.put_user(cached)
+    # Attach a per-request copy without a query
+    return db.merge(cached, load=False)
+
+
+def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Session = Depends(get_db),
+) -> User:
+    return user_for_token(token, db)
+
+
+async def get_current_user_async(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """get_current_user for async def endpoints, on the same caches."""
+    user_id = _token_user_id(token)
+    cached = auth_cache.get_user(user_id)
+    if cached is None:
+        cached = _usable(await db.get(User, user_id))
+        db.expunge(cached)
+        auth_cache.put_user(cached)
+    return await db.merge(cached, load=False)
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
+AsyncCurrentUser = Annotated[User, Depends(get_current_user_async)]
 
 
 def require_role(*roles: UserRole):
@@ -58,17 +100,22 @@ def audit(
     resource_id: str | None = None,
     site_id: uuid.UUID | None = None,
     meta: dict | None = None,
+    durable: bool = False,
 ) -> None:
-    """Write an audit log entry."""
-    entry = AuditLog(
-        site_id=site_id,
-        actor_user_id=user.id if user else None,
-        action=action,
-        resource_type=resource_type,
-        resource_id=resource_id,
-        ip=request.client.host if request and request.client else None,
-        user_agent=request.headers.get("user-agent") if request else None,
-        meta=meta,
+    """
+    Write an audit log entry through the batching sink.
+    durable=True waits until the entry is committed (security-critical actions).
+    """
+    audit_sink.submit(
+        {
+            "site_id": site_id,
+            "actor_user_id": user.id if user else None,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "ip": request.client.host if request and request.client else None,
+            "user_agent": request.headers.get("user-agent") if request else None,
+            "meta": meta,
+        },
+        durable=durable,
     )
-    db.add(entry)
-    db.commit()
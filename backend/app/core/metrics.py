@@ -0,0 +1,266 @@
+"""Prometheus metrics — HTTP routes, DB pool/queries, Frigate client, event sync.
+
+GET /metrics on the API (not routed by Caddy, which only forwards /api/*) and
+worker_metrics_port on worker.py serve them. Under uvicorn --workers the image sets
+PROMETHEUS_MULTIPROC_DIR, so every worker process writes its samples there and a
+scrape of any one of them returns the sum over all.
+
+Labels are bounded: HTTP metrics use the route template (/api/recordings/{recording_id}),
+never the raw path, and anything unrouted is "unmatched".
+"""
+
+import os
+import time
+
+import httpx
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BATCH_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 200, 500, 1000)
+LAG_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, 21600, 86400)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "nvr_http_request_duration_seconds", "Request time until the last body byte was sent",
+    ["method", "route", "status"], buckets=FAST_BUCKETS,
+)
+HTTP_RESPONSE_BYTES = Counter(
+    "nvr_http_response_bytes", "Response body bytes sent (proxied media, playback, downloads)", ["route"],
+)
+
+DB_QUERY_SECONDS = Histogram(
+    "nvr_db_query_duration_seconds", "Cursor execute time per statement", ["engine", "verb"], buckets=FAST_BUCKETS,
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "nvr_db_pool_wait_seconds", "Time to get a connection from the pool, including opening one",
+    ["engine"], buckets=FAST_BUCKETS,
+)
+DB_CONNECTION_HOLD_SECONDS = Histogram(
+    "nvr_db_connection_hold_seconds", "Checkout to checkin of a pooled connection", ["engine"], buckets=FAST_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "nvr_db_pool_checked_out", "Connections currently checked out", ["engine"], multiprocess_mode="livesum",
+)
+
+FRIGATE_REQUEST_SECONDS = Histogram(
+    "nvr_frigate_request_duration_seconds", "Frigate API time to response headers",
+    ["op", "outcome"], buckets=FAST_BUCKETS,
+)
+FRIGATE_ERRORS = Counter(
+    "nvr_frigate_errors", "Frigate API failures: HTTP 4xx/5xx or the transport exception", ["op", "kind"],
+)
+
+SYNC_DURATION_SECONDS = Histogram(
+    "nvr_frigate_sync_duration_seconds", "Frigate event sync runs", buckets=FAST_BUCKETS,
+)
+SYNC_BATCH_EVENTS = Histogram(
+    "nvr_frigate_sync_batch_events", "Events per sync: fetched from Frigate, and new among them",
+    ["kind"], buckets=BATCH_BUCKETS,
+)
+SYNC_EVENT_LAG_SECONDS = Histogram(
+    "nvr_frigate_sync_event_lag_seconds", "Event start to the sync that stored it", buckets=LAG_BUCKETS,
+)
+SYNC_LAST_SUCCESS = Gauge(
+    "nvr_frigate_sync_last_success_timestamp_seconds", "Unix time of the last sync that reached Frigate",
+    multiprocess_mode="max",
+)
+SYNC_COALESCED = Counter(
+    "nvr_frigate_sync_coalesced", "Sync requests absorbed by a run in flight", ["kind"],
+)
+
+_VERBS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+def registry() -> CollectorRegistry:
+    if not MULTIPROCESS:
+        return REGISTRY
+    reg = CollectorRegistry()
+    multiprocess.MultiProcessCollector(reg)
+    return reg
+
+
+def render() -> tuple[bytes, str]:
+    """Exposition body and content type for a scrape."""
+    return generate_latest(registry()), CONTENT_TYPE_LATEST
+
+
+def process_exit() -> None:
+    """Drop this process's live gauges from the shared directory on clean shutdown."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+# --- HTTP ---
+
+
+class MetricsMiddleware:
+    """Pure ASGI, so streamed bodies are counted and timed to their last chunk."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        state = [500, 0]  # status, body bytes
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.body":
+                state[1] += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                state[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            key = (scope["method"], getattr(route, "path", None) or "unmatched", state[0])
+            children = _http_children.get(key) or _http_child(key)
+            children[0].observe(time.perf_counter() - started)
+            if state[1]:
+                children[1].inc(state[1])
+
+
+# labels() validates and locks on every call; the label sets here are few and fixed
+_http_children: dict[tuple, tuple] = {}
+
+
+def _http_child(key: tuple) -> tuple:
+    method, template, status = key
+    children = (HTTP_REQUEST_SECONDS.labels(method, template, str(status)), HTTP_RESPONSE_BYTES.labels(template))
+    _http_children[key] = children
+    return children
+
+
+# --- Database ---
+
+
+class _TimedCheckout:
+    # QueuePool._do_get is where a checkout blocks on an exhausted pool
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = self.__dict__.get("_metrics_wait")
+            if wait is None:
+                wait = self._metrics_wait = DB_POOL_WAIT_SECONDS.labels(self._orig_logging_name or "default")
+            wait.observe(time.perf_counter() - started)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool recording checkout wait; labelled by create_engine(pool_logging_name=...)."""
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool recording checkout wait."""
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._metrics_started = time.perf_counter()
+
+
+def _after_execute(engine_label: str):
+    by_verb = {verb: DB_QUERY_SECONDS.labels(engine_label, verb) for verb in _VERBS}
+    other = DB_QUERY_SECONDS.labels(engine_label, "OTHER")
+
+    def after(conn, cursor, statement, parameters, context, executemany) -> None:
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            words = statement.split(None, 1)
+            verb = words[0].upper() if words else ""
+            by_verb.get(verb, other).observe(time.perf_counter() - started)
+    return after
+
+
+def _checkout(engine_label: str):
+    checked_out = DB_POOL_CHECKED_OUT.labels(engine_label)
+
+    def checkout(dbapi_conn, record, proxy) -> None:
+        record.info["metrics_checkout"] = time.perf_counter()
+        checked_out.inc()
+    return checkout
+
+
+def _checkin(engine_label: str):
+    checked_out = DB_POOL_CHECKED_OUT.labels(engine_label)
+    hold = DB_CONNECTION_HOLD_SECONDS.labels(engine_label)
+
+    def checkin(dbapi_conn, record) -> None:
+        started = record.info.pop("metrics_checkout", None)
+        if started is not None:
+            hold.observe(time.perf_counter() - started)
+            checked_out.dec()
+    return checkin
+
+
+def instrument(engine: Engine, label: str) -> None:
+    """Query durations and checkout counts/hold times for `engine` (sync, or an async engine's .sync_engine)."""
+    if event.contains(engine, "before_cursor_execute", _before_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute(label))
+    event.listen(engine, "checkout", _checkout(label))
+    event.listen(engine, "checkin", _checkin(label))
+
+
+# --- Frigate client ---
+
+
+def _frigate_op(path: str) -> str:
+    if path.endswith("/clip.mp4"):
+        return "clip"
+    if path.endswith("/snapshot.jpg"):
+        return "snapshot"
+    if path.rstrip("/") == "/api/events":
+        return "events"
+    return "other"
+
+
+def _frigate_response(op: str, status: int, started: float) -> None:
+    FRIGATE_REQUEST_SECONDS.labels(op, f"{status // 100}xx").observe(time.perf_counter() - started)
+    if status >= 400:
+        FRIGATE_ERRORS.labels(op, f"http_{status // 100}xx").inc()
+
+
+def _frigate_failure(op: str, exc: Exception, started: float) -> None:
+    FRIGATE_REQUEST_SECONDS.labels(op, "error").observe(time.perf_counter() - started)
+    FRIGATE_ERRORS.labels(op, type(exc).__name__).inc()
+
+
+class FrigateTransport(httpx.HTTPTransport):
+    """httpx transport for Frigate calls: latency by endpoint and outcome, failures by kind."""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        op, started = _frigate_op(request.url.path), time.perf_counter()
+        try:
+            resp = super().handle_request(request)
+        except Exception as e:
+            _frigate_failure(op, e, started)
+            raise
+        _frigate_response(op, resp.status_code, started)
+        return resp
+
+
+class AsyncFrigateTransport(httpx.AsyncHTTPTransport):
+    """Async variant of FrigateTransport."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        op, started = _frigate_op(request.url.path), time.perf_counter()
+        try:
+            resp = await super().handle_async_request(request)
+        except Exception as e:
+            _frigate_failure(op, e, started)
+            raise
+        _frigate_response(op, resp.status_code, started)
+        return resp
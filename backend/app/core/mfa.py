@@ -10,7 +10,7 @@ import qrcode
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
-from app.core import encrypt_mfa_secret, decrypt_mfa_secret
+from app.core import auth_cache, encrypt_mfa_secret, decrypt_mfa_secret
 from app.models.user import MfaTotp, User
 
 settings = get_settings()
@@ -42,7 +42,9 @@ def enroll_totp(db: Session, user: User) -> dict:
             enabled=False,
         )
         db.add(mfa)
+    db.execute(auth_cache.user_changed(user.id))
     db.commit()
+    auth_cache.invalidate_user(user.id)
 
     return {
         "secret": secret,
@@ -64,10 +66,14 @@ def verify_totp(db: Session, user: User, code: str) -> bool:
         return False
 
     # Enable on first verification
-    if not mfa.enabled:
+    enabling = not mfa.enabled
+    if enabling:
         mfa.enabled = True
+        db.execute(auth_cache.user_changed(user.id))
     mfa.last_used_at = datetime.now(timezone.utc)
     db.commit()
+    if enabling:
+        auth_cache.invalidate_user(user.id)
     return True
 
 
@@ -80,4 +86,6 @@ def disable_totp(db: Session, user_id) -> None:
     mfa = db.query(MfaTotp).filter(MfaTotp.user_id == user_id).first()
     if mfa:
         db.delete(mfa)
+        db.execute(auth_cache.user_changed(user_id))
         db.commit()
+        auth_cache.invalidate_user(user_id)
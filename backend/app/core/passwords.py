@@ -0,0 +1,115 @@
+"""Password pool — bcrypt work on a small dedicated executor.
+
+bcrypt is deliberately slow (~250 ms at cost 12). Run on the request threadpool, a
+burst of logins would occupy every worker thread and starve other endpoints. Here
+at most bcrypt_workers hashes run at once and bcrypt_max_pending wait; beyond that
+callers are rejected immediately with PasswordPoolBusy. Async endpoints await the
+*_async variants, which hold neither a request thread nor the event loop.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeout
+
+from app.config import get_settings
+from app.core import hash_password, verify_password
+
+settings = get_settings()
+
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+_in_flight = 0  # running + queued
+_count_lock = threading.Lock()
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Too many hash operations queued; retry later."""
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max(1, settings.bcrypt_workers), thread_name_prefix="bcrypt")
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _release(_future=None) -> None:
+    global _in_flight
+    with _count_lock:
+        _in_flight -= 1
+
+
+def _submit(fn, *args) -> Future:
+    global _in_flight
+    with _count_lock:
+        if _in_flight >= settings.bcrypt_workers + settings.bcrypt_max_pending:
+            raise PasswordPoolBusy("password hashing saturated")
+        _in_flight += 1
+    try:
+        future = _get_pool().submit(fn, *args)
+    except BaseException:
+        _release()
+        raise
+    # Released when the work finishes, even if this caller stopped waiting
+    future.add_done_callback(_release)
+    return future
+
+
+def _run(fn, *args):
+    future = _submit(fn, *args)
+    try:
+        return future.result(timeout=settings.bcrypt_wait_seconds)
+    except FuturesTimeout:
+        future.cancel()
+        raise PasswordPoolBusy("password hashing timed out")
+
+
+async def _run_async(fn, *args):
+    # Timing out cancels the wrapper, which cancels the pool future if it has not started
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(_submit(fn, *args)), settings.bcrypt_wait_seconds)
+    except asyncio.TimeoutError:
+        raise PasswordPoolBusy("password hashing timed out")
+
+
+def check_password(plain: str, hashed: str) -> bool:
+    return _run(verify_password, plain, hashed)
+
+
+def make_hash(plain: str) -> str:
+    return _run(hash_password, plain)
+
+
+async def check_password_async(plain: str, hashed: str) -> bool:
+    return await _run_async(verify_password, plain, hashed)
+
+
+async def make_hash_async(plain: str) -> str:
+    return await _run_async(hash_password, plain)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True when a bcrypt hash was made with a different cost than bcrypt_rounds."""
+    try:
+        return int(hashed.split("$")[2]) != settings.bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
+
+
+def stats() -> dict:
+    return {
+        "workers": settings.bcrypt_workers,
+        "max_pending": settings.bcrypt_max_pending,
+        "in_flight": _in_flight,
+        "rounds": settings.bcrypt_rounds,
+    }
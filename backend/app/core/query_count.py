@@ -0,0 +1,37 @@
+"""Count SQL statements per request (or any block) for query-budget checks.
+
+install() hooks the engine once. counting() starts a counter in the current
+context; sync endpoints run in a copy of the request context that shares the
+counter, so everything a request executes is included.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_counter: ContextVar[list[int] | None] = ContextVar("query_counter", default=None)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    box = _counter.get()
+    if box is not None:
+        box[0] += 1
+
+
+def install(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_execute):
+        event.listen(engine, "before_cursor_execute", _before_execute)
+
+
+@contextmanager
+def counting() -> Iterator[list[int]]:
+    """Yields a one-element list holding the number of statements executed so far."""
+    box = [0]
+    token = _counter.set(box)
+    try:
+        yield box
+    finally:
+        _counter.reset(token)
@@ -0,0 +1,158 @@
+"""Read-replica routing — replica lag tracking, read-your-writes, and the read-only DB dependencies.
+
+Heavy read endpoints take get_read_db/get_async_read_db instead of get_db. Their
+session reads from the replica only when all of these hold:
+- database_replica_url is set;
+- the lag checker measured the replica within replica_max_lag_seconds recently;
+- the client has not written in the last read_your_writes_seconds.
+Otherwise the session reads from the primary. Every successful write request sets
+a short-lived cookie, so a browser's next reads stay on the primary on any worker
+process.
+"""
+
+import threading
+import time
+from typing import AsyncIterator, Iterator
+
+import structlog
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import AsyncReadSessionLocal, ReadSessionLocal, replica_engine
+
+log = structlog.get_logger()
+settings = get_settings()
+
+PRIMARY_COOKIE = "nvr_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Caught up when everything received has been replayed: an idle primary sends no
+# new transactions, so the last replay timestamp alone would look like growing lag.
+# That only holds while the WAL receiver is streaming and hearing from the primary
+# (which sends keepalives when idle); otherwise the lag is unknown (NULL). Reading
+# pg_stat_wal_receiver.status needs pg_read_all_stats on the replica.
+LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver
+            WHERE status = 'streaming'
+              AND last_msg_receipt_time > now() - make_interval(secs => :receiver_timeout)
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+_state = {"lag": None, "checked_at": 0.0, "error": None, "replica_reads": 0, "primary_reads": 0}
+_thread: threading.Thread | None = None
+_stopping = threading.Event()
+
+
+def enabled() -> bool:
+    return replica_engine is not None
+
+
+def usable() -> bool:
+    """Replica measured recently and within replica_max_lag_seconds."""
+    if replica_engine is None or _state["lag"] is None:
+        return False
+    # A checker that stopped reporting is not evidence of a fresh replica
+    if time.monotonic() - _state["checked_at"] > 3 * settings.replica_lag_check_seconds:
+        return False
+    return _state["lag"] <= settings.replica_max_lag_seconds
+
+
+def _check() -> None:
+    try:
+        with replica_engine.connect() as conn:
+            lag = conn.execute(LAG_SQL, {"receiver_timeout": settings.replica_receiver_timeout_seconds}).scalar()
+        was_usable = usable()
+        _state.update(
+            lag=float(lag) if lag is not None else None, checked_at=time.monotonic(),
+            error=None if lag is not None else "WAL receiver not streaming",
+        )
+    except Exception as e:
+        was_usable = usable()
+        _state.update(lag=None, error=str(e))
+    if was_usable != usable():
+        log.warning("replica_routing_changed", usable=usable(), lag_s=_state["lag"], error=_state["error"])
+
+
+def _run() -> None:
+    while not _stopping.is_set():
+        _check()
+        _stopping.wait(settings.replica_lag_check_seconds)
+
+
+def start() -> None:
+    global _thread
+    if replica_engine is not None and _thread is None:
+        _stopping.clear()
+        _thread = threading.Thread(target=_run, name="replica-lag", daemon=True)
+        _thread.start()
+
+
+def stop() -> None:
+    global _thread
+    _stopping.set()
+    if _thread is not None:
+        _thread.join(settings.replica_lag_check_seconds + 1)
+        _thread = None
+
+
+def status() -> dict:
+    return {
+        "enabled": enabled(),
+        "usable": usable(),
+        "lag_seconds": _state["lag"],
+        "max_lag_seconds": settings.replica_max_lag_seconds,
+        "error": _state["error"],
+        "replica_reads": _state["replica_reads"],
+        "primary_reads": _state["primary_reads"],
+    }
+
+
+def mark_write(request: Request, response: Response) -> None:
+    """After a successful write request: keep this client's reads on the primary for a while."""
+    if request.method in SAFE_METHODS or response.status_code >= 400:
+        return
+    until = time.time() + settings.read_your_writes_seconds
+    response.set_cookie(
+        PRIMARY_COOKIE, f"{until:.3f}", max_age=int(settings.read_your_writes_seconds) + 1,
+        path="/api", httponly=True, samesite="lax",
+    )
+
+
+def _recent_write(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def use_replica(request: Request) -> bool:
+    """Whether this request's reads may go to the replica (counted)."""
+    use = usable() and not _recent_write(request)
+    _state["replica_reads" if use else "primary_reads"] += 1
+    return use
+
+
+def get_read_db(request: Request) -> Iterator[Session]:
+    """FastAPI dependency for read-only endpoints: replica when fresh enough, else primary."""
+    db = ReadSessionLocal()
+    db.info["replica"] = use_replica(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Async variant of get_read_db."""
+    async with AsyncReadSessionLocal() as db:
+        db.sync_session.info["replica"] = use_replica(request)
+        yield db
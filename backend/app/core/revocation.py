@@ -0,0 +1,143 @@
+"""Token revocation — a JWT denylist by jti, checked without a query.
+
+Revoked tokens are stored in revoked_tokens until they would have expired and
+mirrored in a per-process dict, so is_revoked() is a hash lookup. revoke() commits
+the row and a pg_notify in one transaction; each process runs a listener thread
+that applies notifications and reloads the full set whenever it (re)connects, so a
+missed notification can never leave a revoked token usable after a reconnect. start()
+loads the set before returning, so a process never serves with an empty denylist.
+"""
+
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import psycopg
+import structlog
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal, libpq_url
+from app.models.user import RevokedToken
+
+log = structlog.get_logger()
+settings = get_settings()
+
+CHANNEL = "token_revoked"
+LISTEN_POLL_SECONDS = 5
+RECONNECT_SECONDS = (1, 2, 5, 10, 30)
+
+# jti -> expiry (epoch seconds)
+_revoked: dict[str, float] = {}
+_thread: threading.Thread | None = None
+_stopping = threading.Event()
+
+
+def is_revoked(jti: str | None) -> bool:
+    return jti is not None and jti in _revoked
+
+
+def _remember(jti: str, exp: float) -> None:
+    if exp > time.time():
+        _revoked[jti] = exp
+
+
+def _prune() -> None:
+    now = time.time()
+    for jti in [j for j, exp in list(_revoked.items()) if exp <= now]:
+        _revoked.pop(jti, None)
+
+
+def revoke(db: Session, payload: dict, reason: str | None = None) -> bool:
+    """Denylist a decoded token until its exp; False if it has no jti (issued before revocation existed)."""
+    jti, exp = payload.get("jti"), payload.get("exp")
+    if not jti or not exp:
+        return False
+    try:
+        user_id = uuid.UUID(payload.get("sub") or "")
+    except ValueError:
+        user_id = None
+    db.execute(
+        pg_insert(RevokedToken)
+        .values(
+            jti=jti, user_id=user_id, token_type=payload.get("type") or "access",
+            expires_at=datetime.fromtimestamp(exp, timezone.utc),
+        )
+        .on_conflict_do_nothing(index_elements=["jti"])
+    )
+    # Delivered to every listener when the insert commits
+    db.execute(select(func.pg_notify(CHANNEL, f"{jti}|{exp}")))
+    db.commit()
+    _remember(jti, float(exp))
+    log.info("token_revoked", jti=jti, type=payload.get("type"), reason=reason)
+    return True
+
+
+def load(db: Session) -> int:
+    """Replace the in-memory set with every unexpired revoked token."""
+    now = datetime.now(timezone.utc)
+    rows = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(RevokedToken.expires_at > now).all()
+    fresh = {jti: expires_at.timestamp() for jti, expires_at in rows}
+    _revoked.update(fresh)
+    for jti in [j for j in list(_revoked) if j not in fresh]:
+        _revoked.pop(jti, None)
+    return len(fresh)
+
+
+def purge_expired(db: Session) -> int:
+    """Delete rows for tokens that have expired anyway."""
+    result = db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc)))
+    db.commit()
+    _prune()
+    return result.rowcount
+
+
+def _listen() -> None:
+    attempt = 0
+    while not _stopping.is_set():
+        try:
+            with psycopg.connect(libpq_url(), autocommit=True) as conn:
+                conn.execute(f"LISTEN {CHANNEL}")
+                # Listening before loading: nothing revoked in between is missed
+                db = SessionLocal()
+                try:
+                    count = load(db)
+                finally:
+                    db.close()
+                log.info("token_revocation_listening", revoked=count)
+                attempt = 0
+                while not _stopping.is_set():
+                    for notify in conn.notifies(timeout=LISTEN_POLL_SECONDS):
+                        jti, _, exp = notify.payload.partition("|")
+                        _remember(jti, float(exp or 0))
+                    _prune()
+        except Exception as e:
+            delay = RECONNECT_SECONDS[min(attempt, len(RECONNECT_SECONDS) - 1)]
+            attempt += 1
+            log.warning("token_revocation_listener_error", error=str(e), retry_in=delay)
+            _stopping.wait(delay)
+
+
+def start() -> None:
+    global _thread
+    if _thread is None:
+        # Not left to the listener: requests would be served before it connects
+        db = SessionLocal()
+        try:
+            load(db)
+        finally:
+            db.close()
+        _stopping.clear()
+        _thread = threading.Thread(target=_listen, name="token-revocation", daemon=True)
+        _thread.start()
+
+
+def stop() -> None:
+    global _thread
+    _stopping.set()
+    if _thread is not None:
+        _thread.join(LISTEN_POLL_SECONDS + 1)
+        _thread = None
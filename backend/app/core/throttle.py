@@ -0,0 +1,41 @@
+"""Token-bucket rate limiting, per process, keyed by any string (IP, username)."""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """Each key holds up to `burst` tokens, refilled at `per_minute`; take() spends one."""
+
+    def __init__(self, burst: int, per_minute: float, max_keys: int = 10000):
+        self.burst = burst
+        self.rate = per_minute / 60
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def take(self, key: str) -> float:
+        """Spend a token; returns 0 if allowed, else seconds until one is available."""
+        if self.burst <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (float(self.burst), now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                self.rejected += 1
+                wait = (1 - tokens) / self.rate if self.rate else float("inf")
+            self._buckets.move_to_end(key)
+            # Evicting the least recently seen key only ever forgives it
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), "rejected": self.rejected}
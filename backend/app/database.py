@@ -1,9 +1,16 @@
-"""SQLAlchemy async-ready engine + session factory."""
+"""SQLAlchemy engines + session factories: sync (threadpool endpoints, jobs) and async (async endpoints).
 
-from sqlalchemy import create_engine
+With database_replica_url set, ReadSessionLocal/AsyncReadSessionLocal build
+RoutingSessions that can send reads to the replica (see app/core/replica.py).
+"""
+
+from sqlalchemy import Delete, Insert, Update, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
 
 from app.config import get_settings
+from app.core.metrics import TimedAsyncQueuePool, TimedQueuePool
 
 
 class Base(DeclarativeBase):
@@ -12,16 +19,101 @@ class Base(DeclarativeBase):
 
 _settings = get_settings()
 
+
+def pool_sizes() -> tuple[int, int]:
+    """pool_size and max_overflow for each engine in this process."""
+    per_engine = max(2, _settings.db_pool_budget // (2 * max(1, _settings.web_concurrency)))
+    size = _settings.db_pool_size or max(1, per_engine // 2)
+    overflow = _settings.db_max_overflow if _settings.db_max_overflow >= 0 else max(0, per_engine - size)
+    return size, overflow
+
+
+_pool_size, _max_overflow = pool_sizes()
+
 engine = create_engine(
     _settings.database_url,
+    poolclass=TimedQueuePool,
+    pool_logging_name="primary",
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=_pool_size,
+    max_overflow=_max_overflow,
 )
 
 SessionLocal = sessionmaker(bind=engine, class_=Session, expire_on_commit=False)
 
 
+# Same URL: the psycopg (3) dialect runs in async mode under create_async_engine
+async_engine = create_async_engine(
+    _settings.database_url,
+    poolclass=TimedAsyncQueuePool,
+    pool_logging_name="primary_async",
+    pool_pre_ping=True,
+    pool_size=_pool_size,
+    max_overflow=_max_overflow,
+)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+replica_engine = async_replica_engine = None
+if _settings.database_replica_url:
+    replica_engine = create_engine(
+        _settings.database_replica_url,
+        poolclass=TimedQueuePool,
+        pool_logging_name="replica",
+        pool_pre_ping=True,
+        pool_size=_pool_size,
+        max_overflow=_max_overflow,
+    )
+    async_replica_engine = create_async_engine(
+        _settings.database_replica_url,
+        poolclass=TimedAsyncQueuePool,
+        pool_logging_name="replica_async",
+        pool_pre_ping=True,
+        pool_size=_pool_size,
+        max_overflow=_max_overflow,
+    )
+
+
+class RoutingSession(Session):
+    """Reads go to the replica while info["replica"] is set; writes and locking reads go to the primary.
+
+    Once the session has written, its later reads go to the primary too, so a
+    request always sees its own changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        writes = (
+            self._flushing
+            or isinstance(clause, (Insert, Update, Delete))
+            or getattr(clause, "_for_update_arg", None) is not None
+        )
+        if writes:
+            self.info["replica"] = False
+        elif self.info.get("replica") and replica_engine is not None:
+            return replica_engine
+        return engine
+
+
+class _AsyncRoutingSession(RoutingSession):
+    # AsyncSession drives a sync Session: it must route to the async engines' sync facades
+    def get_bind(self, mapper=None, clause=None, **kw):
+        bind = super().get_bind(mapper, clause, **kw)
+        return async_replica_engine.sync_engine if bind is replica_engine else async_engine.sync_engine
+
+
+ReadSessionLocal = sessionmaker(class_=RoutingSession, expire_on_commit=False)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession, sync_session_class=_AsyncRoutingSession, expire_on_commit=False,
+)
+
+
+def libpq_url() -> str:
+    """database_url for a raw psycopg connection (LISTEN, advisory locks), not SQLAlchemy's postgresql+psycopg://."""
+    return make_url(_settings.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
 def get_db():
     """FastAPI dependency — yields a DB session and closes it afterwards."""
     db = SessionLocal()
@@ -29,3 +121,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """FastAPI dependency for async def endpoints — never blocks the event loop."""
+    async with AsyncSessionLocal() as db:
+        yield db
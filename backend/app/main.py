@@ -5,18 +5,27 @@ from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 
 import structlog
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from apscheduler.schedulers.background import BackgroundScheduler
 
 from app.config import get_settings
-from app.database import SessionLocal, engine, Base
-from app.core import hash_password
+from app.database import SessionLocal, async_engine, async_replica_engine, engine, replica_engine, Base
+from app.core import auth_cache, hash_password, metrics, replica, revocation
+from app.core.passwords import shutdown_pool as shutdown_password_pool
 from app.models import *  # noqa: F401,F403
 from app.models.user import User, UserRole
 from app.models.tenant import Tenant, Site
 from app.models.camera import Camera
-from app.services.frigate_sync import sync_events_from_frigate
+from app.services import audit_sink, cache_bus, leader
+from app.services.audit_archive import archive_closed_partitions, ensure_partitions
+from app.services.audit_chain import build_checkpoints
+from app.services.frigate_sync import enqueue_scheduled as enqueue_frigate_sync
+from app.services.frigate_ingest import ingest_frigate_recordings
+from app.services.media_probe import probe_pending, shutdown_pool as shutdown_probe_pool
+from app.services.previews import generate_pending as generate_previews, shutdown_pool as shutdown_preview_pool
+from app.services.retention import apply_retention
+from app.services.cold_tier import transcode_pending, shutdown_pool as shutdown_cold_tier_pool
 
 log = structlog.get_logger()
 settings = get_settings()
@@ -25,17 +34,126 @@ scheduler = BackgroundScheduler()
 
 
 def _scheduled_sync():
-    """Background job: sync events from Frigate."""
+    """Background job: queue a Frigate event sync for worker.py, unless one is pending."""
     db = SessionLocal()
     try:
-        count = sync_events_from_frigate(db)
-        log.info("scheduled_sync", new_events=count)
+        if not enqueue_frigate_sync(db):
+            log.info("scheduled_sync_skipped", reason="sync job pending")
     except Exception as e:
+        db.rollback()
         log.error("scheduled_sync_error", error=str(e))
     finally:
         db.close()
 
 
+def _scheduled_ingest():
+    """Background job: index new Frigate recording segments."""
+    db = SessionLocal()
+    try:
+        result = ingest_frigate_recordings(db)
+        log.info("scheduled_ingest", **result)
+    except Exception as e:
+        db.rollback()
+        log.error("scheduled_ingest_error", error=str(e))
+    finally:
+        db.close()
+
+
+def _scheduled_probe():
+    """Background job: ffprobe new or changed recording/evidence files."""
+    db = SessionLocal()
+    try:
+        result = probe_pending(db)
+        if result["probed"]:
+            log.info("scheduled_probe", **result)
+    except Exception as e:
+        db.rollback()
+        log.error("scheduled_probe_error", error=str(e))
+    finally:
+        db.close()
+
+
+def _scheduled_previews():
+    """Background job: render poster/sprite/VTT previews for new recordings."""
+    db = SessionLocal()
+    try:
+        result = generate_previews(db)
+        if result["generated"] or result["failed"]:
+            log.info("scheduled_previews", **result)
+    except Exception as e:
+        db.rollback()
+        log.error("scheduled_previews_error", error=str(e))
+    finally:
+        db.close()
+
+
+def _scheduled_cold_tier():
+    """Background job: re-encode aged recordings to the cold-tier codec."""
+    db = SessionLocal()
+    try:
+        transcode_pending(db)
+    except Exception as e:
+        db.rollback()
+        log.error("scheduled_cold_tier_error", error=str(e))
+    finally:
+        db.close()
+
+
+def _scheduled_retention():
+    """Background job: evict recordings past their retention policy or disk limits."""
+    db = SessionLocal()
+    try:
+        report = apply_retention(db)
+        if report["recordings"]:
+            log.info("scheduled_retention", recordings=report["recordings"], bytes=report["bytes"])
+    except Exception as e:
+        db.rollback()
+        log.error("scheduled_retention_error", error=str(e))
+    finally:
+        db.close()
+
+
+def _scheduled_audit_archive():
+    """Background job: keep upcoming audit_log partitions ready and archive old months."""
+    db = SessionLocal()
+    try:
+        ensure_partitions(db)
+        result = archive_closed_partitions(db)
+        if result["archived"]:
+            log.info("scheduled_audit_archive", **result)
+    except Exception as e:
+        db.rollback()
+        log.error("scheduled_audit_archive_error", error=str(e))
+    finally:
+        db.close()
+
+
+def _scheduled_audit_checkpoint():
+    """Background job: seal complete blocks of the audit hash chain with Merkle checkpoints."""
+    db = SessionLocal()
+    try:
+        build_checkpoints(db)
+    except Exception as e:
+        db.rollback()
+        log.error("scheduled_audit_checkpoint_error", error=str(e))
+    finally:
+        db.close()
+
+
+def _scheduled_token_purge():
+    """Background job: drop revoked-token rows whose tokens have expired."""
+    db = SessionLocal()
+    try:
+        purged = revocation.purge_expired(db)
+        if purged:
+            log.info("scheduled_token_purge", purged=purged)
+    except Exception as e:
+        db.rollback()
+        log.error("scheduled_token_purge_error", error=str(e))
+    finally:
+        db.close()
+
+
 def _seed_data():
     """Create default tenant, site, admin user, and cameras if DB is empty."""
     db = SessionLocal()
@@ -98,30 +216,130 @@ async def lifespan(app: FastAPI):
     # Startup
     log.info("app_starting")
 
-    # Create tables (in prod, prefer explicit alembic upgrade)
-    try:
-        Base.metadata.create_all(bind=engine)
-    except Exception as e:
-        log.warning("create_all_warning", error=str(e))
+    # Workers boot together: one at a time through DDL and seeding
+    with leader.startup_lock():
+        # Create tables (in prod, prefer explicit alembic upgrade)
+        try:
+            Base.metadata.create_all(bind=engine)
+        except Exception as e:
+            log.warning("create_all_warning", error=str(e))
+
+        # audit_log is partitioned by month: the current partition must exist before any write
+        db = SessionLocal()
+        try:
+            ensure_partitions(db)
+        except Exception as e:
+            log.warning("audit_partitions_warning", error=str(e))
+        finally:
+            db.close()
 
-    # Seed default data
-    _seed_data()
+        # Seed default data
+        _seed_data()
 
-    # Start scheduler for Frigate polling
+    audit_sink.start()
+    revocation.start()
+    auth_cache.start()
+    cache_bus.start()
+    replica.start()
+
+    # Every worker schedules the jobs; only the elected leader runs them
     scheduler.add_job(
         _scheduled_sync,
         "interval",
         seconds=settings.frigate_poll_interval_seconds,
         id="frigate_sync",
         replace_existing=True,
+        max_instances=1,
+    )
+    # First run is the initial bulk scan; later runs resume from the watermark
+    scheduler.add_job(
+        _scheduled_ingest,
+        "interval",
+        seconds=settings.frigate_ingest_interval_seconds,
+        id="frigate_ingest",
+        replace_existing=True,
+        next_run_time=datetime.now(timezone.utc),
+        max_instances=1,
+    )
+    scheduler.add_job(
+        _scheduled_probe,
+        "interval",
+        seconds=settings.probe_interval_seconds,
+        id="media_probe",
+        replace_existing=True,
+        max_instances=1,
+    )
+    scheduler.add_job(
+        _scheduled_previews,
+        "interval",
+        seconds=settings.preview_interval_seconds,
+        id="recording_previews",
+        replace_existing=True,
+        max_instances=1,
+    )
+    scheduler.add_job(
+        _scheduled_retention,
+        "interval",
+        seconds=settings.retention_interval_seconds,
+        id="recording_retention",
+        replace_existing=True,
+        max_instances=1,
     )
-    scheduler.start()
+    scheduler.add_job(
+        _scheduled_cold_tier,
+        "interval",
+        seconds=settings.cold_tier_interval_seconds,
+        id="cold_tier",
+        replace_existing=True,
+        max_instances=1,
+    )
+    scheduler.add_job(
+        _scheduled_audit_archive,
+        "interval",
+        hours=6,
+        id="audit_archive",
+        replace_existing=True,
+        max_instances=1,
+    )
+    scheduler.add_job(
+        _scheduled_audit_checkpoint,
+        "interval",
+        seconds=settings.audit_checkpoint_interval_seconds,
+        id="audit_checkpoint",
+        replace_existing=True,
+        max_instances=1,
+    )
+    scheduler.add_job(
+        _scheduled_token_purge,
+        "interval",
+        hours=1,
+        id="token_purge",
+        replace_existing=True,
+        max_instances=1,
+    )
+    scheduler.start(paused=True)
+    leader.start(scheduler)
     log.info("scheduler_started", interval_s=settings.frigate_poll_interval_seconds)
 
     yield
 
-    # Shutdown
+    # Shutdown: release leadership first so another worker resumes the jobs
+    leader.stop()
     scheduler.shutdown(wait=False)
+    shutdown_probe_pool()
+    shutdown_preview_pool()
+    shutdown_cold_tier_pool()
+    revocation.stop()
+    auth_cache.stop()
+    cache_bus.stop()
+    replica.stop()
+    shutdown_password_pool()
+    await async_engine.dispose()
+    if async_replica_engine is not None:
+        await async_replica_engine.dispose()
+    # Last: scheduler jobs and requests above may still have queued entries
+    audit_sink.stop()
+    metrics.process_exit()
     log.info("app_stopped")
 
 
@@ -139,8 +357,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Query-Count"],
 )
 
+if settings.query_count_header:
+    from app.core import query_count
+
+    query_count.install(engine)
+    query_count.install(async_engine.sync_engine)
+    if replica.enabled():
+        query_count.install(replica_engine)
+        query_count.install(async_replica_engine.sync_engine)
+
+    @app.middleware("http")
+    async def count_queries(request, call_next):
+        with query_count.counting() as box:
+            response = await call_next(request)
+        response.headers["X-Query-Count"] = str(box[0])
+        return response
+
+
+if replica.enabled():
+
+    @app.middleware("http")
+    async def read_your_writes(request, call_next):
+        response = await call_next(request)
+        replica.mark_write(request, response)
+        return response
+
+
+if settings.metrics_enabled:
+    # Added last, so outermost: timings include the middlewares above
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.instrument(engine, "primary")
+    metrics.instrument(async_engine.sync_engine, "primary_async")
+    if replica.enabled():
+        metrics.instrument(replica_engine, "replica")
+        metrics.instrument(async_replica_engine.sync_engine, "replica_async")
+
+
 # Register routers
 from app.api.auth import router as auth_router
 from app.api.users import router as users_router
@@ -150,6 +405,8 @@ from app.api.evidence import router as evidence_router
 from app.api.audit import router as audit_router
 from app.api.backups import router as backups_router
 from app.api.recordings import router as recordings_router
+from app.api.retention import router as retention_router
+from app.api.jobs import router as jobs_router
 
 app.include_router(auth_router)
 app.include_router(users_router)
@@ -159,8 +416,24 @@ app.include_router(evidence_router)
 app.include_router(audit_router)
 app.include_router(backups_router)
 app.include_router(recordings_router)
+app.include_router(retention_router)
+app.include_router(jobs_router)
 
 
 @app.get("/api/health")
 def health():
-    return {"status": "ok", "timestamp": datetime.now(timezone.utc).isoformat()}
+    return {
+        "status": "ok",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "scheduler_leader": leader.is_leader(),
+        "replica": replica.status() if replica.enabled() else None,
+    }
+
+
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        """Prometheus scrape; covers every worker process sharing PROMETHEUS_MULTIPROC_DIR."""
+        body, content_type = metrics.render()
+        return Response(content=body, media_type=content_type)
@@ -1,8 +1,12 @@
-from app.models.user import User, MfaTotp  # noqa: F401
+from app.models.user import User, MfaTotp, RevokedToken  # noqa: F401
 from app.models.camera import Camera  # noqa: F401
-from app.models.event import Event  # noqa: F401
+from app.models.event import Event, FrigateSyncRun  # noqa: F401
 from app.models.evidence import EvidenceExport  # noqa: F401
-from app.models.audit import AuditLog  # noqa: F401
+from app.models.audit import AuditLog, AuditChainHead, AuditCheckpoint  # noqa: F401
 from app.models.backup import BackupRun  # noqa: F401
 from app.models.tenant import Tenant, Site  # noqa: F401
 from app.models.recording import Recording  # noqa: F401
+from app.models.ingest import IngestWatermark  # noqa: F401
+from app.models.media import MediaProbe, RecordingPreview, RecordingTranscode  # noqa: F401
+from app.models.retention import RetentionPolicy, StorageUsage  # noqa: F401
+from app.models.job import Job  # noqa: F401
@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import String, DateTime, ForeignKey, Text
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, SmallInteger, String, Text, func, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -12,16 +12,65 @@ from app.database import Base
 
 class AuditLog(Base):
     __tablename__ = "audit_log"
+    # Monthly partitions are created and archived by app.services.audit_archive.
+    # Composite indexes end in id to serve keyset paging on (created_at, id).
+    __table_args__ = (
+        Index("ix_audit_log_created_id", "created_at", "id"),
+        Index("ix_audit_log_actor_created", "actor_user_id", "created_at", "id"),
+        Index("ix_audit_log_action_created", "action", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     site_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("sites.id"), nullable=True)
     actor_user_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("users.id"), nullable=True)
-    action: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    action: Mapped[str] = mapped_column(String(64), nullable=False)
     resource_type: Mapped[str | None] = mapped_column(String(64), nullable=True)
     resource_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
     ip: Mapped[str | None] = mapped_column(String(45), nullable=True)
     user_agent: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Part of the key: unique constraints on a partitioned table must include the partition column
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True
+        DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc)
     )
     meta: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+
+    # Hash chain (app.services.audit_chain); NULL on rows written before chaining
+    seq: Mapped[int | None] = mapped_column(BigInteger, nullable=True, index=True)
+    prev_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
+
+# Free-text search over meta string/number values; queries must use this exact expression
+META_TSVECTOR = func.jsonb_to_tsvector(
+    text("'simple'::regconfig"), AuditLog.meta, text("'[\"string\", \"numeric\"]'::jsonb")
+)
+Index("ix_audit_log_meta_fts", META_TSVECTOR, postgresql_using="gin")
+
+
+class AuditChainHead(Base):
+    """Single row holding the last chained entry; locked by each writer batch."""
+
+    __tablename__ = "audit_chain_head"
+
+    id: Mapped[int] = mapped_column(SmallInteger, primary_key=True, default=1)
+    seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    hash: Mapped[str] = mapped_column(String(64), nullable=False)
+
+
+class AuditCheckpoint(Base):
+    """Merkle root over one fixed-size block of chained entries, itself chained by digest."""
+
+    __tablename__ = "audit_checkpoints"
+
+    block_no: Mapped[int] = mapped_column(Integer, primary_key=True)
+    first_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    last_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    first_created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    merkle_root: Mapped[str] = mapped_column(String(64), nullable=False)
+    last_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    digest: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import String, Float, Boolean, DateTime, ForeignKey, Index, Text
+from sqlalchemy import String, Float, Boolean, DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -35,3 +35,19 @@ class Event(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+
+
+class FrigateSyncRun(Base):
+    """One Frigate event sync; callers that coalesced onto it or ticks it caused to be skipped are counted here."""
+    __tablename__ = "frigate_sync_runs"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    trigger: Mapped[str] = mapped_column(String(16), nullable=False)  # scheduled | manual
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    new_events: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    joined: Mapped[int] = mapped_column(Integer, default=0)  # manual callers that shared this run's result
+    skipped_ticks: Mapped[int] = mapped_column(Integer, default=0)  # scheduled ticks dropped while it ran
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
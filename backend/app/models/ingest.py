@@ -0,0 +1,18 @@
+"""Ingest watermark model — resume point for incremental filesystem scans."""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class IngestWatermark(Base):
+    __tablename__ = "ingest_watermarks"
+
+    source: Mapped[str] = mapped_column(String(64), primary_key=True)  # e.g. "frigate_recordings"
+    position: Mapped[str] = mapped_column(String(255), nullable=False)  # source-specific cursor
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
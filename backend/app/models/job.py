@@ -0,0 +1,51 @@
+"""Background job model — durable queue claimed by worker processes (services/job_queue.py)."""
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import String, DateTime, Index, Integer, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claim order within a queue; only ready-to-claim rows are indexed
+        Index(
+            "ix_jobs_claim", "queue", text("priority DESC"), "run_at",
+            postgresql_where=text("status = 'queued'"),
+        ),
+        Index("ix_jobs_running", "queue", "heartbeat_at", postgresql_where=text("status = 'running'")),
+        # One queued/running job per dedupe key
+        Index(
+            "ux_jobs_active_key", "kind", "key", unique=True,
+            postgresql_where=text("key IS NOT NULL AND status IN ('queued', 'running')"),
+        ),
+        Index("ix_jobs_finished_at", "finished_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    queue: Mapped[str] = mapped_column(String(32), nullable=False)
+    kind: Mapped[str] = mapped_column(String(64), nullable=False)  # handler name, e.g. "recordings.simulate"
+    key: Mapped[str | None] = mapped_column(String(255), nullable=True)  # dedupe key among active jobs
+    payload: Mapped[dict] = mapped_column(JSONB, default=dict)
+    priority: Mapped[int] = mapped_column(Integer, default=0)  # higher runs first
+    status: Mapped[str] = mapped_column(String(16), default="queued")  # queued / running / completed / error
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3)
+    run_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )  # not claimable before; pushed back by retry backoff
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    worker: Mapped[str | None] = mapped_column(String(128), nullable=True)  # host:pid of the claimer
+    progress: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    result: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -0,0 +1,79 @@
+"""Media models — cached ffprobe results, generated recording previews and cold-tier transcodes."""
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import String, Float, Integer, BigInteger, DateTime, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class MediaProbe(Base):
+    __tablename__ = "media_probes"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    path: Mapped[str] = mapped_column(String(1024), nullable=False, unique=True)
+    recording_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("recordings.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    evidence_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("evidence_exports.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    # Cache key: a file is re-probed only when its size or mtime changes
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    mtime: Mapped[float] = mapped_column(Float, nullable=False)
+
+    duration_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    container: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    video_codec: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    audio_codec: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    width: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    height: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    fps: Mapped[float | None] = mapped_column(Float, nullable=True)
+    bit_rate: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    keyframes: Mapped[list | None] = mapped_column(JSONB, nullable=True)  # keyframe times in seconds
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    probed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class RecordingPreview(Base):
+    __tablename__ = "recording_previews"
+
+    recording_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("recordings.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Source size at generation time; a different Recording.size_bytes triggers a rebuild
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    interval_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    tiles: Mapped[int] = mapped_column(Integer, default=0)
+    columns: Mapped[int] = mapped_column(Integer, default=0)
+    tile_width: Mapped[int] = mapped_column(Integer, default=0)
+    tile_height: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    generated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class RecordingTranscode(Base):
+    """Outcome of moving a recording to the cold tier (one attempt per recording)."""
+
+    __tablename__ = "recording_transcodes"
+
+    recording_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("recordings.id", ondelete="CASCADE"), primary_key=True
+    )
+    codec: Mapped[str] = mapped_column(String(32), nullable=False)
+    source_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    output_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)  # None unless swapped in
+    media_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    cpu_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)  # ffmpeg user+system time
+    wall_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    transcoded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
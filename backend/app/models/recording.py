@@ -3,7 +3,7 @@
 import uuid
 from datetime import date, datetime, timezone
 
-from sqlalchemy import Column, String, Date, DateTime, ForeignKey, Integer, Boolean, Float, SmallInteger
+from sqlalchemy import BigInteger, Column, String, Date, DateTime, ForeignKey, Index, Integer, Boolean, Float, SmallInteger, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -12,15 +12,21 @@ from app.database import Base
 
 class Recording(Base):
     __tablename__ = "recordings"
+    __table_args__ = (
+        # One row per camera-hour; also the index behind camera/date/hour lookups and paging
+        UniqueConstraint("camera_id", "recording_date", "hour", name="uq_recordings_camera_date_hour"),
+        # Paging across all cameras (and date filters): same column order as the keyset
+        Index("ix_recordings_date_hour_camera", "recording_date", "hour", "camera_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     camera_id = Column(UUID(as_uuid=True), ForeignKey("cameras.id"), nullable=False)
-    recording_date = Column(Date, nullable=False, index=True)
+    recording_date = Column(Date, nullable=False)
     hour = Column(SmallInteger, nullable=False, default=0)  # 0-23, hour of the day
     filename = Column(String, nullable=False)           # relative path inside /recordings
     duration_seconds = Column(Float, nullable=True)     # duration in seconds
-    size_bytes = Column(Integer, nullable=True)
-    status = Column(String, nullable=False, default="available")  # available, processing, error
+    size_bytes = Column(BigInteger, nullable=True)
+    status = Column(String, nullable=False, default="available")  # available, processing, transcoding, error
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     camera = relationship("Camera", backref="recordings")
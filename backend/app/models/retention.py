@@ -0,0 +1,85 @@
+"""Retention models — per-camera retention policies and the recordings storage-usage index."""
+
+import uuid
+from datetime import date, datetime, timezone
+
+from sqlalchemy import BigInteger, Date, DateTime, ForeignKey, Integer, event, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class RetentionPolicy(Base):
+    __tablename__ = "retention_policies"
+
+    camera_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("cameras.id", ondelete="CASCADE"), primary_key=True
+    )
+    # None falls back to the retention_* settings; 0 disables the limit
+    max_age_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    max_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class StorageUsage(Base):
+    """Bytes of local recordings per camera-day, maintained by a trigger on recordings."""
+
+    __tablename__ = "storage_usage"
+
+    camera_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("cameras.id", ondelete="CASCADE"), primary_key=True
+    )
+    recording_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    bytes: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    recordings: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# Frigate-indexed rows are skipped: their files live on Frigate's volume and its own
+# retention frees them. Mirrored in alembic 003_storage_usage.
+STORAGE_USAGE_TRIGGER = """
+CREATE OR REPLACE FUNCTION recordings_storage_usage() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.filename NOT LIKE 'frigate:%' THEN
+        UPDATE storage_usage
+           SET bytes = bytes - COALESCE(OLD.size_bytes, 0), recordings = recordings - 1
+         WHERE camera_id = OLD.camera_id AND recording_date = OLD.recording_date;
+        DELETE FROM storage_usage
+         WHERE camera_id = OLD.camera_id AND recording_date = OLD.recording_date AND recordings <= 0;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.filename NOT LIKE 'frigate:%' THEN
+        INSERT INTO storage_usage (camera_id, recording_date, bytes, recordings)
+        VALUES (NEW.camera_id, NEW.recording_date, COALESCE(NEW.size_bytes, 0), 1)
+        ON CONFLICT (camera_id, recording_date) DO UPDATE
+           SET bytes = storage_usage.bytes + EXCLUDED.bytes,
+               recordings = storage_usage.recordings + 1;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_recordings_storage_usage
+AFTER INSERT OR DELETE OR UPDATE OF camera_id, recording_date, size_bytes, filename ON recordings
+FOR EACH ROW EXECUTE FUNCTION recordings_storage_usage();
+"""
+
+STORAGE_USAGE_BACKFILL = """
+INSERT INTO storage_usage (camera_id, recording_date, bytes, recordings)
+SELECT camera_id, recording_date, COALESCE(SUM(size_bytes), 0), COUNT(*)
+FROM recordings
+WHERE filename NOT LIKE 'frigate:%'
+GROUP BY camera_id, recording_date
+ON CONFLICT (camera_id, recording_date) DO UPDATE
+   SET bytes = EXCLUDED.bytes, recordings = EXCLUDED.recordings
+"""
+
+
+def _install_trigger(target, connection, **kw):
+    # Runs after every create_all; both statements are idempotent
+    connection.execute(text(STORAGE_USAGE_TRIGGER))
+    if kw.get("tables") and StorageUsage.__table__ in kw["tables"]:
+        connection.execute(text(STORAGE_USAGE_BACKFILL))
+
+
+event.listen(Base.metadata, "after_create", _install_trigger)
@@ -15,10 +15,30 @@ class AuditOut(BaseModel):
     ip: str | None = None
     created_at: datetime
     meta: dict | None = None
+    seq: int | None = None
+    hash: str | None = None
 
     model_config = {"from_attributes": True}
 
 
+class AuditBrokenLink(BaseModel):
+    seq: int | None = None
+    id: uuid.UUID | None = None
+    created_at: datetime | None = None
+    block_no: int | None = None
+    reason: str
+
+
+class AuditVerifyOut(BaseModel):
+    ok: bool | None  # None: checkpoints_only found no break but did not read every row
+    checkpoints_only: bool
+    blocks: int
+    archived_blocks: int
+    rows_checked: int
+    unchained_rows: int
+    first_broken: AuditBrokenLink | None = None
+
+
 class BackupRunOut(BaseModel):
     id: uuid.UUID
     started_at: datetime
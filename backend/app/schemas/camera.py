@@ -1,7 +1,7 @@
 """Camera schemas."""
 
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import BaseModel
 
 
@@ -28,3 +28,16 @@ class CameraOut(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class TimelineDay(BaseModel):
+    date: date
+    hours: int  # bitmap: bit h set when hour h has a recording
+    events: dict[str, list[tuple[int, int]]]  # label -> merged [start, end] seconds since local midnight
+
+
+class TimelineOut(BaseModel):
+    camera_id: uuid.UUID
+    from_date: date
+    to_date: date
+    days: list[TimelineDay]
@@ -33,3 +33,42 @@ class EventListParams(BaseModel):
     to_dt: datetime | None = None
     limit: int = 50
     offset: int = 0
+
+
+class EventRecordingOut(BaseModel):
+    """Where an event starts inside the hourly recordings (recording_id is None if uncovered)."""
+    event_id: uuid.UUID
+    recording_id: uuid.UUID | None = None
+    offset_seconds: float | None = None
+
+
+class EventRecordingLookup(BaseModel):
+    event_ids: list[uuid.UUID]
+
+
+class SyncRunOut(BaseModel):
+    id: uuid.UUID
+    trigger: str
+    started_at: datetime
+    finished_at: datetime | None = None
+    new_events: int | None = None
+    joined: int
+    skipped_ticks: int
+    error: str | None = None
+
+    model_config = {"from_attributes": True}
+
+
+class EventSyncOut(BaseModel):
+    """`shared` is true when this call waited for a sync already in flight instead of starting one."""
+    synced: int
+    shared: bool
+    run: SyncRunOut
+
+
+class SyncStatusOut(BaseModel):
+    in_flight: bool  # in this worker process
+    runs: int  # counters since this process started
+    joined: int
+    skipped_ticks: int
+    recent: list[SyncRunOut]
@@ -0,0 +1,43 @@
+"""Background job schemas."""
+
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class JobOut(BaseModel):
+    id: uuid.UUID
+    queue: str
+    kind: str
+    key: str | None = None
+    status: str  # queued, running, completed, error
+    priority: int
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    worker: str | None = None
+    progress: dict | None = None
+    result: dict | None = None
+    error: str | None = None
+
+    model_config = {"from_attributes": True}
+
+
+class QueueStatsOut(BaseModel):
+    """Depth now; throughput and latency over the last hour (wait = ready until claimed)."""
+    queue: str
+    limit: int | None = None  # max running jobs across all workers
+    ready: int
+    delayed: int  # waiting out a retry backoff
+    running: int
+    completed_1h: int
+    failed_1h: int
+    oldest_ready_seconds: float | None = None
+    wait_p50_ms: float | None = None
+    wait_p95_ms: float | None = None
+    run_p50_ms: float | None = None
+    run_p95_ms: float | None = None
@@ -27,3 +27,51 @@ class RecordingUpload(BaseModel):
     recording_date: date
     hour: int = 0
     duration_seconds: Optional[float] = None
+
+
+class RecordingJobOut(BaseModel):
+    id: str
+    kind: str
+    status: str  # queued, running, completed, error
+    total: int
+    done: int
+    failed: int
+    created: int
+    params: dict = {}
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class MediaProbeOut(BaseModel):
+    """ffprobe metadata for a recording or evidence file."""
+    duration_seconds: Optional[float] = None
+    container: Optional[str] = None
+    video_codec: Optional[str] = None
+    audio_codec: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    bit_rate: Optional[int] = None
+    keyframes: Optional[list[float]] = None
+    size_bytes: int
+    error: Optional[str] = None
+    probed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ColdTierStats(BaseModel):
+    """Totals over recordings moved to the cold tier."""
+    codec: str
+    transcoded: int
+    not_transcoded: int  # attempted but kept original (failed, already efficient, too little saving)
+    source_bytes: int
+    output_bytes: int
+    saved_bytes: int
+    media_seconds: float
+    cpu_seconds: float
+    realtime_per_core: Optional[float] = None  # seconds of video encoded per CPU second
+    source_mb_per_core_second: Optional[float] = None
@@ -0,0 +1,47 @@
+"""Retention schemas."""
+
+import uuid
+from datetime import date
+from pydantic import BaseModel, Field
+
+
+class RetentionPolicyIn(BaseModel):
+    # None = use the server default; 0 = no limit
+    max_age_days: int | None = Field(None, ge=0)
+    max_bytes: int | None = Field(None, ge=0)
+
+
+class RetentionPolicyOut(BaseModel):
+    camera_id: uuid.UUID
+    camera: str
+    max_age_days: int  # effective values after defaults
+    max_bytes: int
+    usage_bytes: int
+
+
+class RetentionStats(BaseModel):
+    recordings: int
+    bytes: int
+    protected: int  # evictable by policy but covering exported evidence
+    oldest: date | None
+    newest: date | None
+
+
+class RetentionCameraReport(RetentionStats):
+    camera_id: uuid.UUID
+    camera: str
+    usage_bytes: int
+    max_age_days: int
+    max_bytes: int
+
+
+class RetentionOverallReport(RetentionStats):
+    need_bytes: int  # over the total quota or under the free-space floor
+
+
+class RetentionReport(BaseModel):
+    dry_run: bool
+    recordings: int
+    bytes: int
+    cameras: list[RetentionCameraReport]
+    overall: RetentionOverallReport
@@ -0,0 +1,237 @@
+"""Audit archive — monthly audit_log partitions and their compressed archives.
+
+audit_log is range-partitioned by UTC month. ensure_partitions() keeps the current
+and next month attached. archive_closed_partitions() exports months older than
+audit_hot_months to <audit_archive_dir>/audit_log_YYYY_MM.jsonl.gz (newest row
+first), records the file's SHA-256 and row count in manifest.json, re-reads it to
+verify, and only then drops the partition. search_archives() streams archived
+months for /api/audit.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Iterator
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+
+log = structlog.get_logger()
+settings = get_settings()
+
+PARTITION_RE = re.compile(r"^audit_log_(\d{4})_(\d{2})$")
+MANIFEST = "manifest.json"
+STREAM_ROWS = 2000
+TOKEN_RE = re.compile(r"\w+")
+
+
+def month_start(dt: datetime) -> datetime:
+    dt = dt.astimezone(timezone.utc)
+    return datetime(dt.year, dt.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, n: int) -> datetime:
+    y, m = divmod(month.year * 12 + month.month - 1 + n, 12)
+    return datetime(y, m + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month: datetime) -> str:
+    return f"audit_log_{month:%Y_%m}"
+
+
+def is_partitioned(db: Session) -> bool:
+    kind = db.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass('audit_log')")).scalar()
+    return kind == "p"
+
+
+def attached_months(db: Session) -> list[datetime]:
+    names = db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'audit_log'::regclass"
+        )
+    ).scalars()
+    months = []
+    for name in names:
+        m = PARTITION_RE.match(name)
+        if m:
+            months.append(datetime(int(m.group(1)), int(m.group(2)), 1, tzinfo=timezone.utc))
+    return sorted(months)
+
+
+def ensure_partitions(db: Session, ahead: int = 1) -> list[str]:
+    """Create the DEFAULT partition and monthly partitions through `ahead` months from now."""
+    if not is_partitioned(db):
+        log.warning("audit_log_not_partitioned", hint="run alembic upgrade head")
+        return []
+    db.execute(text("CREATE TABLE IF NOT EXISTS audit_log_default PARTITION OF audit_log DEFAULT"))
+    existing = set(attached_months(db))
+    created = []
+    this_month = month_start(datetime.now(timezone.utc))
+    for i in range(ahead + 1):
+        m = add_months(this_month, i)
+        if m in existing:
+            continue
+        name = partition_name(m)
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF audit_log "
+            f"FOR VALUES FROM ('{m.isoformat()}') TO ('{add_months(m, 1).isoformat()}')"
+        ))
+        created.append(name)
+    db.commit()
+    if created:
+        log.info("audit_partitions_created", partitions=created)
+    return created
+
+
+def load_manifest() -> dict:
+    try:
+        with open(os.path.join(settings.audit_archive_dir, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"months": {}}
+
+
+def _save_manifest(manifest: dict) -> None:
+    path = os.path.join(settings.audit_archive_dir, MANIFEST)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+
+
+def _json_default(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(type(value))
+
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _archive_month(db: Session, month: datetime) -> dict:
+    name = partition_name(month)
+    path = os.path.join(settings.audit_archive_dir, f"{name}.jsonl.gz")
+    tmp = f"{path}.tmp"
+    rows = 0
+    newest = oldest = None
+    result = db.execute(
+        text(f"SELECT * FROM {name} ORDER BY created_at DESC, id DESC").execution_options(yield_per=STREAM_ROWS)
+    ).mappings()
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        for row in result:
+            f.write(json.dumps(dict(row), default=_json_default, separators=(",", ":")) + "\n")
+            rows += 1
+            newest = newest or row["created_at"]
+            oldest = row["created_at"]
+
+    # Read back before anything is dropped
+    with gzip.open(tmp, "rt", encoding="utf-8") as f:
+        if sum(1 for _ in f) != rows:
+            os.remove(tmp)
+            raise RuntimeError(f"archive of {name} failed verification")
+    os.replace(tmp, path)
+    return {
+        "file": os.path.basename(path),
+        "sha256": _file_sha256(path),
+        "bytes": os.path.getsize(path),
+        "rows": rows,
+        "from": month.isoformat(),
+        "to": add_months(month, 1).isoformat(),
+        "newest": newest.isoformat() if newest else None,
+        "oldest": oldest.isoformat() if oldest else None,
+        "archived_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def archive_closed_partitions(db: Session) -> dict:
+    """Export and drop monthly partitions older than audit_hot_months."""
+    if not is_partitioned(db):
+        return {"archived": [], "rows": 0}
+    os.makedirs(settings.audit_archive_dir, exist_ok=True)
+    cutoff = add_months(month_start(datetime.now(timezone.utc)), -settings.audit_hot_months)
+    manifest = load_manifest()
+    archived, total = [], 0
+    for month in attached_months(db):
+        if month >= cutoff:
+            break
+        name = partition_name(month)
+        entry = _archive_month(db, month)
+        # Manifest first: a crash before the drop leaves a duplicate month, never a lost one
+        manifest["months"][f"{month:%Y_%m}"] = entry
+        _save_manifest(manifest)
+        db.execute(text(f"ALTER TABLE audit_log DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+        archived.append(name)
+        total += entry["rows"]
+        log.info("audit_partition_archived", partition=name, rows=entry["rows"], bytes=entry["bytes"])
+    return {"archived": archived, "rows": total}
+
+
+def _meta_matches(meta: dict | None, terms: list[str]) -> bool:
+    """Approximates the meta full-text match of the live table: every term is a value token."""
+    tokens = set()
+    stack = [meta]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            tokens.update(TOKEN_RE.findall(str(value).lower()))
+    return all(t in tokens for t in terms)
+
+
+def search_archives(
+    from_dt: datetime | None = None,
+    to_dt: datetime | None = None,
+    action: str | None = None,
+    actor: str | None = None,
+    q: str | None = None,
+    before: tuple[datetime, str] | None = None,
+) -> Iterator[dict]:
+    """Stream archived rows matching the filters, newest first, optionally after a (created_at, id) key."""
+    terms = TOKEN_RE.findall(q.lower()) if q else []
+    if before:
+        to_dt = min(to_dt, before[0]) if to_dt else before[0]
+    months = sorted(load_manifest()["months"].values(), key=lambda m: m["from"], reverse=True)
+    for entry in months:
+        if from_dt and datetime.fromisoformat(entry["to"]) <= from_dt:
+            break
+        if to_dt and datetime.fromisoformat(entry["from"]) > to_dt:
+            continue
+        with gzip.open(os.path.join(settings.audit_archive_dir, entry["file"]), "rt", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                created = datetime.fromisoformat(row["created_at"])
+                if to_dt and created > to_dt:
+                    continue
+                if from_dt and created < from_dt:
+                    break
+                if before and (created, row["id"]) >= before:
+                    continue
+                if action and row["action"] != action:
+                    continue
+                if actor and row["actor_user_id"] != actor:
+                    continue
+                if terms and not _meta_matches(row.get("meta"), terms):
+                    continue
+                row["created_at"] = created
+                yield row
@@ -0,0 +1,282 @@
+"""Audit chain — tamper-evident audit_log.
+
+Every entry written through the audit sink gets a sequence number and
+hash = SHA-256(prev_hash || canonical row), so editing, deleting or reordering any
+entry breaks every later link. Writers serialize on the audit_chain_head row, which
+keeps one chain across processes.
+
+Every audit_block_size entries, build_checkpoints() stores a checkpoint: the Merkle
+root of the block's hashes, the block's last hash, and a digest chained to the
+previous checkpoint. verify() checks a time range by walking the checkpoint digests
+and rehashing every row of each overlapping block against its Merkle root, then the
+unsealed tail (O(rows in range)). checkpoints_only=True reads just the checkpoints
+and the two boundary rows of each block (O(blocks)); it catches a rewritten chain
+but not an interior edit or deletion, so it reports ok=None rather than True.
+"""
+
+import hashlib
+import json
+import uuid
+from datetime import datetime, timezone
+
+import structlog
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.audit import AuditChainHead, AuditCheckpoint, AuditLog
+from app.services.audit_archive import load_manifest
+
+log = structlog.get_logger()
+settings = get_settings()
+
+GENESIS = "0" * 64
+# Columns covered by the hash; seq is bound in too so entries can't be reordered
+HASHED_FIELDS = (
+    "seq", "id", "created_at", "site_id", "actor_user_id", "action",
+    "resource_type", "resource_id", "ip", "user_agent", "meta",
+)
+
+
+def _norm(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+    return value
+
+
+def canonical(row) -> bytes:
+    """Stable encoding of an entry, whether it is a dict or an AuditLog row."""
+    get = row.get if isinstance(row, dict) else lambda k: getattr(row, k)
+    payload = {k: _norm(get(k)) for k in HASHED_FIELDS}
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+
+def entry_hash(prev_hash: str, row) -> str:
+    return hashlib.sha256(bytes.fromhex(prev_hash) + canonical(row)).hexdigest()
+
+
+def merkle_root(hashes: list[str]) -> str:
+    level = [bytes.fromhex(h) for h in hashes] or [bytes.fromhex(GENESIS)]
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [hashlib.sha256(level[i] + level[i + 1]).digest() for i in range(0, len(level), 2)]
+    return level[0].hex()
+
+
+def checkpoint_digest(prev_digest: str, cp: AuditCheckpoint) -> str:
+    data = f"{prev_digest}|{cp.block_no}|{cp.first_seq}|{cp.last_seq}|{cp.merkle_root}|{cp.last_hash}"
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def append(db: Session, rows: list[dict]) -> None:
+    """
+    Assign seq, prev_hash and hash to rows (in order) inside the caller's transaction.
+    Holds the chain head lock until the caller commits.
+    """
+    db.execute(
+        pg_insert(AuditChainHead).values(id=1, seq=0, hash=GENESIS).on_conflict_do_nothing(index_elements=["id"])
+    )
+    head = db.query(AuditChainHead).filter(AuditChainHead.id == 1).with_for_update().one()
+    seq, prev = head.seq, head.hash
+    for row in rows:
+        seq += 1
+        row["seq"] = seq
+        row["prev_hash"] = prev
+        row["hash"] = prev = entry_hash(prev, row)
+    head.seq, head.hash = seq, prev
+
+
+# --- Checkpoints ---
+
+
+def _block_range(block_no: int) -> tuple[int, int]:
+    size = settings.audit_block_size
+    return block_no * size + 1, (block_no + 1) * size
+
+
+def _check_rows(rows: list[AuditLog], prev_hash: str, first_seq: int) -> dict | None:
+    """First broken link in consecutive rows starting at first_seq, or None."""
+    expected_seq = first_seq
+    for row in rows:
+        if row.seq != expected_seq:
+            return _broken(row, f"sequence gap: expected {expected_seq}")
+        if row.prev_hash != prev_hash:
+            return _broken(row, "prev_hash does not match the previous entry")
+        if entry_hash(prev_hash, row) != row.hash:
+            return _broken(row, "entry content does not match its hash")
+        prev_hash = row.hash
+        expected_seq += 1
+    return None
+
+
+def _broken(row: AuditLog | None, reason: str, seq: int | None = None, block_no: int | None = None) -> dict:
+    return {
+        "seq": row.seq if row is not None else seq,
+        "id": row.id if row is not None else None,
+        "created_at": row.created_at if row is not None else None,
+        "block_no": block_no,
+        "reason": reason,
+    }
+
+
+def _block_rows(db: Session, first_seq: int, last_seq: int) -> list[AuditLog]:
+    return (
+        db.query(AuditLog)
+        .filter(AuditLog.seq.between(first_seq, last_seq))
+        .order_by(AuditLog.seq)
+        .all()
+    )
+
+
+def build_checkpoints(db: Session) -> int:
+    """Seal every complete block not yet checkpointed; stops at the first broken block."""
+    last = db.query(AuditCheckpoint).order_by(AuditCheckpoint.block_no.desc()).first()
+    head_seq = db.query(AuditChainHead.seq).filter(AuditChainHead.id == 1).scalar() or 0
+    block_no = last.block_no + 1 if last else 0
+    prev_digest = last.digest if last else GENESIS
+    prev_hash = last.last_hash if last else GENESIS
+    built = 0
+    while True:
+        first_seq, last_seq = _block_range(block_no)
+        if last_seq > head_seq:
+            break
+        rows = _block_rows(db, first_seq, last_seq)
+        if len(rows) != last_seq - first_seq + 1:
+            log.error("audit_chain_broken", block_no=block_no, reason="missing entries")
+            break
+        broken = _check_rows(rows, prev_hash, first_seq)
+        if broken:
+            log.error("audit_chain_broken", block_no=block_no, **{k: str(v) for k, v in broken.items()})
+            break
+        cp = AuditCheckpoint(
+            block_no=block_no, first_seq=first_seq, last_seq=last_seq,
+            first_created_at=min(r.created_at for r in rows),
+            last_created_at=max(r.created_at for r in rows),
+            merkle_root=merkle_root([r.hash for r in rows]), last_hash=rows[-1].hash,
+        )
+        cp.digest = checkpoint_digest(prev_digest, cp)
+        db.add(cp)
+        db.commit()
+        prev_digest, prev_hash = cp.digest, cp.last_hash
+        block_no += 1
+        built += 1
+    if built:
+        log.info("audit_checkpoints_built", blocks=built, last_block=block_no - 1)
+    return built
+
+
+# --- Verification ---
+
+
+def _archived_until() -> datetime | None:
+    """End of the newest month moved out of audit_log by audit_archive."""
+    months = load_manifest()["months"].values()
+    return max((datetime.fromisoformat(m["to"]) for m in months), default=None)
+
+
+def _row_at(db: Session, seq: int) -> AuditLog | None:
+    return db.query(AuditLog).filter(AuditLog.seq == seq).first()
+
+
+def verify(
+    db: Session,
+    from_dt: datetime | None = None,
+    to_dt: datetime | None = None,
+    checkpoints_only: bool = False,
+) -> dict:
+    """
+    Verify the chain over [from_dt, to_dt] (whole blocks overlapping it).
+    Returns counts and the first broken link, or first_broken=None.
+    Blocks reaching into archived months are checked at checkpoint level only.
+    """
+    report = {
+        "ok": True, "checkpoints_only": checkpoints_only, "blocks": 0, "archived_blocks": 0,
+        "rows_checked": 0, "first_broken": None,
+        "unchained_rows": db.query(func.count()).select_from(AuditLog).filter(AuditLog.seq.is_(None)).scalar(),
+    }
+
+    def fail(broken: dict) -> dict:
+        report["ok"] = False
+        report["first_broken"] = broken
+        log.warning("audit_verify_failed", **{k: str(v) for k, v in broken.items()})
+        return report
+
+    q = db.query(AuditCheckpoint)
+    if from_dt:
+        q = q.filter(AuditCheckpoint.last_created_at >= from_dt)
+    if to_dt:
+        q = q.filter(AuditCheckpoint.first_created_at <= to_dt)
+    checkpoints = q.order_by(AuditCheckpoint.block_no).all()
+
+    prev = None
+    if checkpoints and checkpoints[0].block_no > 0:
+        prev = db.get(AuditCheckpoint, checkpoints[0].block_no - 1)
+        if prev is None:
+            return fail(_broken(None, "previous checkpoint missing", block_no=checkpoints[0].block_no - 1))
+    prev_digest = prev.digest if prev else GENESIS
+    prev_hash = prev.last_hash if prev else GENESIS
+    expected_block = checkpoints[0].block_no if checkpoints else None
+
+    archived_until = _archived_until()
+    for cp in checkpoints:
+        if cp.block_no != expected_block:
+            return fail(_broken(None, "checkpoint missing", block_no=expected_block))
+        if checkpoint_digest(prev_digest, cp) != cp.digest:
+            return fail(_broken(None, "checkpoint digest mismatch", seq=cp.first_seq, block_no=cp.block_no))
+        report["blocks"] += 1
+        prev_digest, expected_block = cp.digest, cp.block_no + 1
+
+        if archived_until and cp.first_created_at < archived_until:
+            # Rows (partly) moved to archive files: only the checkpoint chain is checked
+            report["archived_blocks"] += 1
+        elif not checkpoints_only:
+            rows = _block_rows(db, cp.first_seq, cp.last_seq)
+            broken = _check_rows(rows, prev_hash, cp.first_seq)
+            if broken is None and len(rows) != cp.last_seq - cp.first_seq + 1:
+                broken = _broken(None, "entries missing", seq=(rows[-1].seq + 1) if rows else cp.first_seq)
+            if broken is None and merkle_root([r.hash for r in rows]) != cp.merkle_root:
+                broken = _broken(None, "block Merkle root mismatch", seq=cp.first_seq)
+            if broken:
+                broken["block_no"] = cp.block_no
+                return fail(broken)
+            report["rows_checked"] += len(rows)
+        else:
+            # Rewriting the chain from an edited entry changes the block's last hash;
+            # interior rows are not read, so their contents stay unverified
+            first, last = _row_at(db, cp.first_seq), _row_at(db, cp.last_seq)
+            for row, seq in ((first, cp.first_seq), (last, cp.last_seq)):
+                if row is None:
+                    return fail(_broken(None, "entry missing", seq=seq, block_no=cp.block_no))
+                if entry_hash(row.prev_hash, row) != row.hash:
+                    return fail(_broken(row, "entry content does not match its hash", block_no=cp.block_no))
+            if first.prev_hash != prev_hash:
+                return fail(_broken(first, "prev_hash does not match the previous block", block_no=cp.block_no))
+            if last.hash != cp.last_hash:
+                return fail(_broken(last, "block last hash does not match checkpoint", block_no=cp.block_no))
+            report["rows_checked"] += 2
+        prev_hash = cp.last_hash
+
+    # Unsealed tail: rows after the last checkpoint, always rehashed in full
+    latest = db.query(AuditCheckpoint).order_by(AuditCheckpoint.block_no.desc()).first()
+    if latest is None or to_dt is None or to_dt >= latest.last_created_at:
+        prev_hash = latest.last_hash if latest else GENESIS
+        tail_start = latest.last_seq + 1 if latest else 1
+        head = db.get(AuditChainHead, 1)
+        if head is not None and head.seq >= tail_start:
+            rows = _block_rows(db, tail_start, head.seq)
+            broken = _check_rows(rows, prev_hash, tail_start)
+            if broken is None and len(rows) != head.seq - tail_start + 1:
+                broken = _broken(None, "entries missing", seq=(rows[-1].seq + 1) if rows else tail_start)
+            if broken is None and rows[-1].hash != head.hash:
+                broken = _broken(rows[-1], "latest entry does not match the chain head")
+            if broken:
+                return fail(broken)
+            report["rows_checked"] += len(rows)
+
+    if checkpoints_only:
+        report["ok"] = None
+    return report
@@ -0,0 +1,219 @@
+"""Audit sink — batch audit_log inserts off the request path.
+
+Entries are queued in memory and bulk-inserted by one writer thread once
+audit_batch_size entries are waiting or audit_flush_seconds have passed. Durable
+(sync) entries go through the same writer but wake it immediately, and the caller
+waits until their batch is committed. A failed write is reported to durable callers
+at once and retried with backoff for the rest; entries still unwritten after that
+are queued again. Pending entries are flushed on stop().
+Each batch is appended to the hash chain (audit_chain) in the same transaction.
+
+submit() can block briefly when the queue is full (then writes inline), so async
+endpoints call audit() through run_in_threadpool.
+"""
+
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import structlog
+from sqlalchemy import insert
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.audit import AuditLog
+from app.services import audit_chain
+
+log = structlog.get_logger()
+settings = get_settings()
+
+RETRY_BACKOFF_SECONDS = (0.5, 1, 2, 5)
+SYNC_TIMEOUT_SECONDS = 10
+
+
+class _Pending:
+    __slots__ = ("row", "done", "error")
+
+    def __init__(self, row: dict, durable: bool):
+        self.row = row
+        self.done = threading.Event() if durable else None
+        self.error: Exception | None = None
+
+
+_queue: queue.Queue[_Pending | None] = queue.Queue(maxsize=settings.audit_queue_max)
+_wake = threading.Event()
+_thread: threading.Thread | None = None
+_stopping = False
+_lock = threading.Lock()
+
+
+def _write(batch: list[_Pending]) -> None:
+    db = SessionLocal()
+    try:
+        rows = [p.row for p in batch]
+        audit_chain.append(db, rows)
+        db.execute(insert(AuditLog), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _report(batch: list[_Pending], error: Exception | None) -> None:
+    for p in batch:
+        p.error = error
+        if p.done:
+            p.done.set()
+
+
+def _requeue(batch: list[_Pending]) -> None:
+    """Put entries that exhausted their retries back at the end of the queue, or drop them."""
+    dropped = 0
+    for p in batch:
+        try:
+            if _stopping or _thread is None:
+                raise queue.Full
+            _queue.put_nowait(p)
+        except queue.Full:
+            dropped += 1
+    if dropped:
+        log.error("audit_entries_dropped", entries=dropped)
+
+
+def _write_with_retry(batch: list[_Pending]) -> None:
+    for attempt, delay in enumerate((*RETRY_BACKOFF_SECONDS, None)):
+        try:
+            _write(batch)
+            _report(batch, None)
+            return
+        except Exception as e:
+            log.error("audit_flush_error", entries=len(batch), attempt=attempt + 1, error=str(e))
+            # Durable callers are waiting: report to them now and keep retrying the rest
+            durable = [p for p in batch if p.done]
+            if durable:
+                _report(durable, e)
+                batch = [p for p in batch if not p.done]
+                if not batch:
+                    return
+            if delay is None or _stopping:
+                break
+            time.sleep(delay)
+    _requeue(batch)
+
+
+def _run() -> None:
+    while True:
+        try:
+            first = _queue.get(timeout=settings.audit_flush_seconds)
+        except queue.Empty:
+            if _stopping:
+                return
+            continue
+        if first is None:
+            return
+        batch = [first]
+        deadline = time.monotonic() + settings.audit_flush_seconds
+        stop = False
+        while len(batch) < settings.audit_batch_size and not (batch[-1].done or _wake.is_set()):
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = _queue.get(timeout=min(timeout, 0.05))
+            except queue.Empty:
+                continue
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+        _wake.clear()
+        # Take whatever else is already queued so a durable entry never waits behind a batch
+        while len(batch) < settings.audit_batch_size:
+            try:
+                item = _queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+        _write_with_retry(batch)
+        if stop:
+            _drain()
+            return
+
+
+def _drain() -> None:
+    batch = []
+    while True:
+        try:
+            item = _queue.get_nowait()
+        except queue.Empty:
+            break
+        if item is not None:
+            batch.append(item)
+        if len(batch) >= settings.audit_batch_size:
+            _write_with_retry(batch)
+            batch = []
+    if batch:
+        _write_with_retry(batch)
+
+
+def start() -> None:
+    global _thread, _stopping
+    with _lock:
+        if _thread is None:
+            _stopping = False
+            _thread = threading.Thread(target=_run, name="audit-sink", daemon=True)
+            _thread.start()
+
+
+def stop(timeout: float = 10.0) -> None:
+    """Flush everything queued and stop the writer thread."""
+    global _thread, _stopping
+    with _lock:
+        thread, _thread = _thread, None
+    if thread is None:
+        _drain()
+        return
+    _stopping = True
+    _queue.put(None)
+    thread.join(timeout)
+    log.info("audit_sink_stopped", pending=_queue.qsize())
+
+
+def submit(row: dict, durable: bool = False) -> None:
+    """
+    Queue one audit_log row (dict of AuditLog columns).
+    With durable=True, return only once it is committed; raises RuntimeError if it was not.
+    """
+    row.setdefault("id", uuid.uuid4())
+    row.setdefault("created_at", datetime.now(timezone.utc))
+    pending = _Pending(row, durable)
+
+    queued = False
+    if _thread is not None:
+        try:
+            _queue.put(pending, timeout=1 if durable else 0.1)
+            queued = True
+        except queue.Full:
+            # Writer can't keep up (database down or slow): apply backpressure here
+            log.warning("audit_queue_full", size=_queue.qsize())
+
+    if not queued:
+        # No writer (CLI, before startup) or queue full: write inline
+        try:
+            _write([pending])
+        except Exception as e:
+            if durable:
+                raise RuntimeError("Audit entry could not be written") from e
+            log.error("audit_write_error", error=str(e))
+        return
+
+    if durable:
+        _wake.set()
+        if not pending.done.wait(SYNC_TIMEOUT_SECONDS):
+            raise RuntimeError("Audit entry was not committed in time")
+        if pending.error is not None:
+            raise RuntimeError("Audit entry could not be written") from pending.error
@@ -0,0 +1,99 @@
+"""Cache bus — tells other processes that recordings changed so they drop stale caches.
+
+seek_index and timeline are per-process caches kept current by the code path that
+changes recordings, which only reaches the process it runs in. With several API
+workers, the scheduler leader and worker.py jobs all writing recordings, each
+writer also executes recordings_changed() in its transaction; the pg_notify is
+delivered on commit, and every other process's listener re-reads that camera-day into
+its seek index and drops the timeline day (or drops the camera's caches when no day is
+given). A listener that (re)connects drops everything, since it may have missed messages.
+"""
+
+import threading
+import uuid
+from datetime import date
+
+import psycopg
+import structlog
+from sqlalchemy import Select, func, select
+
+from app.database import SessionLocal, libpq_url
+from app.services import seek_index, timeline
+
+log = structlog.get_logger()
+
+CHANNEL = "recordings_changed"
+LISTEN_POLL_SECONDS = 5
+RECONNECT_SECONDS = (1, 2, 5, 10, 30)
+
+# Own notifications are skipped: this process already updated its caches in place
+_ORIGIN = uuid.uuid4().hex[:12]
+_thread: threading.Thread | None = None
+_stopping = threading.Event()
+
+
+def recordings_changed(camera_id: uuid.UUID | None = None, day: date | None = None) -> Select:
+    """Statement to execute before committing a recordings change; camera_id None means any camera."""
+    payload = f"{_ORIGIN}|{camera_id or '*'}|{day.isoformat() if day else ''}"
+    return select(func.pg_notify(CHANNEL, payload))
+
+
+def _apply(payload: str) -> None:
+    origin, _, rest = payload.partition("|")
+    if origin == _ORIGIN:
+        return
+    camera, _, day = rest.partition("|")
+    if camera == "*":
+        seek_index.drop()
+        timeline.invalidate()
+        return
+    camera_id = uuid.UUID(camera)
+    if not day:
+        seek_index.drop(camera_id)
+        timeline.invalidate(camera_id)
+        return
+    changed = date.fromisoformat(day)
+    timeline.invalidate(camera_id, changed)
+    db = SessionLocal()
+    try:
+        seek_index.refresh_day(db, camera_id, changed)
+    except Exception:
+        seek_index.drop(camera_id)
+        raise
+    finally:
+        db.close()
+
+
+def _listen() -> None:
+    attempt = 0
+    while not _stopping.is_set():
+        try:
+            with psycopg.connect(libpq_url(), autocommit=True) as conn:
+                conn.execute(f"LISTEN {CHANNEL}")
+                seek_index.drop()
+                timeline.invalidate()
+                attempt = 0
+                while not _stopping.is_set():
+                    for notify in conn.notifies(timeout=LISTEN_POLL_SECONDS):
+                        _apply(notify.payload)
+        except Exception as e:
+            delay = RECONNECT_SECONDS[min(attempt, len(RECONNECT_SECONDS) - 1)]
+            attempt += 1
+            log.warning("cache_bus_listener_error", error=str(e), retry_in=delay)
+            _stopping.wait(delay)
+
+
+def start() -> None:
+    global _thread
+    if _thread is None:
+        _stopping.clear()
+        _thread = threading.Thread(target=_listen, name="cache-bus", daemon=True)
+        _thread.start()
+
+
+def stop() -> None:
+    global _thread
+    _stopping.set()
+    if _thread is not None:
+        _thread.join(LISTEN_POLL_SECONDS + 1)
+        _thread = None
@@ -0,0 +1,204 @@
+"""Clip extraction — cut a camera time range out of hourly recordings with stream copy.
+
+The covering recordings (or Frigate segments) are joined with ffmpeg's concat demuxer
+using inpoint/outpoint, so nothing is re-encoded. Clips are cached on disk, keyed by
+the range and the size and mtime of every source file, so a recording that is
+replaced, transcoded or still growing (the current hour, new Frigate segments) gives
+a new key instead of a stale clip. Evicted oldest-first past clip_cache_max_mb.
+"""
+
+import bisect
+import hashlib
+import os
+import subprocess
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from typing import Iterator
+from zoneinfo import ZoneInfo
+
+import structlog
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.media import MediaProbe
+from app.models.recording import Recording
+from app.services.recording_store import FRIGATE_SEGMENT_SECONDS, recording_path, segment_files
+
+log = structlog.get_logger()
+settings = get_settings()
+
+CLIP_TIMEOUT_SECONDS = 600
+
+# key -> [lock, holders and waiters]; dropped when the last one leaves, since keys
+# change with every new source file
+_locks: dict[str, list] = {}
+_locks_lock = threading.Lock()
+
+
+@contextmanager
+def _locked(key: str) -> Iterator[None]:
+    with _locks_lock:
+        entry = _locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _locks_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _locks[key]
+
+
+def clip_key(camera_id: uuid.UUID, start: datetime, end: datetime, pieces: list[tuple[str, float, float | None]]) -> str:
+    digest = hashlib.sha256(f"{camera_id}|{start.timestamp():.3f}|{end.timestamp():.3f}".encode())
+    for path, inpoint, outpoint in pieces:
+        st = os.stat(path)
+        digest.update(f"|{path}|{st.st_size}|{st.st_mtime_ns}|{inpoint:.3f}|{outpoint}".encode())
+    return digest.hexdigest()[:32]
+
+
+def _covering_recordings(db: Session, camera_id: uuid.UUID, start: datetime, end: datetime) -> list[Recording]:
+    tz = ZoneInfo(settings.tz)
+    first = start.astimezone(tz).replace(minute=0, second=0, microsecond=0)
+    last = end.astimezone(tz)
+    recs = (
+        db.query(Recording)
+        .filter(
+            Recording.camera_id == camera_id,
+            Recording.recording_date >= first.date(),
+            Recording.recording_date <= last.date(),
+        )
+        .order_by(Recording.recording_date.asc(), Recording.hour.asc())
+        .all()
+    )
+    return [r for r in recs if first <= datetime.combine(r.recording_date, time(r.hour), tzinfo=tz) < last]
+
+
+def _pieces(db: Session, recs: list[Recording], start: datetime, end: datetime) -> list[tuple[str, float, float | None]]:
+    """(path, inpoint, outpoint) entries for the concat list, in time order."""
+    tz = ZoneInfo(settings.tz)
+    pieces = []
+    for rec in recs:
+        rec_start = datetime.combine(rec.recording_date, time(rec.hour), tzinfo=tz)
+        path = recording_path(rec.filename)
+        if os.path.isdir(path):
+            segs = segment_files(path)
+            starts = [
+                rec_start + timedelta(minutes=int(os.path.basename(s)[:2]), seconds=int(os.path.basename(s)[3:5]))
+                for s in segs
+            ]
+            for i, seg in enumerate(segs):
+                seg_end = starts[i + 1] if i + 1 < len(segs) else starts[i] + timedelta(seconds=FRIGATE_SEGMENT_SECONDS)
+                if starts[i] < end and seg_end > start:
+                    # Each Frigate segment opens on a keyframe, so whole-segment starts are aligned
+                    inpoint = 0.0
+                    outpoint = (end - starts[i]).total_seconds() if end < seg_end else None
+                    pieces.append((seg, inpoint, outpoint))
+        elif os.path.isfile(path):
+            duration = rec.duration_seconds or 3600.0
+            rec_end = rec_start + timedelta(seconds=duration)
+            if not (rec_start < end and rec_end > start):
+                continue
+            inpoint = max(0.0, (start - rec_start).total_seconds())
+            if inpoint:
+                inpoint = _snap_to_keyframe(db, rec.id, inpoint)
+            outpoint = (end - rec_start).total_seconds() if end < rec_end else None
+            pieces.append((path, inpoint, outpoint))
+    return pieces
+
+
+def _snap_to_keyframe(db: Session, recording_id: uuid.UUID, offset: float) -> float:
+    """Move a cut point back to the preceding keyframe, using probed keyframe times."""
+    keyframes = (
+        db.query(MediaProbe.keyframes).filter(MediaProbe.recording_id == recording_id).scalar()
+    )
+    if not keyframes:
+        return offset
+    i = bisect.bisect_right(keyframes, offset)
+    return keyframes[i - 1] if i else 0.0
+
+
+def _evict() -> None:
+    budget = settings.clip_cache_max_mb * 1024 * 1024
+    stale_tmp = datetime.now().timestamp() - 2 * CLIP_TIMEOUT_SECONDS
+    entries = []
+    for e in os.scandir(settings.clip_cache_dir):
+        if not e.is_file():
+            continue
+        if ".tmp." in e.name:
+            # Another worker may be cutting into it; only a killed cutter's is removed
+            if e.stat().st_mtime < stale_tmp:
+                _remove_quietly(e.path)
+        elif e.name.endswith(".mp4"):
+            entries.append((e.stat().st_atime, e.stat().st_size, e.path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries[:-1]:
+        if total <= budget:
+            break
+        _remove_quietly(path)
+        total -= size
+
+
+def _remove_quietly(path: str) -> None:
+    # Worker processes share the cache directory and may race to remove the same file
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def extract_clip(db: Session, camera_id: uuid.UUID, start: datetime, end: datetime) -> str:
+    """
+    Return the path of an MP4 covering [start, end) for a camera, cutting it if not cached.
+    Raises FileNotFoundError when no recording covers the range.
+    """
+    pieces = _pieces(db, _covering_recordings(db, camera_id, start, end), start, end)
+    if not pieces:
+        raise FileNotFoundError("No recordings cover the requested range")
+    key = clip_key(camera_id, start, end, pieces)
+    os.makedirs(settings.clip_cache_dir, exist_ok=True)
+    out = os.path.join(settings.clip_cache_dir, f"{key}.mp4")
+
+    with _locked(key):
+        if os.path.exists(out):
+            os.utime(out)
+            return out
+
+        # _locked() only serializes this process: other workers may be cutting the same
+        # clip, so each call writes its own temp files and the rename is atomic
+        unique = uuid.uuid4().hex
+        listfile = os.path.join(settings.clip_cache_dir, f"{key}.{unique}.tmp.txt")
+        tmp = os.path.join(settings.clip_cache_dir, f"{key}.{unique}.tmp.mp4")
+        with open(listfile, "w") as f:
+            for path, inpoint, outpoint in pieces:
+                f.write(f"file '{path}'\n")
+                if inpoint:
+                    f.write(f"inpoint {inpoint:.3f}\n")
+                if outpoint is not None:
+                    f.write(f"outpoint {outpoint:.3f}\n")
+        try:
+            subprocess.run(
+                [
+                    "ffmpeg", "-loglevel", "error", "-y",
+                    "-f", "concat", "-safe", "0", "-i", listfile,
+                    "-map", "0", "-c", "copy",
+                    "-avoid_negative_ts", "make_zero", "-movflags", "+faststart",
+                    "-f", "mp4", tmp,
+                ],
+                check=True, capture_output=True, timeout=CLIP_TIMEOUT_SECONDS,
+            )
+            os.replace(tmp, out)
+        except (subprocess.SubprocessError, OSError) as e:
+            log.error("clip_extract_error", camera_id=str(camera_id), error=str(e))
+            raise RuntimeError("Clip extraction failed") from e
+        finally:
+            for p in (listfile, tmp):
+                _remove_quietly(p)
+
+        log.info("clip_extracted", camera_id=str(camera_id), pieces=len(pieces), bytes=os.path.getsize(out))
+        _evict()
+        return out
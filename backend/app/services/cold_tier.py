@@ -0,0 +1,302 @@
+"""Cold tier — re-encode aged local recordings to a more efficient codec.
+
+Encoding runs in a bounded process pool (cold_tier_workers x cold_tier_threads cores).
+Each output is verified with ffprobe (codec, duration) before it replaces the original
+with an atomic rename. Recordings covering exported evidence and Frigate-indexed
+recordings are never touched; each recording is attempted once (recording_transcodes).
+The swap drops the recording's media_probes row in the same transaction, so the new
+file's keyframes, codec and duration are probed before clips or HLS use them again.
+That transaction commits before the rename, while the row is still 'transcoding', so
+an interrupted swap is finished by the next run instead of leaving a stale size_bytes.
+"""
+
+import multiprocessing
+import os
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import structlog
+from sqlalchemy import delete, func, or_, tuple_
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.media import MediaProbe, RecordingTranscode
+from app.models.recording import Recording
+from app.services import cache_bus, timeline
+from app.services.media_probe import ffprobe_json
+from app.services.recording_store import FRIGATE_PREFIX, file_key, recording_path
+from app.services.retention import protected_hours
+
+log = structlog.get_logger()
+settings = get_settings()
+
+TMP_SUFFIX = ".cold.tmp.mp4"
+TRANSCODE_TIMEOUT_SECONDS = 4 * 3600
+# ffprobe codec_name produced by each encoder
+ENCODER_CODECS = {
+    "libx265": "hevc", "libx264": "h264",
+    "libsvtav1": "av1", "libaom-av1": "av1", "libvpx-vp9": "vp9",
+}
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=max(1, settings.cold_tier_workers),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# --- Worker side (runs in the process pool) ---
+
+
+def _summary(info: dict) -> tuple[float, str | None]:
+    video = next((s for s in info.get("streams", []) if s.get("codec_type") == "video"), {})
+    return float(info.get("format", {}).get("duration") or 0), video.get("codec_name")
+
+
+def transcode_file(src: str, codec: str, crf: int, preset: str, threads: int) -> dict:
+    """Encode src to src + TMP_SUFFIX and verify it; the caller swaps it in."""
+    tmp = src + TMP_SUFFIX
+    cpu_before = os.times()
+    started = time.monotonic()
+    try:
+        src_duration, src_codec = _summary(ffprobe_json(src))
+        expected = ENCODER_CODECS.get(codec)
+        if expected and src_codec == expected:
+            return {"error": f"already {expected}", "media_seconds": src_duration}
+
+        args = ["-c:v", codec, "-preset", preset, "-crf", str(crf), "-threads", str(threads)]
+        if expected == "hevc":
+            args += ["-tag:v", "hvc1"]  # plays in Safari/hls.js
+        subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-y", "-i", src,
+             "-map", "0:v:0", "-map", "0:a?", *args, "-c:a", "copy",
+             "-movflags", "+faststart", "-f", "mp4", tmp],
+            check=True, capture_output=True, timeout=TRANSCODE_TIMEOUT_SECONDS,
+        )
+
+        out_duration, out_codec = _summary(ffprobe_json(tmp))
+        if expected and out_codec != expected:
+            raise ValueError(f"output codec {out_codec}, expected {expected}")
+        if abs(out_duration - src_duration) > max(1.0, src_duration * 0.01):
+            raise ValueError(f"output duration {out_duration:.1f}s, source {src_duration:.1f}s")
+
+        cpu_after = os.times()
+        return {
+            "error": None,
+            "output_bytes": os.path.getsize(tmp),
+            "media_seconds": src_duration,
+            "cpu_seconds": round(
+                (cpu_after.children_user - cpu_before.children_user)
+                + (cpu_after.children_system - cpu_before.children_system), 3
+            ),
+            "wall_seconds": round(time.monotonic() - started, 3),
+        }
+    except (subprocess.SubprocessError, OSError, ValueError) as e:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return {"error": str(e)[:500]}
+
+
+# --- Scheduler side ---
+
+
+def _recover(db: Session) -> None:
+    """Release recordings left 'transcoding' by an interrupted run, finishing committed swaps."""
+    stale = db.query(Recording).filter(Recording.status == "transcoding").all()
+    for rec in stale:
+        src = recording_path(rec.filename)
+        tmp = src + TMP_SUFFIX
+        if os.path.exists(tmp):
+            swapped = db.query(RecordingTranscode.output_bytes).filter(
+                RecordingTranscode.recording_id == rec.id
+            ).scalar()
+            if swapped is not None and os.path.getsize(tmp) == swapped:
+                os.replace(tmp, src)
+                db.execute(cache_bus.recordings_changed(rec.camera_id, rec.recording_date))
+                log.info("cold_tier_swap_recovered", recording_id=str(rec.id))
+            else:
+                os.remove(tmp)
+        rec.status = "available"
+    if stale:
+        db.commit()
+
+
+def _candidates(db: Session, limit: int) -> list[Recording]:
+    """Oldest untranscoded local recordings past the age cutoff, skipping evidence hours."""
+    tz = ZoneInfo(settings.tz)
+    cutoff = datetime.now(timezone.utc).astimezone(tz).date() - timedelta(days=settings.cold_tier_after_days)
+    protected = protected_hours(db)
+    key = (Recording.recording_date, Recording.hour, Recording.camera_id)
+    picked: list[Recording] = []
+    after = None
+    while len(picked) < limit:
+        q = (
+            db.query(Recording)
+            .outerjoin(RecordingTranscode, RecordingTranscode.recording_id == Recording.id)
+            .filter(
+                RecordingTranscode.recording_id.is_(None),
+                Recording.status == "available",
+                Recording.recording_date < cutoff,
+                ~Recording.filename.startswith(FRIGATE_PREFIX),
+            )
+        )
+        if after is not None:
+            q = q.filter(tuple_(*key) > tuple_(*after))
+        page = q.order_by(*key).limit(limit * 4).all()
+        if not page:
+            break
+        picked += [r for r in page if (r.camera_id, r.recording_date, r.hour) not in protected]
+        last = page[-1]
+        after = (last.recording_date, last.hour, last.camera_id)
+    return picked[:limit]
+
+
+def transcode_pending(db: Session) -> dict:
+    """
+    Move one batch of aged recordings to the cold tier.
+    Returns counts, bytes saved and encode speed per core (media seconds per CPU second).
+    """
+    result = {"transcoded": 0, "skipped": 0, "failed": 0, "saved_bytes": 0,
+              "media_seconds": 0.0, "cpu_seconds": 0.0, "realtime_per_core": None}
+    if not settings.cold_tier_after_days:
+        return result
+    _recover(db)
+
+    picked = []
+    for rec in _candidates(db, settings.cold_tier_batch_size):
+        src = recording_path(rec.filename)
+        src_key = file_key(src)
+        if src_key is None or not os.path.isfile(src):
+            continue
+        # Marked before encoding starts so retention leaves the file alone
+        rec.status = "transcoding"
+        picked.append((rec.id, src, src_key))
+    if not picked:
+        return result
+    db.commit()
+
+    pool = _get_pool()
+    jobs = [
+        (rec_id, src, src_key, pool.submit(
+            transcode_file, src, settings.cold_tier_codec, settings.cold_tier_crf,
+            settings.cold_tier_preset, settings.cold_tier_threads,
+        ))
+        for rec_id, src, src_key in picked
+    ]
+
+    protected = None
+    for rec_id, src, src_key, fut in jobs:
+        out = fut.result()
+        tmp = src + TMP_SUFFIX
+        entry = RecordingTranscode(
+            recording_id=rec_id, codec=settings.cold_tier_codec, source_bytes=src_key[0],
+            media_seconds=out.get("media_seconds"), cpu_seconds=out.get("cpu_seconds"),
+            wall_seconds=out.get("wall_seconds"), error=out["error"],
+        )
+        rec = db.get(Recording, rec_id, populate_existing=True)
+        if rec is None:
+            # Deleted (retention or manually) while encoding
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            continue
+
+        if out["error"] is None:
+            if protected is None:
+                protected = protected_hours(db)  # re-read: an export may have happened meanwhile
+            min_saving = src_key[0] * settings.cold_tier_min_savings_percent / 100
+            if file_key(src) != src_key:
+                entry.error = "source changed during transcode"
+            elif (rec.camera_id, rec.recording_date, rec.hour) in protected:
+                entry.error = "evidence exported during transcode"
+            elif src_key[0] - out["output_bytes"] < min_saving:
+                entry.error = f"saved under {settings.cold_tier_min_savings_percent}%"
+            else:
+                # The old file's probe (keyframes, codec) must not outlive it
+                db.execute(delete(MediaProbe).where(or_(MediaProbe.recording_id == rec_id, MediaProbe.path == src)))
+                rec.size_bytes = out["output_bytes"]
+                entry.output_bytes = out["output_bytes"]
+                db.add(entry)
+                # Rows first: a failed commit leaves the original file in place, and a
+                # crash before the rename is finished by _recover() (still 'transcoding')
+                db.commit()
+                try:
+                    os.replace(tmp, src)
+                except OSError as e:
+                    rec.size_bytes = src_key[0]
+                    entry.output_bytes = None
+                    entry.error = f"swap failed: {e}"
+                else:
+                    db.execute(cache_bus.recordings_changed(rec.camera_id, rec.recording_date))
+                    result["transcoded"] += 1
+                    result["saved_bytes"] += src_key[0] - out["output_bytes"]
+                    result["media_seconds"] += out["media_seconds"]
+                    result["cpu_seconds"] += out["cpu_seconds"]
+            if entry.output_bytes is None:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                result["skipped"] += 1
+        elif out["error"].startswith("already "):
+            result["skipped"] += 1
+        else:
+            result["failed"] += 1
+            log.warning("cold_tier_error", recording_id=str(rec_id), error=out["error"])
+
+        rec.status = "available"
+        db.add(entry)
+        db.commit()
+        if entry.output_bytes is not None:
+            timeline.invalidate(rec.camera_id, rec.recording_date)
+
+    if result["cpu_seconds"]:
+        result["realtime_per_core"] = round(result["media_seconds"] / result["cpu_seconds"], 3)
+    log.info("cold_tier_batch_complete", **result)
+    return result
+
+
+def cold_tier_stats(db: Session) -> dict:
+    """Totals over all transcodes: space saved and encode throughput per core."""
+    count, source, output, media, cpu = (
+        db.query(
+            func.count(),
+            func.coalesce(func.sum(RecordingTranscode.source_bytes), 0),
+            func.coalesce(func.sum(RecordingTranscode.output_bytes), 0),
+            func.coalesce(func.sum(RecordingTranscode.media_seconds), 0.0),
+            func.coalesce(func.sum(RecordingTranscode.cpu_seconds), 0.0),
+        )
+        .filter(RecordingTranscode.output_bytes.isnot(None))
+        .one()
+    )
+    failed = (
+        db.query(func.count())
+        .select_from(RecordingTranscode)
+        .filter(RecordingTranscode.output_bytes.is_(None), RecordingTranscode.error.isnot(None))
+        .scalar()
+    )
+    return {
+        "codec": settings.cold_tier_codec,
+        "transcoded": count,
+        "not_transcoded": failed,
+        "source_bytes": source,
+        "output_bytes": output,
+        "saved_bytes": source - output,
+        "media_seconds": round(media, 3),
+        "cpu_seconds": round(cpu, 3),
+        "realtime_per_core": round(media / cpu, 3) if cpu else None,
+        "source_mb_per_core_second": round(source / cpu / 1e6, 3) if cpu else None,
+    }
@@ -0,0 +1,129 @@
+"""Evidence export — copy an event clip from Frigate into the vault with a SHA-256 manifest.
+
+POST /api/evidence/export does this inline; POST /api/evidence/export/jobs queues
+it (kind "evidence.export") so the download runs in worker.py and is retried if
+Frigate is unavailable.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import structlog
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.core import metrics
+from app.core.deps import audit
+from app.database import SessionLocal
+from app.models.camera import Camera
+from app.models.event import Event
+from app.models.evidence import EvidenceExport
+from app.models.user import User
+from app.services import job_queue
+
+log = structlog.get_logger()
+settings = get_settings()
+
+EXPORT = "evidence.export"
+
+
+def export_dir() -> str:
+    return os.path.join(settings.evidence_dir, "exports", datetime.now(timezone.utc).strftime("%Y-%m-%d"))
+
+
+def clip_url(ev: Event) -> str:
+    return f"{settings.frigate_base_url}/api/events/{ev.frigate_event_id}/clip.mp4"
+
+
+def write_export(export_dir: str, evidence_id: uuid.UUID, clip_data: bytes, sha256: str) -> str:
+    os.makedirs(export_dir, exist_ok=True)
+    clip_path = os.path.join(export_dir, f"export_{evidence_id}.mp4")
+    with open(clip_path, "wb") as f:
+        f.write(clip_data)
+    with open(os.path.join(export_dir, f"export_{evidence_id}.sha256"), "w") as f:
+        f.write(sha256)
+    return clip_path
+
+
+def write_manifest(export_dir: str, evidence_id: uuid.UUID, manifest: dict) -> None:
+    with open(os.path.join(export_dir, f"manifest_{evidence_id}.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def build_manifest(evidence_id: uuid.UUID, ev: Event, camera: Camera | None, sha256: str, size: int,
+                   requested_by_email: str, reason: str) -> dict:
+    return {
+        "evidence_id": str(evidence_id),
+        "event_id": str(ev.id),
+        "frigate_event_id": ev.frigate_event_id,
+        "sha256": sha256,
+        "size_bytes": size,
+        "content_type": "video/mp4",
+        "requested_by_email": requested_by_email,
+        "requested_at": datetime.now(timezone.utc).isoformat(),
+        "reason": reason,
+        "camera_name": camera.name if camera else None,
+        "event_label": ev.label,
+        "event_start_time": ev.start_time.isoformat() if ev.start_time else None,
+    }
+
+
+def enqueue_export(db: Session, event_id: uuid.UUID, user: User, reason: str):
+    """Queue an export of the event's clip; an export already queued/running for it is returned instead."""
+    return job_queue.enqueue(
+        db, EXPORT, {"event_id": str(event_id), "user_id": str(user.id), "reason": reason}, key=str(event_id),
+    )
+
+
+@job_queue.handler(EXPORT, queue="evidence")
+def _export_job(ctx: job_queue.JobContext) -> dict:
+    db = SessionLocal()
+    try:
+        ev = db.get(Event, uuid.UUID(ctx.payload["event_id"]))
+        user = db.get(User, uuid.UUID(ctx.payload["user_id"]))
+        if ev is None or user is None:
+            raise job_queue.PermanentJobError("Event or requesting user no longer exists")
+        camera = db.get(Camera, ev.camera_id)
+        db.commit()  # release the connection during the download
+
+        with httpx.Client(timeout=120, transport=metrics.FrigateTransport()) as client:
+            resp = client.get(clip_url(ev))
+        if resp.status_code == 404:
+            raise job_queue.PermanentJobError("Frigate has no clip for this event")
+        if resp.status_code != 200:
+            raise RuntimeError(f"Frigate clip download failed: HTTP {resp.status_code}")
+        clip_data = resp.content
+
+        sha256 = hashlib.sha256(clip_data).hexdigest()
+        evidence_id = uuid.uuid4()
+        directory = export_dir()
+        clip_path = write_export(directory, evidence_id, clip_data, sha256)
+        reason = ctx.payload.get("reason", "")
+        write_manifest(
+            directory, evidence_id,
+            build_manifest(evidence_id, ev, camera, sha256, len(clip_data), user.email, reason),
+        )
+
+        db.add(EvidenceExport(
+            id=evidence_id,
+            event_id=ev.id,
+            requested_by=user.id,
+            object_store_uri=clip_path,
+            sha256=sha256,
+            size_bytes=len(clip_data),
+            content_type="video/mp4",
+            reason=reason,
+        ))
+        db.commit()
+        audit(
+            db, action="evidence_export", user=user, resource_type="evidence", resource_id=str(evidence_id),
+            meta={"event_id": str(ev.id), "sha256": sha256, "job_id": str(ctx.id)}, durable=True,
+        )
+        log.info("evidence_export_job_complete", job_id=str(ctx.id), evidence_id=str(evidence_id))
+        return {"evidence_id": str(evidence_id), "sha256": sha256, "size_bytes": len(clip_data)}
+    finally:
+        db.close()
@@ -0,0 +1,251 @@
+"""Frigate recording ingest — index on-disk segments into hourly Recording rows.
+
+Frigate writes ~10 s segments to <frigate_recordings_dir>/<YYYY-MM-DD>/<HH>/<camera>/MM.SS.mp4
+(UTC). Each (hour, camera) directory becomes one Recording row. Scans resume from a
+persisted watermark, so only the still-open hours are revisited on each pass. Rows
+whose directory Frigate has since pruned are deleted on every pass.
+"""
+
+import os
+import re
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import structlog
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.camera import Camera
+from app.models.ingest import IngestWatermark
+from app.models.recording import Recording
+from app.services import cache_bus, seek_index, timeline
+from app.services.previews import remove_previews
+from app.services.recording_store import FRIGATE_PREFIX, insert_recordings, recording_path
+
+log = structlog.get_logger()
+settings = get_settings()
+
+WATERMARK_SOURCE = "frigate_recordings"
+DEFAULT_SEGMENT_SECONDS = 10.0
+MAX_SEGMENT_SECONDS = 60.0
+# Frigate may still move segments into an hour shortly after it ends
+OPEN_HOUR_GRACE = timedelta(minutes=5)
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_HOUR_RE = re.compile(r"^\d{2}$")
+_SEGMENT_RE = re.compile(r"^(\d{2})\.(\d{2})\.mp4$")
+
+
+def _hour_key(utc_hour: datetime) -> str:
+    return utc_hour.strftime("%Y-%m-%d/%H")
+
+
+def _iter_hour_dirs(root: str, since: str | None):
+    """Yield (key, utc_hour_start) for hour directories at or after the watermark, in order."""
+    since_date = since.split("/")[0] if since else None
+    for day in sorted(os.listdir(root)):
+        if not _DATE_RE.match(day) or (since_date and day < since_date):
+            continue
+        day_dir = os.path.join(root, day)
+        if not os.path.isdir(day_dir):
+            continue
+        for hour in sorted(os.listdir(day_dir)):
+            key = f"{day}/{hour}"
+            if not _HOUR_RE.match(hour) or (since and key < since):
+                continue
+            yield key, datetime.strptime(key, "%Y-%m-%d/%H").replace(tzinfo=timezone.utc)
+
+
+def _segment_seconds(start: float, mtime: float, next_start: float | None) -> float:
+    """Estimate a segment's duration from its mtime (written when the segment closes)."""
+    d = mtime - start
+    if 0 < d <= MAX_SEGMENT_SECONDS:
+        return d
+    if next_start is not None:
+        return min(next_start - start, DEFAULT_SEGMENT_SECONDS)
+    return DEFAULT_SEGMENT_SECONDS
+
+
+def _summarize_dir(cam_dir: str, utc_hour: datetime) -> tuple[float, int] | None:
+    """Return (duration_seconds, size_bytes) for one hour/camera directory."""
+    base = utc_hour.timestamp()
+    segs = []
+    with os.scandir(cam_dir) as it:
+        for entry in it:
+            m = _SEGMENT_RE.match(entry.name)
+            if not m or not entry.is_file():
+                continue
+            st = entry.stat()
+            segs.append((base + int(m.group(1)) * 60 + int(m.group(2)), st.st_mtime, st.st_size))
+    if not segs:
+        return None
+    segs.sort()
+    duration = 0.0
+    for i, (start, mtime, _) in enumerate(segs):
+        next_start = segs[i + 1][0] if i + 1 < len(segs) else None
+        duration += _segment_seconds(start, mtime, next_start)
+    return round(duration, 3), sum(s[2] for s in segs)
+
+
+def _get_watermark(db: Session) -> str | None:
+    wm = db.get(IngestWatermark, WATERMARK_SOURCE)
+    return wm.position if wm else None
+
+
+def _set_watermark(db: Session, position: str) -> None:
+    wm = db.get(IngestWatermark, WATERMARK_SOURCE)
+    if wm:
+        wm.position = position
+        wm.updated_at = datetime.now(timezone.utc)
+    else:
+        db.add(IngestWatermark(source=WATERMARK_SOURCE, position=position))
+
+
+def _delete_rows(db: Session, where) -> list:
+    gone = db.execute(
+        delete(Recording).where(*where).returning(Recording.id, Recording.camera_id, Recording.recording_date)
+    ).all()
+    days = {(r.camera_id, r.recording_date) for r in gone}
+    for camera_id, day in days:
+        db.execute(cache_bus.recordings_changed(camera_id, day))
+    db.commit()
+    for r in gone:
+        remove_previews(r.id)
+        seek_index.remove(r.camera_id, r.id)
+    for camera_id, day in days:
+        timeline.invalidate(camera_id, day)
+    return gone
+
+
+def _remove_pruned(db: Session, root: str) -> int:
+    """
+    Delete Frigate-indexed rows whose hour/camera directory no longer exists.
+
+    Frigate prunes oldest-first, so every row dated before the oldest date directory
+    still on disk goes in one range delete, and only that boundary day's rows are
+    checked against the disk.
+    """
+    days = sorted(d for d in os.listdir(root) if _DATE_RE.match(d))
+    # An empty root is more likely an unmounted volume than Frigate pruning everything
+    if not days:
+        return 0
+    oldest = days[0]
+    oldest_date = date.fromisoformat(oldest)
+    # Directories are UTC dates; recording_date is local, at most a day either side
+    removed = len(_delete_rows(db, (
+        Recording.recording_date <= oldest_date,
+        Recording.filename.startswith(FRIGATE_PREFIX),
+        Recording.filename < f"{FRIGATE_PREFIX}{oldest}/",
+    )))
+    boundary = db.query(Recording.id, Recording.filename).filter(
+        Recording.recording_date.between(oldest_date - timedelta(days=1), oldest_date + timedelta(days=1)),
+        Recording.filename.startswith(f"{FRIGATE_PREFIX}{oldest}/"),
+    ).all()
+    missing = [r.id for r in boundary if not os.path.isdir(recording_path(r.filename))]
+    if missing:
+        removed += len(_delete_rows(db, (Recording.id.in_(missing),)))
+    return removed
+
+
+def ingest_frigate_recordings(db: Session) -> dict:
+    """
+    Index new/changed Frigate segments into hourly Recording rows and drop rows
+    for pruned ones. Returns counts of inserted, updated and removed rows.
+    """
+    root = settings.frigate_recordings_dir
+    if not os.path.isdir(root):
+        log.warning("frigate_ingest_no_dir", path=root)
+        return {"inserted": 0, "updated": 0, "removed": 0}
+
+    tz = ZoneInfo(settings.tz)
+    now = datetime.now(timezone.utc)
+    # Hours starting at or after this key may still receive segments
+    open_key = _hour_key((now - timedelta(hours=1) - OPEN_HOUR_GRACE).replace(minute=0, second=0, microsecond=0))
+
+    cameras = {c.frigate_name: c.id for c in db.query(Camera).filter(Camera.enabled == True).all()}
+    since = _get_watermark(db)
+
+    inserted = updated = 0
+    pending_new: list[dict] = []
+    pending_upd: list[dict] = []
+    last_closed: str | None = None
+
+    def flush() -> None:
+        nonlocal inserted, updated
+        # Camera-hours already held by another row (upload, simulation, DST repeat) are skipped
+        new_rows = insert_recordings(db, pending_new)
+        inserted += len(new_rows)
+        if pending_upd:
+            db.execute(update(Recording), pending_upd)
+            updated += len(pending_upd)
+        if last_closed:
+            _set_watermark(db, last_closed)
+        days = {(r["camera_id"], r["recording_date"]) for r in new_rows + pending_upd}
+        for camera_id, day in days:
+            db.execute(cache_bus.recordings_changed(camera_id, day))
+        db.commit()
+        seek_index.add_rows(new_rows + pending_upd)
+        for camera_id, day in days:
+            timeline.invalidate(camera_id, day)
+        pending_new.clear()
+        pending_upd.clear()
+
+    for key, utc_hour in _iter_hour_dirs(root, since):
+        hour_dir = os.path.join(root, key)
+        found = {}
+        for cam_name in os.listdir(hour_dir):
+            cam_id = cameras.get(cam_name)
+            cam_dir = os.path.join(hour_dir, cam_name)
+            if cam_id is None or not os.path.isdir(cam_dir):
+                continue
+            summary = _summarize_dir(cam_dir, utc_hour)
+            if summary:
+                found[f"{FRIGATE_PREFIX}{key}/{cam_name}"] = (cam_id, summary)
+        if key < open_key:
+            # Everything up to here is closed; the next pass may start after it
+            last_closed = _hour_key(utc_hour + timedelta(hours=1))
+        if not found:
+            continue
+
+        status = "processing" if key >= open_key else "available"
+        local = utc_hour.astimezone(tz)
+        # Filter on the indexed date so the lookup stays O(rows per day)
+        existing = dict(
+            db.query(Recording.filename, Recording.id)
+            .filter(Recording.recording_date == local.date(), Recording.filename.in_(list(found)))
+            .all()
+        )
+        for filename, (cam_id, (duration, size)) in found.items():
+            if filename in existing:
+                pending_upd.append({
+                    "id": existing[filename],
+                    "camera_id": cam_id,
+                    "filename": filename,
+                    "recording_date": local.date(),
+                    "hour": local.hour,
+                    "duration_seconds": duration,
+                    "size_bytes": size,
+                    "status": status,
+                })
+            else:
+                pending_new.append({
+                    "id": uuid.uuid4(),
+                    "camera_id": cam_id,
+                    "recording_date": local.date(),
+                    "hour": local.hour,
+                    "filename": filename,
+                    "duration_seconds": duration,
+                    "size_bytes": size,
+                    "status": status,
+                    "created_at": now,
+                })
+
+        if len(pending_new) + len(pending_upd) >= settings.frigate_ingest_batch_size:
+            flush()
+
+    flush()
+    removed = _remove_pruned(db, root)
+    log.info("frigate_ingest_complete", inserted=inserted, updated=updated, removed=removed, since=since)
+    return {"inserted": inserted, "updated": updated, "removed": removed}
@@ -1,18 +1,59 @@
-"""Frigate event sync service — polls /api/events and upserts into Postgres."""
+"""Frigate event sync service — polls /api/events and upserts into Postgres.
+
+run_sync() is the single-flight entry point for both the scheduler and
+POST /api/events/sync. Within a process, callers arriving while a sync runs wait
+for it and share its result. Across processes, a session-level advisory lock
+admits one run at a time: a manual caller blocks on the lock and then returns the
+run it waited for, and a scheduled tick that finds the lock taken is skipped. Every
+run is recorded in frigate_sync_runs, with the callers it absorbed.
+
+Scheduled syncs run in worker.py: the scheduler leader only enqueues a
+"frigate.sync" job, and a tick that finds one still queued or running is skipped.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 
 import structlog
 import httpx
-from datetime import datetime, timezone
-
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
-from app.models.event import Event
+from app.core import metrics
+from app.database import SessionLocal, engine
+from app.models.event import Event, FrigateSyncRun
 from app.models.camera import Camera
+from app.services import job_queue
 
 log = structlog.get_logger()
 settings = get_settings()
 
+SYNC_LOCK_KEY = 7_346_510_023
+RUN_HISTORY_DAYS = 7
+SYNC_JOB = "frigate.sync"
+
+
+class SyncBusy(RuntimeError):
+    """The sync in flight did not finish within frigate_sync_wait_seconds."""
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.run: FrigateSyncRun | None = None
+        self.error: str | None = None
+        self.joined = 0
+        self.skipped_ticks = 0
+
+
+_flight: _Flight | None = None
+_flight_lock = threading.Lock()
+# This process only; frigate_sync_runs has the totals
+_counters = {"runs": 0, "joined": 0, "skipped_ticks": 0}
+
 
 def sync_events_from_frigate(db: Session, limit: int = 200) -> int:
     """
@@ -23,7 +64,7 @@ def sync_events_from_frigate(db: Session, limit: int = 200) -> int:
     params = {"limit": limit, "has_clip": 1}
 
     try:
-        with httpx.Client(timeout=30) as client:
+        with httpx.Client(timeout=30, transport=metrics.FrigateTransport()) as client:
             resp = client.get(url, params=params)
             resp.raise_for_status()
     except httpx.HTTPError as e:
@@ -34,6 +75,7 @@ def sync_events_from_frigate(db: Session, limit: int = 200) -> int:
     if not isinstance(events_data, list):
         log.warning("frigate_sync_unexpected_response", data=type(events_data).__name__)
         return 0
+    metrics.SYNC_BATCH_EVENTS.labels("fetched").observe(len(events_data))
 
     # Build a camera lookup: frigate_name -> camera record
     cameras = {c.frigate_name: c for c in db.query(Camera).filter(Camera.enabled == True).all()}
@@ -88,7 +130,192 @@ def sync_events_from_frigate(db: Session, limit: int = 200) -> int:
             )
             db.add(event)
             count += 1
+            if start_ts:
+                metrics.SYNC_EVENT_LAG_SECONDS.observe(max(0.0, time.time() - start_ts))
 
     db.commit()
+    metrics.SYNC_BATCH_EVENTS.labels("new").observe(count)
+    metrics.SYNC_LAST_SUCCESS.set_to_current_time()
     log.info("frigate_sync_complete", new_events=count, total_fetched=len(events_data))
     return count
+
+
+def run_sync(trigger: str = "manual") -> tuple[FrigateSyncRun, bool] | None:
+    """Sync unless one is in flight. Returns (run, shared), or None for a skipped scheduled tick."""
+    global _flight
+    with _flight_lock:
+        flight = _flight
+        if flight is None:
+            flight = _flight = _Flight()
+            owner = True
+        else:
+            owner = False
+            if trigger == "scheduled":
+                flight.skipped_ticks += 1
+                _counters["skipped_ticks"] += 1
+                metrics.SYNC_COALESCED.labels("skipped_tick").inc()
+                return None
+            flight.joined += 1
+            _counters["joined"] += 1
+            metrics.SYNC_COALESCED.labels("joined").inc()
+
+    if not owner:
+        if not flight.done.wait(settings.frigate_sync_wait_seconds):
+            raise SyncBusy("Frigate sync still running")
+        if flight.error:
+            raise RuntimeError(f"Frigate sync failed: {flight.error}")
+        if flight.run is None:
+            # The owner was a scheduled tick that another process pre-empted
+            return run_sync(trigger)
+        return flight.run, True
+
+    try:
+        with engine.connect() as lock_conn:
+            got = lock_conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": SYNC_LOCK_KEY}).scalar()
+            lock_conn.commit()
+            if not got:
+                if trigger == "scheduled":
+                    _count_remote("skipped_ticks")
+                    _counters["skipped_ticks"] += 1
+                    metrics.SYNC_COALESCED.labels("skipped_tick").inc()
+                    return None
+                metrics.SYNC_COALESCED.labels("joined").inc()
+                flight.run = _await_remote(lock_conn)
+                return flight.run, True
+            try:
+                flight.run = _execute(trigger, flight)
+            finally:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SYNC_LOCK_KEY})
+                lock_conn.commit()
+        if flight.run.error:
+            raise RuntimeError(f"Frigate sync failed: {flight.run.error}")
+        return flight.run, False
+    except Exception as e:
+        flight.error = flight.error or str(e)
+        raise
+    finally:
+        with _flight_lock:
+            if _flight is flight:
+                _flight = None
+        flight.done.set()
+
+
+def _execute(trigger: str, flight: _Flight) -> FrigateSyncRun:
+    """Run the sync and record it; the caller holds the advisory lock."""
+    global _flight
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        # With the lock held, an unfinished row belongs to a process that died mid-run
+        db.execute(
+            update(FrigateSyncRun)
+            .where(FrigateSyncRun.finished_at.is_(None))
+            .values(finished_at=now, error="abandoned")
+        )
+        db.execute(delete(FrigateSyncRun).where(FrigateSyncRun.started_at < now - timedelta(days=RUN_HISTORY_DAYS)))
+        run = FrigateSyncRun(trigger=trigger, started_at=now, joined=0, skipped_ticks=0)
+        db.add(run)
+        db.commit()
+        _counters["runs"] += 1
+
+        try:
+            with metrics.SYNC_DURATION_SECONDS.time():
+                run.new_events = sync_events_from_frigate(db)
+        except Exception as e:
+            db.rollback()
+            run.error = str(e)[:1000]
+            log.error("frigate_sync_run_error", run_id=str(run.id), error=run.error)
+
+        # Close the flight before reading its counters: later callers start a new run
+        with _flight_lock:
+            if _flight is flight:
+                _flight = None
+            joined, skipped = flight.joined, flight.skipped_ticks
+        run.finished_at = datetime.now(timezone.utc)
+        # Other processes may have incremented these while the run was going
+        run.joined = FrigateSyncRun.joined + joined
+        run.skipped_ticks = FrigateSyncRun.skipped_ticks + skipped
+        db.commit()
+        db.refresh(run)
+        return run
+    finally:
+        db.close()
+
+
+def _await_remote(lock_conn) -> FrigateSyncRun:
+    """Block until another process's run finishes and return it (counted as joined)."""
+    try:
+        # Local to this transaction: the pooled connection keeps its defaults
+        lock_conn.execute(
+            text("SELECT set_config('lock_timeout', :ms, true)"),
+            {"ms": str(int(settings.frigate_sync_wait_seconds * 1000))},
+        )
+        lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SYNC_LOCK_KEY})
+    except OperationalError:
+        lock_conn.rollback()
+        raise SyncBusy("Frigate sync still running")
+    lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SYNC_LOCK_KEY})
+    lock_conn.commit()
+
+    db = SessionLocal()
+    try:
+        run = db.scalars(
+            select(FrigateSyncRun)
+            .where(FrigateSyncRun.finished_at.is_not(None))
+            .order_by(FrigateSyncRun.started_at.desc())
+            .limit(1)
+        ).first()
+        if run is None:
+            raise RuntimeError("Frigate sync finished without a recorded run")
+        run.joined = FrigateSyncRun.joined + 1
+        db.commit()
+        db.refresh(run)
+        return run
+    finally:
+        db.close()
+
+
+def _count_remote(field: str) -> None:
+    """Charge a skipped tick to the run in flight in another process."""
+    db = SessionLocal()
+    try:
+        newest = select(FrigateSyncRun.id).order_by(FrigateSyncRun.started_at.desc()).limit(1).scalar_subquery()
+        db.execute(
+            update(FrigateSyncRun)
+            .where(FrigateSyncRun.id == newest, FrigateSyncRun.finished_at.is_(None))
+            .values({field: getattr(FrigateSyncRun, field) + 1})
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        log.warning("frigate_sync_count_error", field=field, error=str(e))
+    finally:
+        db.close()
+
+
+def enqueue_scheduled(db: Session) -> bool:
+    """Scheduler tick: queue a sync job, or count the tick as skipped if one is pending."""
+    _, created = job_queue.enqueue(db, SYNC_JOB, {"trigger": "scheduled"}, key="scheduled")
+    if not created:
+        _counters["skipped_ticks"] += 1
+        metrics.SYNC_COALESCED.labels("skipped_tick").inc()
+        _count_remote("skipped_ticks")
+    return created
+
+
+@job_queue.handler(SYNC_JOB, queue="sync", max_attempts=1, priority=10)
+def _sync_job(ctx: job_queue.JobContext) -> dict:
+    # One attempt: the next tick is the retry
+    result = run_sync(ctx.payload.get("trigger", "scheduled"))
+    if result is None:
+        return {"skipped": True}
+    run, shared = result
+    return {"run_id": str(run.id), "new_events": run.new_events, "shared": shared}
+
+
+def recent_runs(db: Session, limit: int = 20) -> list[FrigateSyncRun]:
+    return db.scalars(select(FrigateSyncRun).order_by(FrigateSyncRun.started_at.desc()).limit(limit)).all()
+
+
+def flight_stats() -> dict:
+    return {"in_flight": _flight is not None, **_counters}
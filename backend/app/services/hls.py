@@ -0,0 +1,289 @@
+"""HLS packaging — remux recordings into fMP4 HLS on demand with an LRU-evicted disk cache.
+
+A recording is packaged (ffmpeg -c copy, no re-encode) the first time its playlist
+or one of its segments is requested. The camera playlist packages nothing: for a
+recording not packaged yet it lists the segments ffmpeg will cut, predicted from the
+probed keyframes and duration, and the first segment request packages that hour.
+
+Packaged recordings live in <hls_cache_dir>/<recording_id>/. Every access touches
+the directory, so its mtime is the LRU order shared by all worker processes; past
+hls_cache_max_mb the least recently used directories are removed.
+"""
+
+import math
+import os
+import re
+import shutil
+import subprocess
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time
+from typing import Iterator
+from zoneinfo import ZoneInfo
+
+import structlog
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.media import MediaProbe
+from app.models.recording import Recording
+from app.services.recording_store import ffmpeg_input_args, file_key, recording_path
+
+log = structlog.get_logger()
+settings = get_settings()
+
+PLAYLIST = "index.m3u8"
+SOURCE_KEY = "source.key"
+PACKAGE_TIMEOUT_SECONDS = 600
+SEGMENT_NAME_RE = re.compile(r"^(init\.mp4|seg_\d{5}\.m4s)$")
+
+# Tags that belong to a media playlist header, not to its segments
+_HEADER_TAGS = (
+    "#EXTM3U", "#EXT-X-VERSION", "#EXT-X-TARGETDURATION", "#EXT-X-MEDIA-SEQUENCE",
+    "#EXT-X-PLAYLIST-TYPE", "#EXT-X-ENDLIST", "#EXT-X-INDEPENDENT-SEGMENTS",
+)
+
+# recording_id -> [lock, holders and waiters]; dropped when the last one leaves
+_pack_locks: dict[str, list] = {}
+_pack_locks_lock = threading.Lock()
+
+
+def _cache_dir(recording_id) -> str:
+    return os.path.join(settings.hls_cache_dir, str(recording_id))
+
+
+def _dir_bytes(path: str) -> int:
+    return sum(e.stat().st_size for e in os.scandir(path) if e.is_file())
+
+
+def _touch(path: str) -> None:
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def _evict(keep: str) -> None:
+    """Remove the least recently used packages (oldest directory mtime) over budget."""
+    budget = settings.hls_cache_max_mb * 1024 * 1024
+    stale_tmp = datetime.now().timestamp() - 2 * PACKAGE_TIMEOUT_SECONDS
+    entries = []
+    for e in os.scandir(settings.hls_cache_dir):
+        if not e.is_dir():
+            continue
+        if ".tmp-" in e.name:
+            # Another process may be packaging into it; only a killed packager's is removed
+            if e.stat().st_mtime < stale_tmp:
+                shutil.rmtree(e.path, ignore_errors=True)
+            continue
+        if e.name != keep:
+            entries.append((e.stat().st_mtime, e.name, _dir_bytes(e.path)))
+    total = sum(size for _, _, size in entries) + _dir_bytes(_cache_dir(keep))
+    for _, name, size in sorted(entries):
+        if total <= budget:
+            break
+        shutil.rmtree(_cache_dir(name), ignore_errors=True)
+        total -= size
+        log.info("hls_cache_evict", recording_id=name, bytes=size)
+
+
+@contextmanager
+def _locked(key: str) -> Iterator[None]:
+    with _pack_locks_lock:
+        entry = _pack_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _pack_locks_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _pack_locks[key]
+
+
+def _is_current(out_dir: str, src_key: tuple[int, float]) -> bool:
+    try:
+        with open(os.path.join(out_dir, SOURCE_KEY)) as f:
+            return f.read() == f"{src_key[0]}:{src_key[1]}"
+    except FileNotFoundError:
+        return False
+
+
+def _run_packager(src: str, workdir: str, with_audio: bool) -> None:
+    subprocess.run(
+        [
+            "ffmpeg", "-loglevel", "error", "-y",
+            *ffmpeg_input_args(src, workdir),
+            "-map", "0:v:0", *(["-map", "0:a:0?"] if with_audio else ["-an"]),
+            "-c", "copy",
+            "-f", "hls",
+            "-hls_time", str(settings.hls_segment_seconds),
+            "-hls_playlist_type", "vod",
+            "-hls_segment_type", "fmp4",
+            "-hls_fmp4_init_filename", "init.mp4",
+            "-hls_segment_filename", os.path.join(workdir, "seg_%05d.m4s"),
+            os.path.join(workdir, PLAYLIST),
+        ],
+        check=True, capture_output=True, timeout=PACKAGE_TIMEOUT_SECONDS,
+    )
+
+
+def ensure_packaged(rec: Recording) -> str:
+    """Return the cache directory holding rec's HLS package, packaging it if needed."""
+    key = str(rec.id)
+    out_dir = _cache_dir(key)
+    src = recording_path(rec.filename)
+    src_key = file_key(src)
+    if src_key is None:
+        raise FileNotFoundError(src)
+
+    with _locked(key):
+        if _is_current(out_dir, src_key):
+            _touch(out_dir)
+            return out_dir
+
+        tmp = f"{out_dir}.tmp-{uuid.uuid4().hex[:8]}"
+        os.makedirs(tmp)
+        try:
+            try:
+                _run_packager(src, tmp, with_audio=True)
+            except subprocess.CalledProcessError:
+                # Camera audio (e.g. G.711) may not fit in fMP4 — retry video only
+                for name in os.listdir(tmp):
+                    if name != "inputs.txt":
+                        os.remove(os.path.join(tmp, name))
+                _run_packager(src, tmp, with_audio=False)
+            with open(os.path.join(tmp, SOURCE_KEY), "w") as f:
+                f.write(f"{src_key[0]}:{src_key[1]}")
+            shutil.rmtree(out_dir, ignore_errors=True)
+            os.rename(tmp, out_dir)
+        except (subprocess.SubprocessError, OSError) as e:
+            shutil.rmtree(tmp, ignore_errors=True)
+            log.error("hls_package_error", recording_id=key, error=str(e))
+            raise RuntimeError(f"HLS packaging failed for recording {key}") from e
+
+        log.info("hls_packaged", recording_id=key, bytes=_dir_bytes(out_dir))
+        _evict(keep=key)
+        return out_dir
+
+
+def segment_path(rec: Recording, name: str) -> str:
+    """Path of one packaged segment (or init.mp4); name must be a generated segment name."""
+    if not SEGMENT_NAME_RE.match(name):
+        raise FileNotFoundError(name)
+    path = os.path.join(ensure_packaged(rec), name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(name)
+    return path
+
+
+def _with_token(uri: str, token: str | None) -> str:
+    return f"{uri}?token={token}" if token else uri
+
+
+def _rewrite(lines: list[str], prefix: str, token: str | None) -> list[str]:
+    out = []
+    for line in lines:
+        if line.startswith("#EXT-X-MAP:"):
+            uri = re.search(r'URI="([^"]+)"', line).group(1)
+            line = line.replace(f'URI="{uri}"', f'URI="{_with_token(prefix + uri, token)}"')
+        elif line and not line.startswith("#"):
+            line = _with_token(prefix + line, token)
+        out.append(line)
+    return out
+
+
+def _read_playlist(out_dir: str) -> list[str]:
+    with open(os.path.join(out_dir, PLAYLIST)) as f:
+        return f.read().splitlines()
+
+
+def recording_playlist(rec: Recording, token: str | None = None) -> str:
+    """Media playlist for one recording; segment URIs are relative to its /hls/ path."""
+    lines = _read_playlist(ensure_packaged(rec))
+    return "\n".join(_rewrite(lines, "", token)) + "\n"
+
+
+def segment_starts(keyframes: list[float] | None, duration: float) -> list[float]:
+    """
+    Offsets at which ffmpeg's hls muxer will start segments: segment n+1 opens on the
+    first keyframe at least (n+1) * hls_segment_seconds into the recording. Without
+    keyframe times the nominal grid is used (exact when the GOP divides the segment length).
+    """
+    step = settings.hls_segment_seconds
+    if not keyframes:
+        return [float(i * step) for i in range(max(1, math.ceil(duration / step)))]
+    starts = [0.0]
+    for kf in keyframes[1:]:
+        offset = kf - keyframes[0]
+        if offset >= duration:
+            break
+        if offset >= step * len(starts):
+            starts.append(offset)
+    return starts
+
+
+def _predicted_lines(rec: Recording, probe: MediaProbe | None) -> list[str]:
+    """Segment lines of the playlist ffmpeg would write for rec, before packaging it."""
+    duration = (probe.duration_seconds if probe else None) or rec.duration_seconds or 3600.0
+    # A Frigate hour's keyframes are probed through its concat list, so they match the cuts too
+    starts = segment_starts(probe.keyframes if probe else None, duration)
+    lines = ['#EXT-X-MAP:URI="init.mp4"']
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else duration
+        lines += [f"#EXTINF:{end - start:.6f},", f"seg_{i:05d}.m4s"]
+    return lines
+
+
+def _packaged_lines(rec: Recording, src_key: tuple[int, float]) -> list[str] | None:
+    out_dir = _cache_dir(rec.id)
+    if not _is_current(out_dir, src_key):
+        return None
+    try:
+        lines = _read_playlist(out_dir)
+    except FileNotFoundError:
+        return None
+    _touch(out_dir)
+    return lines
+
+
+def camera_playlist(db: Session, recs: list[Recording], url_prefix: str, token: str | None = None) -> str:
+    """
+    One VOD playlist spanning consecutive recordings, with a discontinuity per hour.
+    Hours already packaged contribute their real segment list; the others are packaged
+    when a player first asks for one of their segments.
+    """
+    probes = {
+        p.recording_id: p
+        for p in db.query(MediaProbe).filter(MediaProbe.recording_id.in_([r.id for r in recs]))
+    }
+    tz = ZoneInfo(settings.tz)
+    body: list[str] = []
+    target = settings.hls_segment_seconds
+    for rec in recs:
+        src_key = file_key(recording_path(rec.filename))
+        if src_key is None:
+            continue
+        lines = _packaged_lines(rec, src_key) or _predicted_lines(rec, probes.get(rec.id))
+        for line in lines:
+            if line.startswith("#EXT-X-TARGETDURATION:"):
+                target = max(target, int(line.split(":", 1)[1]))
+            elif line.startswith("#EXTINF:"):
+                target = max(target, math.ceil(float(line[8:].split(",", 1)[0])))
+        if body:
+            body.append("#EXT-X-DISCONTINUITY")
+        start = datetime.combine(rec.recording_date, time(rec.hour), tzinfo=tz)
+        body.append(f"#EXT-X-PROGRAM-DATE-TIME:{start.isoformat(timespec='milliseconds')}")
+        segment_lines = [l for l in lines if not l.startswith(_HEADER_TAGS)]
+        body += _rewrite(segment_lines, f"{url_prefix}/{rec.id}/hls/", token)
+
+    header = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:7",
+        f"#EXT-X-TARGETDURATION:{target}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+    ]
+    return "\n".join(header + body + ["#EXT-X-ENDLIST"]) + "\n"
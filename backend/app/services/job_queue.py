@@ -0,0 +1,438 @@
+"""Durable job queue — a Postgres table claimed with FOR UPDATE SKIP LOCKED.
+
+Any process can enqueue(); worker.py runs run_worker(), which claims ready jobs
+per queue (highest priority, then earliest run_at), runs the registered handler in
+a thread and records the outcome. A failed job is retried with jittered exponential
+backoff until max_attempts; PermanentJobError fails it at once. Each queue has a
+limit on running jobs across all workers (job_queues): claims within one queue are
+serialized by a transaction-level advisory lock, so counting running jobs and
+claiming the next one are consistent. Workers heartbeat their running jobs, and
+any worker requeues jobs whose worker stopped heartbeating.
+"""
+
+import importlib
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+import structlog
+from sqlalchemy import and_, case, delete, extract, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.job import Job
+
+log = structlog.get_logger()
+settings = get_settings()
+
+ACTIVE = ("queued", "running")
+# pg_advisory_xact_lock(class, hashtext(queue)): int4 class shared by all queues
+CLAIM_LOCK_CLASS = 7_346_510
+# Modules whose import registers handlers with @handler
+HANDLER_MODULES = (
+    "app.services.frigate_sync",
+    "app.services.recording_jobs",
+    "app.services.evidence_export",
+)
+
+
+class PermanentJobError(RuntimeError):
+    """Raised by a handler for a failure that retrying cannot fix."""
+
+
+class JobContext:
+    """What a handler gets: the payload, plus progress counters sent with each heartbeat."""
+
+    def __init__(self, job: Job):
+        self.id = job.id
+        self.kind = job.kind
+        self.payload: dict = job.payload or {}
+        self.attempt = job.attempts
+        self._progress: dict = dict(job.progress or {})
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def set(self, **values) -> None:
+        with self._lock:
+            self._progress.update(values)
+            self._dirty = True
+
+    def incr(self, **deltas: int) -> None:
+        with self._lock:
+            for k, v in deltas.items():
+                self._progress[k] = self._progress.get(k, 0) + v
+            self._dirty = True
+
+    @property
+    def progress(self) -> dict:
+        with self._lock:
+            return dict(self._progress)
+
+    def take_progress(self) -> dict | None:
+        """Progress changed since the last call, or None."""
+        with self._lock:
+            if not self._dirty:
+                return None
+            self._dirty = False
+            return dict(self._progress)
+
+
+@dataclass
+class _Handler:
+    fn: Callable[[JobContext], dict | None]
+    queue: str
+    max_attempts: int | None
+    priority: int
+
+
+_handlers: dict[str, _Handler] = {}
+
+
+def handler(kind: str, queue: str = "default", max_attempts: int | None = None, priority: int = 0):
+    """Register `fn(ctx) -> dict | None` as the handler for jobs of `kind`."""
+    def register(fn):
+        _handlers[kind] = _Handler(fn, queue, max_attempts, priority)
+        return fn
+    return register
+
+
+def load_handlers() -> None:
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+def queue_limits() -> dict[str, int]:
+    """job_queues parsed: queue -> max running jobs across all workers."""
+    limits = {}
+    for part in settings.job_queues.split(","):
+        name, _, limit = part.strip().partition(":")
+        if name:
+            limits[name] = max(1, int(limit or 1))
+    return limits
+
+
+# --- Producing ---
+
+
+def _active(db: Session, kind: str, key: str) -> Job | None:
+    return db.scalars(select(Job).where(Job.kind == kind, Job.key == key, Job.status.in_(ACTIVE))).first()
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: dict | None = None,
+    *,
+    key: str | None = None,
+    priority: int | None = None,
+    run_at: datetime | None = None,
+    progress: dict | None = None,
+) -> tuple[Job, bool]:
+    """Commit a new job; with `key`, return the queued/running job of the same kind and key instead.
+
+    Returns (job, created).
+    """
+    h = _handlers[kind]
+    if key is not None:
+        existing = _active(db, kind, key)
+        if existing is not None:
+            return existing, False
+    now = datetime.now(timezone.utc)
+    job = Job(
+        queue=h.queue,
+        kind=kind,
+        key=key,
+        payload=payload or {},
+        priority=h.priority if priority is None else priority,
+        status="queued",
+        attempts=0,
+        max_attempts=h.max_attempts or settings.job_max_attempts,
+        run_at=run_at or now,
+        created_at=now,
+        progress=progress,
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race on ux_jobs_active_key
+        db.rollback()
+        existing = _active(db, kind, key) if key is not None else None
+        if existing is None:
+            raise
+        return existing, False
+    log.info("job_enqueued", job_id=str(job.id), kind=kind, queue=h.queue, key=key)
+    return job, True
+
+
+def retry(db: Session, job_id: uuid.UUID) -> Job | None:
+    """Requeue a failed job with a fresh attempt budget; None unless it is in status error."""
+    job = db.get(Job, job_id)
+    if job is None or job.status != "error":
+        return None
+    job.status = "queued"
+    job.attempts = 0
+    job.run_at = datetime.now(timezone.utc)
+    job.started_at = job.heartbeat_at = job.finished_at = job.worker = None
+    db.commit()
+    return job
+
+
+# --- Consuming ---
+
+
+def backoff_seconds(attempt: int) -> float:
+    delay = settings.job_backoff_base_seconds * 2 ** max(0, attempt - 1)
+    return min(settings.job_backoff_max_seconds, delay * random.uniform(0.8, 1.2))
+
+
+def claim(db: Session, queue: str, limit: int, worker_id: str) -> Job | None:
+    """Mark the next ready job of `queue` running, unless `limit` jobs already run there."""
+    db.execute(select(func.pg_advisory_xact_lock(CLAIM_LOCK_CLASS, func.hashtext(queue))))
+    running = db.scalar(select(func.count()).select_from(Job).where(Job.queue == queue, Job.status == "running"))
+    if running >= limit:
+        db.rollback()
+        return None
+    job = db.scalars(
+        select(Job)
+        .where(Job.queue == queue, Job.status == "queued", Job.run_at <= func.now())
+        .order_by(Job.priority.desc(), Job.run_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).first()
+    if job is None:
+        db.rollback()
+        return None
+    now = datetime.now(timezone.utc)
+    job.status = "running"
+    job.attempts += 1
+    job.started_at = job.heartbeat_at = now
+    job.worker = worker_id
+    db.commit()
+    return job
+
+
+def _owned(job: Job, worker_id: str):
+    # A job requeued by reap_stale() and claimed again is no longer ours to update
+    return and_(
+        Job.id == job.id, Job.status == "running", Job.worker == worker_id, Job.attempts == job.attempts,
+    )
+
+
+def finish(db: Session, job: Job, worker_id: str, ctx: JobContext, *, result: dict | None = None,
+           error: str | None = None, permanent: bool = False) -> str | None:
+    """Record the outcome of one attempt; returns the new status, or None if the job was taken over."""
+    now = datetime.now(timezone.utc)
+    values = {"progress": ctx.progress or None, "heartbeat_at": now}
+    if error is None:
+        values.update(status="completed", finished_at=now, result=result, error=None)
+    elif permanent or job.attempts >= job.max_attempts:
+        values.update(status="error", finished_at=now, error=error[:4000])
+    else:
+        values.update(
+            status="queued", error=error[:4000], worker=None,
+            run_at=now + timedelta(seconds=backoff_seconds(job.attempts)),
+        )
+    updated = db.execute(update(Job).where(_owned(job, worker_id)).values(**values)).rowcount
+    db.commit()
+    return values["status"] if updated else None
+
+
+def heartbeat(db: Session, running: dict[uuid.UUID, tuple[Job, JobContext]], worker_id: str) -> None:
+    now = datetime.now(timezone.utc)
+    for job, ctx in list(running.values()):
+        values = {"heartbeat_at": now}
+        progress = ctx.take_progress()
+        if progress is not None:
+            values["progress"] = progress
+        db.execute(update(Job).where(_owned(job, worker_id)).values(**values))
+    db.commit()
+
+
+def reap_stale(db: Session) -> int:
+    """Requeue (or fail, when out of attempts) running jobs whose worker stopped heartbeating."""
+    now = datetime.now(timezone.utc)
+    out_of_attempts = Job.attempts >= Job.max_attempts
+    result = db.execute(
+        update(Job)
+        .where(Job.status == "running", Job.heartbeat_at < now - timedelta(seconds=settings.job_stale_seconds))
+        .values(
+            status=case((out_of_attempts, "error"), else_="queued"),
+            finished_at=case((out_of_attempts, now), else_=None),
+            run_at=now,
+            worker=None,
+            error="worker stopped heartbeating",
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+def prune(db: Session) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.job_retention_days)
+    result = db.execute(delete(Job).where(Job.finished_at < cutoff))
+    db.commit()
+    return result.rowcount
+
+
+def _execute(job: Job, ctx: JobContext, worker_id: str) -> None:
+    h = _handlers.get(job.kind)
+    started = time.monotonic()
+    result, error, permanent = None, None, False
+    try:
+        if h is None:
+            raise PermanentJobError(f"No handler registered for {job.kind}")
+        result = h.fn(ctx)
+    except Exception as e:
+        error, permanent = f"{type(e).__name__}: {e}", isinstance(e, PermanentJobError)
+    db = SessionLocal()
+    try:
+        status = finish(db, job, worker_id, ctx, result=result, error=error, permanent=permanent)
+    except Exception as e:
+        db.rollback()
+        # The heartbeat stops with this attempt; reap_stale() retries the job
+        log.error("job_finish_error", job_id=str(job.id), error=str(e))
+        return
+    finally:
+        db.close()
+    log_fn = log.info if error is None else log.warning
+    log_fn(
+        "job_finished", job_id=str(job.id), kind=job.kind, queue=job.queue, attempt=job.attempts,
+        status=status or "taken_over", seconds=round(time.monotonic() - started, 3), error=error,
+    )
+
+
+def _in_session(fn, *args):
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def run_worker(queues: list[str] | None, stopping: threading.Event) -> None:
+    """Claim and run jobs until `stopping` is set, then let running jobs finish."""
+    load_handlers()
+    limits = queue_limits()
+    queues = queues or list(limits)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    pools = {q: ThreadPoolExecutor(max_workers=limits.get(q, 1), thread_name_prefix=f"job-{q}") for q in queues}
+    running: dict[uuid.UUID, tuple[Job, JobContext]] = {}
+    futures: dict[uuid.UUID, Future] = {}
+    last_heartbeat = last_reap = 0.0
+    log.info("job_worker_started", worker=worker_id, queues={q: limits.get(q, 1) for q in queues})
+
+    def housekeeping() -> None:
+        nonlocal last_heartbeat, last_reap
+        for job_id in [j for j, f in futures.items() if f.done()]:
+            futures.pop(job_id)
+            running.pop(job_id, None)
+        now = time.monotonic()
+        try:
+            if running and now - last_heartbeat >= settings.job_heartbeat_seconds:
+                _in_session(heartbeat, running, worker_id)
+                last_heartbeat = now
+            if now - last_reap >= settings.job_stale_seconds / 2:
+                last_reap = now
+                reaped = _in_session(reap_stale)
+                if reaped:
+                    log.warning("jobs_reaped", count=reaped)
+                _in_session(prune)
+        except Exception as e:
+            log.error("job_worker_housekeeping_error", error=str(e))
+
+    while not stopping.is_set():
+        claimed = False
+        for q in queues:
+            if sum(1 for job, _ in running.values() if job.queue == q) >= limits.get(q, 1):
+                continue
+            try:
+                job = _in_session(claim, q, limits.get(q, 1), worker_id)
+            except Exception as e:
+                log.error("job_claim_error", queue=q, error=str(e))
+                continue
+            if job is None:
+                continue
+            ctx = JobContext(job)
+            running[job.id] = (job, ctx)
+            futures[job.id] = pools[q].submit(_execute, job, ctx, worker_id)
+            claimed = True
+        housekeeping()
+        if not claimed:
+            stopping.wait(settings.job_poll_seconds)
+
+    # Draining: keep heartbeating so running jobs are not reaped while they finish
+    log.info("job_worker_draining", running=len(running))
+    while futures:
+        housekeeping()
+        time.sleep(0.5)
+    for pool in pools.values():
+        pool.shutdown(wait=True)
+    log.info("job_worker_stopped", worker=worker_id)
+
+
+# --- Status ---
+
+
+def stats(db: Session) -> list[dict]:
+    """Per queue: depth, running, recent throughput, queue wait and run time percentiles (last hour)."""
+    now = datetime.now(timezone.utc)
+    hour_ago = now - timedelta(hours=1)
+    ready = and_(Job.status == "queued", Job.run_at <= now)
+    started_recently = and_(Job.status != "queued", Job.started_at >= hour_ago)
+    finished_recently = and_(Job.status.in_(("completed", "error")), Job.finished_at >= hour_ago)
+    wait = extract("epoch", Job.started_at - Job.run_at)
+    run = extract("epoch", Job.finished_at - Job.started_at)
+    rows = db.execute(
+        select(
+            Job.queue,
+            func.count().filter(ready).label("ready"),
+            func.count().filter(and_(Job.status == "queued", Job.run_at > now)).label("delayed"),
+            func.count().filter(Job.status == "running").label("running"),
+            func.count().filter(and_(Job.status == "completed", Job.finished_at >= hour_ago)).label("completed_1h"),
+            func.count().filter(and_(Job.status == "error", Job.finished_at >= hour_ago)).label("failed_1h"),
+            func.min(Job.run_at).filter(ready).label("oldest_ready"),
+            func.percentile_cont(0.5).within_group(wait).filter(started_recently).label("wait_p50"),
+            func.percentile_cont(0.95).within_group(wait).filter(started_recently).label("wait_p95"),
+            func.percentile_cont(0.5).within_group(run).filter(finished_recently).label("run_p50"),
+            func.percentile_cont(0.95).within_group(run).filter(finished_recently).label("run_p95"),
+        )
+        .where(or_(Job.status.in_(ACTIVE), Job.finished_at >= hour_ago))
+        .group_by(Job.queue)
+    ).all()
+    by_queue = {r.queue: r for r in rows}
+    limits = queue_limits()
+    out = []
+    for queue in sorted(set(limits) | set(by_queue)):
+        r = by_queue.get(queue)
+        out.append({
+            "queue": queue,
+            "limit": limits.get(queue),
+            "ready": r.ready if r else 0,
+            "delayed": r.delayed if r else 0,
+            "running": r.running if r else 0,
+            "completed_1h": r.completed_1h if r else 0,
+            "failed_1h": r.failed_1h if r else 0,
+            "oldest_ready_seconds": round((now - r.oldest_ready).total_seconds(), 1) if r and r.oldest_ready else None,
+            "wait_p50_ms": _ms(r.wait_p50) if r else None,
+            "wait_p95_ms": _ms(r.wait_p95) if r else None,
+            "run_p50_ms": _ms(r.run_p50) if r else None,
+            "run_p95_ms": _ms(r.run_p95) if r else None,
+        })
+    return out
+
+
+def _ms(seconds) -> float | None:
+    return round(float(seconds) * 1000, 1) if seconds is not None else None
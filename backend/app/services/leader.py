@@ -0,0 +1,149 @@
+"""Scheduler leader election — exactly one worker process runs the periodic jobs.
+
+Every uvicorn worker starts its scheduler paused. A thread per process holds a
+dedicated connection and polls pg_try_advisory_lock(LOCK_KEY); the process that
+gets it resumes its scheduler. The lock is session-level, so Postgres releases it
+as soon as the leader's connection goes away — process killed, worker recycled,
+host gone (TCP keepalives) — and a follower takes over on its next poll. The
+leader checks its connection on every poll and pauses its scheduler the moment
+the check fails, so two schedulers overlap for at most one poll interval.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import psycopg
+import structlog
+from apscheduler.schedulers.base import BaseScheduler
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.database import engine, libpq_url
+
+log = structlog.get_logger()
+settings = get_settings()
+
+# Arbitrary but fixed: every worker of this app contends for the same keys
+LOCK_KEY = 7_346_510_021
+STARTUP_LOCK_KEY = 7_346_510_022
+RECONNECT_SECONDS = (1, 2, 5, 10, 30)
+
+_thread: threading.Thread | None = None
+_stopping = threading.Event()
+_leader = threading.Event()
+_state = {"since": None, "elections": 0}
+
+
+def is_leader() -> bool:
+    return _leader.is_set()
+
+
+def status() -> dict:
+    return {
+        "leader": _leader.is_set(),
+        "since": _state["since"],
+        "elections": _state["elections"],
+        "poll_seconds": settings.leader_poll_seconds,
+    }
+
+
+def _connect() -> psycopg.Connection:
+    # Keepalives: a leader whose host vanishes must not hold the lock for the
+    # kernel's default two hours
+    return psycopg.connect(
+        libpq_url(),
+        autocommit=True,
+        application_name="nvr-scheduler-leader",
+        connect_timeout=10,
+        keepalives=1,
+        keepalives_idle=10,
+        keepalives_interval=5,
+        keepalives_count=3,
+    )
+
+
+def _elected(scheduler: BaseScheduler) -> None:
+    _leader.set()
+    _state["since"] = datetime.now(timezone.utc).isoformat()
+    _state["elections"] += 1
+    scheduler.resume()
+    log.info("scheduler_leader_elected")
+
+
+def _step_down(scheduler: BaseScheduler, reason: str) -> None:
+    if not _leader.is_set():
+        return
+    # Jobs already running finish; nothing new starts here
+    scheduler.pause()
+    _leader.clear()
+    _state["since"] = None
+    log.warning("scheduler_leader_lost", reason=reason)
+
+
+def _run(scheduler: BaseScheduler) -> None:
+    attempt = 0
+    while not _stopping.is_set():
+        try:
+            with _connect() as conn:
+                attempt = 0
+                while not _stopping.is_set():
+                    if _leader.is_set():
+                        # Raises if the session (and with it the lock) is gone
+                        conn.execute("SELECT 1")
+                    elif conn.execute("SELECT pg_try_advisory_lock(%s)", (LOCK_KEY,)).fetchone()[0]:
+                        _elected(scheduler)
+                    _stopping.wait(settings.leader_poll_seconds)
+                _step_down(scheduler, "shutdown")
+            # Leaving the with block closes the connection and releases the lock
+        except Exception as e:
+            _step_down(scheduler, str(e))
+            delay = RECONNECT_SECONDS[min(attempt, len(RECONNECT_SECONDS) - 1)]
+            attempt += 1
+            log.warning("scheduler_leader_connection_error", error=str(e), retry_in=delay)
+            _stopping.wait(delay)
+
+
+def start(scheduler: BaseScheduler) -> None:
+    """Start contending for leadership; `scheduler` must already be started paused."""
+    global _thread
+    if _thread is None:
+        _stopping.clear()
+        _thread = threading.Thread(target=_run, args=(scheduler,), name="scheduler-leader", daemon=True)
+        _thread.start()
+
+
+def stop() -> None:
+    """Give up leadership promptly so a follower takes over within one poll."""
+    global _thread
+    _stopping.set()
+    if _thread is not None:
+        _thread.join(settings.leader_poll_seconds + 1)
+        _thread = None
+
+
+@contextmanager
+def startup_lock():
+    """Serialize create_all/partition/seed work across workers booting together."""
+    started = time.monotonic()
+    conn = None
+    try:
+        conn = engine.connect()
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": STARTUP_LOCK_KEY})
+    except Exception as e:
+        if conn is not None:
+            conn.close()
+        # Same as before the lock existed: the steps below log their own failures
+        log.warning("startup_lock_unavailable", error=str(e))
+        yield
+        return
+    log.info("startup_lock_acquired", waited_s=round(time.monotonic() - started, 2))
+    try:
+        yield
+    finally:
+        try:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": STARTUP_LOCK_KEY})
+            conn.commit()
+        finally:
+            conn.close()
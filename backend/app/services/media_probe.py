@@ -0,0 +1,226 @@
+"""Media probing — ffprobe recording/evidence files in a bounded process pool and cache the results.
+
+Results live in media_probes keyed by path, size and mtime, so an unchanged file is
+never probed twice. A recording is probed again when its size_bytes (kept current by
+ingest, upload and cold-tier transcodes) no longer matches the probed size. A file
+that is missing gets a probe row with error "missing", so it stops coming back as a
+candidate.
+"""
+
+import json
+import multiprocessing
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import structlog
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.evidence import EvidenceExport
+from app.models.media import MediaProbe
+from app.models.recording import Recording
+from app.services import cache_bus, seek_index
+from app.services.recording_store import ffmpeg_input_args, file_key, recording_path, segment_files
+
+log = structlog.get_logger()
+settings = get_settings()
+
+PROBE_TIMEOUT_SECONDS = 120
+MISSING = "missing"
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: the scheduler calls in from a thread, and forking a threaded process is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=max(1, settings.probe_workers),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# --- Worker side (runs in the process pool) ---
+
+
+def ffprobe_json(path: str) -> dict:
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path],
+        capture_output=True, check=True, timeout=PROBE_TIMEOUT_SECONDS,
+    ).stdout
+    return json.loads(out)
+
+
+def _keyframe_times(input_args: list[str]) -> list[float]:
+    """Keyframe timestamps from packet flags — demux only, no decoding."""
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", *input_args],
+        capture_output=True, check=True, timeout=PROBE_TIMEOUT_SECONDS, text=True,
+    ).stdout
+    times = []
+    for line in out.splitlines():
+        pts, _, flags = line.partition(",")
+        if "K" in flags and pts not in ("", "N/A"):
+            times.append(round(float(pts), 3))
+    return times
+
+
+def _fps(rate: str | None) -> float | None:
+    if not rate or rate == "0/0":
+        return None
+    num, _, den = rate.partition("/")
+    return round(float(num) / float(den or 1), 3)
+
+
+def probe_file(path: str) -> dict:
+    """
+    Probe one file (or the first segment of a Frigate directory) and return metadata fields.
+    A directory's keyframes are read through the same concat list HLS packaging uses, so
+    they are times in the joined stream; its duration is left to ingest.
+    """
+    try:
+        target = path
+        is_dir = os.path.isdir(path)
+        if is_dir:
+            segs = segment_files(path)
+            if not segs:
+                return {"error": "no segments"}
+            target = segs[0]
+            with tempfile.TemporaryDirectory() as workdir:
+                keyframes = _keyframe_times(ffmpeg_input_args(path, workdir))
+        else:
+            keyframes = _keyframe_times(["-i", path])
+
+        info = ffprobe_json(target)
+        fmt = info.get("format", {})
+        video = next((s for s in info.get("streams", []) if s.get("codec_type") == "video"), {})
+        audio = next((s for s in info.get("streams", []) if s.get("codec_type") == "audio"), {})
+        return {
+            "duration_seconds": None if is_dir else float(fmt.get("duration") or 0) or None,
+            "container": fmt.get("format_name"),
+            "video_codec": video.get("codec_name"),
+            "audio_codec": audio.get("codec_name"),
+            "width": video.get("width"),
+            "height": video.get("height"),
+            "fps": _fps(video.get("avg_frame_rate")),
+            "bit_rate": int(fmt["bit_rate"]) if fmt.get("bit_rate") else None,
+            "keyframes": keyframes,
+            "error": None,
+        }
+    except (subprocess.SubprocessError, OSError, ValueError) as e:
+        return {"error": str(e)[:500]}
+
+
+# --- Scheduler side ---
+
+
+def _candidates(db: Session, limit: int) -> list[tuple[str, dict]]:
+    """(path, link) pairs, oldest first: recordings/evidence with no probe yet, open
+    Frigate hours, and recordings whose size changed since they were probed."""
+    out: list[tuple[str, dict]] = []
+    recs = (
+        db.query(Recording.id, Recording.filename)
+        .outerjoin(MediaProbe, MediaProbe.recording_id == Recording.id)
+        .filter(or_(
+            MediaProbe.id.is_(None),
+            Recording.status == "processing",
+            and_(MediaProbe.size_bytes != Recording.size_bytes, MediaProbe.error.is_distinct_from(MISSING)),
+        ))
+        .order_by(Recording.created_at, Recording.id)
+        .limit(limit)
+        .all()
+    )
+    out += [(recording_path(fn), {"recording_id": rid}) for rid, fn in recs]
+    if len(out) < limit:
+        evs = (
+            db.query(EvidenceExport.id, EvidenceExport.object_store_uri)
+            .outerjoin(MediaProbe, MediaProbe.evidence_id == EvidenceExport.id)
+            .filter(MediaProbe.id.is_(None))
+            .order_by(EvidenceExport.requested_at, EvidenceExport.id)
+            .limit(limit - len(out))
+            .all()
+        )
+        out += [(uri, {"evidence_id": eid}) for eid, uri in evs]
+    return out
+
+
+def probe_pending(db: Session) -> dict:
+    """
+    Probe new or changed media files in the process pool and store the results.
+    Returns counts of probed and cache-hit files.
+    """
+    todo = []
+    cached = missing = 0
+    for path, link in _candidates(db, settings.probe_batch_size):
+        key = file_key(path)
+        row = db.query(MediaProbe).filter(MediaProbe.path == path).first()
+        if key is None:
+            # Recorded, so the candidate query skips it until the file is probed again
+            if row is None:
+                row = MediaProbe(path=path)
+                db.add(row)
+            for k, v in {**link, "size_bytes": 0, "mtime": 0.0, "error": MISSING}.items():
+                setattr(row, k, v)
+            row.probed_at = datetime.now(timezone.utc)
+            missing += 1
+            continue
+        if row and (row.size_bytes, row.mtime) == key:
+            # Same bytes already probed (e.g. a re-linked path) — just attach the link
+            for k, v in link.items():
+                setattr(row, k, v)
+            if link.get("recording_id"):
+                # A stale Recording.size_bytes would otherwise select this row forever
+                rec = db.get(Recording, link["recording_id"])
+                if rec.size_bytes is not None and rec.size_bytes != key[0]:
+                    rec.size_bytes = key[0]
+            cached += 1
+            continue
+        todo.append((path, link, key, row))
+
+    if missing:
+        log.warning("media_probe_missing_files", count=missing)
+    if not todo:
+        db.commit()
+        return {"probed": 0, "cached": cached, "missing": missing}
+
+    pool = _get_pool()
+    futures = [pool.submit(probe_file, path) for path, _, _, _ in todo]
+    errors = 0
+    for (path, link, (size, mtime), row), fut in zip(todo, futures):
+        result = fut.result()
+        if result.get("error"):
+            errors += 1
+            log.warning("media_probe_error", path=path, error=result["error"])
+        if row is None:
+            row = MediaProbe(path=path)
+            db.add(row)
+        for k, v in {**link, **result}.items():
+            setattr(row, k, v)
+        row.size_bytes = size
+        row.mtime = mtime
+        row.probed_at = datetime.now(timezone.utc)
+
+        # Replace placeholder/caller-supplied durations with the measured one
+        if link.get("recording_id") and result.get("duration_seconds"):
+            rec = db.get(Recording, link["recording_id"])
+            rec.duration_seconds = result["duration_seconds"]
+            seek_index.add(rec.camera_id, rec.id, rec.filename, rec.recording_date, rec.hour, rec.duration_seconds)
+            db.execute(cache_bus.recordings_changed(rec.camera_id, rec.recording_date))
+
+    db.commit()
+    log.info("media_probe_complete", probed=len(todo), cached=cached, errors=errors, missing=missing)
+    return {"probed": len(todo), "cached": cached, "missing": missing}
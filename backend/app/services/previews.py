@@ -0,0 +1,187 @@
+"""Scrub previews — poster frame, tiled sprite sheet and WebVTT thumbnail track per recording.
+
+Rendering runs in a bounded process pool from a scheduler job. Output lives in
+<preview_dir>/<recording_id>/ and is rebuilt when the recording's size changes.
+"""
+
+import math
+import multiprocessing
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import structlog
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.media import MediaProbe, RecordingPreview
+from app.models.recording import Recording
+from app.services.recording_store import ffmpeg_input_args, recording_path
+
+log = structlog.get_logger()
+settings = get_settings()
+
+POSTER = "poster.jpg"
+SPRITE = "sprite.jpg"
+VTT = "thumbs.vtt"
+PREVIEW_FILES = (POSTER, SPRITE, VTT)
+TILE_WIDTH = 160
+TILE_HEIGHT = 90
+COLUMNS = 10
+RENDER_TIMEOUT_SECONDS = 900
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=max(1, settings.preview_workers),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def preview_path(recording_id, name: str) -> str:
+    return os.path.join(settings.preview_dir, str(recording_id), name)
+
+
+def remove_previews(recording_id) -> None:
+    shutil.rmtree(os.path.join(settings.preview_dir, str(recording_id)), ignore_errors=True)
+
+
+def _vtt_timestamp(seconds: float) -> str:
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{int(h):02d}:{int(m):02d}:{s:06.3f}"
+
+
+# --- Worker side (runs in the process pool) ---
+
+
+def render_previews(src: str, out_dir: str, duration: float, interval: float) -> dict:
+    """Render poster, sprite sheet and VTT for one recording into out_dir."""
+    tmp = f"{out_dir}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    try:
+        tiles = max(1, math.ceil(duration / interval))
+        rows = math.ceil(tiles / COLUMNS)
+        cols = min(COLUMNS, tiles)
+        inputs = ffmpeg_input_args(src, tmp)
+        fit = (
+            f"scale={TILE_WIDTH}:{TILE_HEIGHT}:force_original_aspect_ratio=decrease,"
+            f"pad={TILE_WIDTH}:{TILE_HEIGHT}:(ow-iw)/2:(oh-ih)/2"
+        )
+
+        subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-y", "-ss", f"{min(1.0, duration / 2):.3f}", *inputs,
+             "-frames:v", "1", "-vf", "scale=640:-2", "-q:v", "4", os.path.join(tmp, POSTER)],
+            check=True, capture_output=True, timeout=RENDER_TIMEOUT_SECONDS,
+        )
+        # Decode keyframes only: preview tiles don't need frame accuracy
+        subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-y", "-skip_frame", "nokey", *inputs,
+             "-vf", f"fps=1/{interval},{fit},tile={cols}x{rows}", "-frames:v", "1", "-q:v", "5",
+             os.path.join(tmp, SPRITE)],
+            check=True, capture_output=True, timeout=RENDER_TIMEOUT_SECONDS,
+        )
+
+        lines = ["WEBVTT", ""]
+        for i in range(tiles):
+            start, end = i * interval, min((i + 1) * interval, duration)
+            x, y = (i % cols) * TILE_WIDTH, (i // cols) * TILE_HEIGHT
+            lines += [
+                f"{_vtt_timestamp(start)} --> {_vtt_timestamp(end)}",
+                f"{SPRITE}#xywh={x},{y},{TILE_WIDTH},{TILE_HEIGHT}",
+                "",
+            ]
+        with open(os.path.join(tmp, VTT), "w") as f:
+            f.write("\n".join(lines))
+
+        inputs_list = os.path.join(tmp, "inputs.txt")
+        if os.path.exists(inputs_list):
+            os.remove(inputs_list)
+        shutil.rmtree(out_dir, ignore_errors=True)
+        os.rename(tmp, out_dir)
+        return {"tiles": tiles, "columns": cols, "error": None}
+    except (subprocess.SubprocessError, OSError) as e:
+        shutil.rmtree(tmp, ignore_errors=True)
+        return {"tiles": 0, "columns": 0, "error": str(e)[:500]}
+
+
+# --- Scheduler side ---
+
+
+def generate_pending(db: Session) -> dict:
+    """
+    Render previews for closed recordings that have none, or whose size changed.
+    Returns counts of generated and failed previews.
+    """
+    rows = (
+        db.query(Recording, RecordingPreview, MediaProbe.duration_seconds)
+        .outerjoin(RecordingPreview, RecordingPreview.recording_id == Recording.id)
+        .outerjoin(MediaProbe, MediaProbe.recording_id == Recording.id)
+        .filter(Recording.status == "available")
+        .filter(or_(Recording.duration_seconds.isnot(None), MediaProbe.duration_seconds.isnot(None)))
+        .filter(or_(RecordingPreview.recording_id.is_(None), RecordingPreview.size_bytes != Recording.size_bytes))
+        .limit(settings.preview_batch_size)
+        .all()
+    )
+    if not rows:
+        return {"generated": 0, "failed": 0}
+
+    pool = _get_pool()
+    jobs = []
+    for rec, preview, probed_duration in rows:
+        duration = probed_duration or rec.duration_seconds
+        if not duration:
+            continue
+        # Widen the interval for long recordings so the sprite stays within max tiles
+        interval = max(settings.preview_tile_seconds, duration / settings.preview_max_tiles)
+        out_dir = os.path.join(settings.preview_dir, str(rec.id))
+        os.makedirs(settings.preview_dir, exist_ok=True)
+        fut = pool.submit(render_previews, recording_path(rec.filename), out_dir, duration, interval)
+        jobs.append((rec, preview, interval, fut))
+
+    failed = 0
+    for rec, preview, interval, fut in jobs:
+        result = fut.result()
+        if result["error"]:
+            failed += 1
+            log.warning("preview_error", recording_id=str(rec.id), error=result["error"])
+        if preview is None:
+            preview = RecordingPreview(recording_id=rec.id)
+            db.add(preview)
+        preview.size_bytes = rec.size_bytes or 0
+        preview.interval_seconds = interval
+        preview.tiles = result["tiles"]
+        preview.columns = result["columns"]
+        preview.tile_width = TILE_WIDTH
+        preview.tile_height = TILE_HEIGHT
+        preview.error = result["error"]
+        preview.generated_at = datetime.now(timezone.utc)
+
+    db.commit()
+    log.info("preview_batch_complete", generated=len(jobs) - failed, failed=failed)
+    return {"generated": len(jobs) - failed, "failed": failed}
+
+
+def vtt_with_token(recording_id, token: str | None) -> str:
+    """The thumbnail track, with ?token= appended to sprite URLs for <img>/<track> loads."""
+    with open(preview_path(recording_id, VTT)) as f:
+        body = f.read()
+    if token:
+        body = body.replace(f"{SPRITE}#xywh=", f"{SPRITE}?token={token}#xywh=")
+    return body
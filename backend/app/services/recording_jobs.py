@@ -0,0 +1,257 @@
+"""Recording jobs — generate hourly segments in worker.py with bounded ffmpeg concurrency.
+
+Jobs are rows in the durable queue (kind "recordings.simulate", queue "media");
+the functions here map them to the RecordingJobOut shape the recordings API serves.
+"""
+
+import asyncio
+import os
+import shutil
+import uuid
+from datetime import date, datetime, timezone
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.job import Job
+from app.models.recording import Recording
+from app.services import cache_bus, job_queue, seek_index, timeline
+from app.services.previews import remove_previews
+from app.services.recording_store import FRIGATE_PREFIX, insert_recordings, recording_path
+
+log = structlog.get_logger()
+settings = get_settings()
+
+MAX_TRACKED_JOBS = 50
+SIMULATE = "recordings.simulate"
+
+
+def job_concurrency() -> int:
+    """Max ffmpeg processes a job may run at once (defaults to CPU cores)."""
+    return settings.recording_job_concurrency or os.cpu_count() or 1
+
+
+def job_status(job: Job) -> dict:
+    """A queue row in the RecordingJobOut shape."""
+    progress = job.progress or {}
+    return {
+        "id": str(job.id),
+        "kind": "simulate",
+        "key": job.key,
+        "status": job.status,
+        "total": progress.get("total", 0),
+        "done": progress.get("done", 0),
+        "failed": progress.get("failed", 0),
+        "created": progress.get("created", 0),
+        "params": {"date": job.payload.get("date"), "cameras": [name for _, name in job.payload.get("cameras", [])]},
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def enqueue_simulation(db: Session, day: date, cameras: list[tuple[uuid.UUID, str]]) -> tuple[dict, bool]:
+    """Queue a simulation of `day`, or return the one already queued/running for it (created False)."""
+    job, created = job_queue.enqueue(
+        db,
+        SIMULATE,
+        {"date": day.isoformat(), "cameras": [[str(cam_id), name] for cam_id, name in cameras]},
+        # A re-simulate of the same day while one is running would purge its output
+        key=day.isoformat(),
+        progress={"total": len(cameras) * 24, "done": 0, "failed": 0, "created": 0},
+    )
+    return job_status(job), created
+
+
+def get_job(db: Session, job_id: uuid.UUID) -> dict | None:
+    job = db.get(Job, job_id)
+    return job_status(job) if job is not None and job.kind == SIMULATE else None
+
+
+def list_jobs(db: Session) -> list[dict]:
+    jobs = db.scalars(
+        select(Job).where(Job.kind == SIMULATE).order_by(Job.created_at.desc()).limit(MAX_TRACKED_JOBS)
+    ).all()
+    return [job_status(j) for j in jobs]
+
+
+# --- Daily simulation ---
+
+
+def _simulated_name(frigate_name: str, day: date, hour: int) -> str:
+    return f"{frigate_name}_{day.isoformat()}_H{hour:02d}.mp4"
+
+
+def _purge_day(day: date) -> int:
+    """Delete a previous simulation's recordings (rows + files) for a day before re-simulating.
+
+    Only simulated files (<camera>_<date>_H<hh>.mp4) go: Frigate-indexed hours are
+    behind the ingest watermark and would never be re-indexed, and uploads are real footage.
+    """
+    db = SessionLocal()
+    try:
+        existing = db.query(Recording).filter(
+            Recording.recording_date == day,
+            ~Recording.filename.startswith(FRIGATE_PREFIX),
+            Recording.filename.like(f"{day.isoformat()}/%\\_H__.mp4", escape="\\"),
+        ).all()
+        for ex in existing:
+            fpath = recording_path(ex.filename)
+            if os.path.isfile(fpath):
+                os.remove(fpath)
+            remove_previews(ex.id)
+            seek_index.remove(ex.camera_id, ex.id)
+            db.delete(ex)
+        if existing:
+            for camera_id in {ex.camera_id for ex in existing}:
+                db.execute(cache_bus.recordings_changed(camera_id, day))
+            db.commit()
+        return len(existing)
+    finally:
+        db.close()
+
+
+def _bulk_insert(rows: list[dict]) -> list[dict]:
+    if not rows:
+        return []
+    db = SessionLocal()
+    try:
+        inserted = insert_recordings(db, rows)
+        for camera_id, day in {(r["camera_id"], r["recording_date"]) for r in inserted}:
+            db.execute(cache_bus.recordings_changed(camera_id, day))
+        db.commit()
+        return inserted
+    finally:
+        db.close()
+
+
+async def _run_ffmpeg(args: list[str]) -> int:
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", *args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    return await proc.wait()
+
+
+async def _simulate_hour(
+    sem: asyncio.Semaphore,
+    frigate_name: str,
+    day: date,
+    hour: int,
+    dest_path: str,
+    sample: str | None,
+) -> float | None:
+    """Produce one hourly segment; returns its duration, or None on failure (no file left behind)."""
+    async with sem:
+        if sample:
+            await asyncio.to_thread(shutil.copy2, sample, dest_path)
+            return 30.0
+        returncode = await _run_ffmpeg([
+            "-y", "-f", "lavfi", "-i", "testsrc2=size=1280x720:rate=15:duration=15",
+            "-vf", (
+                f"drawtext=text='{frigate_name} {day} {hour:02d}\\:00':fontcolor=white:fontsize=28:"
+                "x=10:y=10:box=1:boxcolor=black@0.6:boxborderw=5"
+            ),
+            "-c:v", "libx264", "-preset", "ultrafast", "-crf", "30",
+            dest_path,
+        ])
+    if returncode != 0:
+        # A failed run can leave a truncated file that would otherwise look playable
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        log.warning("recording_job_ffmpeg_failed", path=dest_path, returncode=returncode)
+        return None
+    return 15.0 if os.path.exists(dest_path) else None
+
+
+async def _simulate_camera(
+    ctx: job_queue.JobContext,
+    sem: asyncio.Semaphore,
+    camera_id: uuid.UUID,
+    frigate_name: str,
+    day: date,
+    sample_files: list[str],
+) -> None:
+    date_dir = os.path.join(settings.recordings_dir, day.isoformat())
+    os.makedirs(date_dir, exist_ok=True)
+
+    async def one(hour: int) -> dict | None:
+        safe_name = _simulated_name(frigate_name, day, hour)
+        dest_path = os.path.join(date_dir, safe_name)
+        sample = sample_files[hour % len(sample_files)] if sample_files else None
+        try:
+            duration = await _simulate_hour(sem, frigate_name, day, hour, dest_path, sample)
+        except Exception as e:
+            log.warning("recording_job_hour_error", job_id=str(ctx.id), camera=frigate_name, hour=hour, error=str(e))
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+            duration = None
+        if duration is None:
+            ctx.incr(done=1, failed=1)
+            return None
+        ctx.incr(done=1)
+        return {
+            "id": uuid.uuid4(),
+            "camera_id": camera_id,
+            "recording_date": day,
+            "hour": hour,
+            "filename": f"{day.isoformat()}/{safe_name}",
+            "duration_seconds": duration,
+            "size_bytes": os.path.getsize(dest_path),
+            "status": "available",
+            "created_at": datetime.now(timezone.utc),
+        }
+
+    results = await asyncio.gather(*(one(h) for h in range(24)))
+    rows = [r for r in results if r is not None]
+
+    # One bulk insert per camera instead of 24 individual adds
+    inserted = await asyncio.to_thread(_bulk_insert, rows)
+    # Hours held by an upload or a Frigate row keep it; drop the simulated file
+    kept = {r["id"] for r in inserted}
+    for r in rows:
+        if r["id"] not in kept:
+            os.remove(recording_path(r["filename"]))
+    rows = inserted
+    seek_index.add_rows(rows)
+    timeline.invalidate(camera_id, day)
+    ctx.incr(created=len(rows))
+    log.info("recording_job_camera_done", job_id=str(ctx.id), camera=frigate_name, segments=len(rows))
+
+
+async def run_simulation_job(ctx: job_queue.JobContext, day: date, cameras: list[tuple[uuid.UUID, str]]) -> None:
+    """Simulate 24 hourly segments for each camera; progress is reported through ctx."""
+    sample_files = []
+    if os.path.exists(settings.samples_dir):
+        sample_files = sorted(
+            os.path.join(settings.samples_dir, f)
+            for f in os.listdir(settings.samples_dir)
+            if f.endswith((".mp4", ".mkv"))
+        )
+
+    # Also makes a retried attempt start from a clean day
+    purged = await asyncio.to_thread(_purge_day, day)
+    if purged:
+        log.info("recording_job_purged", job_id=str(ctx.id), date=day.isoformat(), removed=purged)
+
+    ctx.set(done=0, failed=0, created=0)
+    sem = asyncio.Semaphore(job_concurrency())
+    await asyncio.gather(*(
+        _simulate_camera(ctx, sem, cam_id, name, day, sample_files) for cam_id, name in cameras
+    ))
+
+
+@job_queue.handler(SIMULATE, queue="media")
+def _simulate_job(ctx: job_queue.JobContext) -> dict:
+    day = date.fromisoformat(ctx.payload["date"])
+    cameras = [(uuid.UUID(cam_id), name) for cam_id, name in ctx.payload["cameras"]]
+    os.makedirs(settings.recordings_dir, exist_ok=True)
+    asyncio.run(run_simulation_job(ctx, day, cameras))
+    progress = ctx.progress
+    log.info("recording_job_complete", job_id=str(ctx.id), created=progress["created"], failed=progress["failed"])
+    return {"created": progress["created"], "failed": progress["failed"]}
@@ -0,0 +1,74 @@
+"""Recording storage helpers — map Recording.filename to a path on disk, bulk-insert rows."""
+
+import os
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.recording import Recording
+
+settings = get_settings()
+
+# Recordings indexed from Frigate keep their segments in place; filename is
+# "frigate:<YYYY-MM-DD>/<HH>/<camera>" relative to frigate_recordings_dir.
+FRIGATE_PREFIX = "frigate:"
+# Frigate's default segment length; the last segment's end is not in its MM.SS name
+FRIGATE_SEGMENT_SECONDS = 10.0
+
+
+def is_frigate_recording(filename: str) -> bool:
+    return filename.startswith(FRIGATE_PREFIX)
+
+
+def recording_path(filename: str) -> str:
+    """Absolute path of a recording: an MP4 file, or a Frigate segment directory."""
+    if is_frigate_recording(filename):
+        return os.path.join(settings.frigate_recordings_dir, filename[len(FRIGATE_PREFIX):])
+    return os.path.join(settings.recordings_dir, filename)
+
+
+def segment_files(dirpath: str) -> list[str]:
+    """Sorted segment paths of a Frigate hour/camera directory (MM.SS.mp4)."""
+    try:
+        names = sorted(n for n in os.listdir(dirpath) if n.endswith(".mp4"))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(dirpath, n) for n in names]
+
+
+def file_key(path: str) -> tuple[int, float] | None:
+    """(size, mtime) cache key of a file or Frigate segment directory."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if os.path.isdir(path):
+        return sum(os.path.getsize(p) for p in segment_files(path)), st.st_mtime
+    return st.st_size, st.st_mtime
+
+
+def ffmpeg_input_args(path: str, workdir: str) -> list[str]:
+    """ffmpeg input arguments for a file, or a concat list for a Frigate directory."""
+    if os.path.isdir(path):
+        listfile = os.path.join(workdir, "inputs.txt")
+        with open(listfile, "w") as f:
+            f.writelines(f"file '{p}'\n" for p in segment_files(path))
+        return ["-f", "concat", "-safe", "0", "-i", listfile]
+    return ["-i", path]
+
+
+def insert_recordings(db: Session, rows: list[dict]) -> list[dict]:
+    """
+    Bulk-insert Recording rows, skipping camera-hours that already have a row.
+    Returns the rows actually inserted (caller commits).
+    """
+    if not rows:
+        return []
+    stmt = (
+        pg_insert(Recording)
+        .on_conflict_do_nothing(constraint="uq_recordings_camera_date_hour")
+        .returning(Recording.id)
+    )
+    ids = set(db.scalars(stmt, rows))
+    return [r for r in rows if r["id"] in ids]
@@ -0,0 +1,235 @@
+"""Retention — evict local recordings by per-camera age/quota and global disk limits.
+
+Sizes come from the storage_usage index (kept current by a trigger on recordings),
+so planning never walks the filesystem. Victims are taken oldest-first through the
+(camera_id, recording_date, hour) index and deleted in batches. Hours covered by an
+event with an evidence export are never evicted. Frigate-indexed recordings are left
+to Frigate's own retention.
+"""
+
+import os
+import shutil
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import structlog
+from sqlalchemy import delete, func, tuple_
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.camera import Camera
+from app.models.event import Event
+from app.models.evidence import EvidenceExport
+from app.models.recording import Recording
+from app.models.retention import RetentionPolicy, StorageUsage
+from app.services import cache_bus, seek_index, timeline
+from app.services.previews import remove_previews
+from app.services.recording_store import FRIGATE_PREFIX, recording_path
+
+log = structlog.get_logger()
+settings = get_settings()
+
+GB = 1024 ** 3
+# Rows still being written or rewritten are never evicted
+BUSY_STATUSES = ("processing", "transcoding")
+
+
+def camera_policies(db: Session) -> dict[uuid.UUID, dict]:
+    """Effective policy per camera: settings defaults overridden by retention_policies rows."""
+    overrides = {p.camera_id: p for p in db.query(RetentionPolicy).all()}
+    out = {}
+    for cam_id, name in db.query(Camera.id, Camera.frigate_name).order_by(Camera.frigate_name).all():
+        p = overrides.get(cam_id)
+        out[cam_id] = {
+            "camera": name,
+            "max_age_days": (
+                p.max_age_days if p and p.max_age_days is not None else settings.retention_max_age_days
+            ),
+            "max_bytes": (
+                p.max_bytes if p and p.max_bytes is not None else int(settings.retention_camera_quota_gb * GB)
+            ),
+        }
+    return out
+
+
+def usage_by_camera(db: Session) -> dict[uuid.UUID, int]:
+    return dict(
+        db.query(StorageUsage.camera_id, func.sum(StorageUsage.bytes)).group_by(StorageUsage.camera_id).all()
+    )
+
+
+def protected_hours(db: Session) -> set[tuple[uuid.UUID, date, int]]:
+    """(camera_id, local date, hour) of every hour overlapping an exported event."""
+    tz = ZoneInfo(settings.tz)
+    hours = set()
+    rows = (
+        db.query(Event.camera_id, Event.start_time, Event.end_time)
+        .join(EvidenceExport, EvidenceExport.event_id == Event.id)
+        .distinct()
+        .all()
+    )
+    for camera_id, start, end in rows:
+        # Step in UTC so DST transitions neither skip nor repeat an hour
+        t = start.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        while t <= (end or start):
+            local = t.astimezone(tz)
+            hours.add((camera_id, local.date(), local.hour))
+            t += timedelta(hours=1)
+    return hours
+
+
+def _oldest_first(db: Session, camera_id: uuid.UUID | None):
+    """Yield evictable recordings oldest-first, one keyset page at a time."""
+    if camera_id:
+        key = (Recording.recording_date, Recording.hour)
+    else:
+        key = (Recording.recording_date, Recording.hour, Recording.camera_id)
+    after = None
+    while True:
+        q = db.query(
+            Recording.id, Recording.camera_id, Recording.recording_date, Recording.hour,
+            Recording.size_bytes, Recording.filename,
+        ).filter(~Recording.filename.startswith(FRIGATE_PREFIX), Recording.status.notin_(BUSY_STATUSES))
+        if camera_id:
+            q = q.filter(Recording.camera_id == camera_id)
+        if after is not None:
+            q = q.filter(tuple_(*key) > tuple_(*after))
+        page = q.order_by(*key).limit(settings.retention_batch_size).all()
+        if not page:
+            return
+        yield from page
+        last = page[-1]
+        after = (last.recording_date, last.hour, last.camera_id)[:len(key)]
+
+
+def _evict(db: Session, rows: list) -> None:
+    """Delete one batch: rows first, then files, previews and in-memory indexes."""
+    db.execute(delete(Recording).where(Recording.id.in_([r.id for r in rows])))
+    for camera_id, day in {(r.camera_id, r.recording_date) for r in rows}:
+        db.execute(cache_bus.recordings_changed(camera_id, day))
+    db.commit()
+    for r in rows:
+        path = recording_path(r.filename)
+        try:
+            if os.path.isfile(path):
+                os.remove(path)
+        except OSError as e:
+            log.warning("retention_file_error", path=path, error=str(e))
+        remove_previews(r.id)
+        seek_index.remove(r.camera_id, r.id)
+    for camera_id, day in {(r.camera_id, r.recording_date) for r in rows}:
+        timeline.invalidate(camera_id, day)
+
+
+def _evictable_bytes(db: Session) -> int:
+    """Bytes held by recordings retention may delete (local files, not busy)."""
+    return db.query(func.coalesce(func.sum(Recording.size_bytes), 0)).filter(
+        ~Recording.filename.startswith(FRIGATE_PREFIX), Recording.status.notin_(BUSY_STATUSES)
+    ).scalar()
+
+
+def _disk_deficit(db: Session, already_freed: int) -> int:
+    """
+    Bytes to free for the recordings disk to reach retention_min_free_percent free,
+    capped at what evicting local recordings can free: the rest of the disk may be
+    Frigate's, and deleting every local recording would not close that gap.
+    """
+    if not settings.retention_min_free_percent:
+        return 0
+    try:
+        du = shutil.disk_usage(settings.recordings_dir)
+    except FileNotFoundError:
+        return 0
+    deficit = max(0, int(du.total * settings.retention_min_free_percent / 100) - du.free - already_freed)
+    if not deficit:
+        return 0
+    evictable = max(0, _evictable_bytes(db) - already_freed)
+    if deficit > evictable:
+        log.warning("retention_disk_deficit_uncoverable", deficit_bytes=deficit, evictable_bytes=evictable)
+    return min(deficit, evictable)
+
+
+def apply_retention(db: Session, dry_run: bool = False) -> dict:
+    """
+    Evict recordings past their camera's max age or quota, then oldest-first across
+    cameras while over the total quota or short of free disk space.
+    With dry_run, nothing is deleted and the report shows what would be removed.
+    """
+    tz = ZoneInfo(settings.tz)
+    today = datetime.now(timezone.utc).astimezone(tz).date()
+    policies = camera_policies(db)
+    usage = usage_by_camera(db)
+    protected = protected_hours(db)
+
+    chosen: set[uuid.UUID] = set()
+    batch: list = []
+
+    def take(row, stats: dict) -> None:
+        chosen.add(row.id)
+        stats["recordings"] += 1
+        stats["bytes"] += row.size_bytes or 0
+        stats["oldest"] = stats["oldest"] or row.recording_date
+        stats["newest"] = row.recording_date
+        if dry_run:
+            return
+        batch.append(row)
+        if len(batch) >= settings.retention_batch_size:
+            _evict(db, batch)
+            batch.clear()
+
+    def new_stats(**kw) -> dict:
+        return {**kw, "recordings": 0, "bytes": 0, "protected": 0, "oldest": None, "newest": None}
+
+    cameras = []
+    for camera_id, policy in policies.items():
+        stats = new_stats(camera_id=camera_id, usage_bytes=usage.get(camera_id, 0), **policy)
+        cutoff = today - timedelta(days=policy["max_age_days"]) if policy["max_age_days"] else None
+        excess = stats["usage_bytes"] - policy["max_bytes"] if policy["max_bytes"] else 0
+        cameras.append(stats)
+        if cutoff is None and excess <= 0:
+            continue
+        for row in _oldest_first(db, camera_id):
+            if not (excess > 0 or (cutoff and row.recording_date < cutoff)):
+                break
+            if (camera_id, row.recording_date, row.hour) in protected:
+                stats["protected"] += 1
+                continue
+            take(row, stats)
+            excess -= row.size_bytes or 0
+
+    if batch:
+        _evict(db, batch)
+        batch.clear()
+
+    # Global pass: total quota and free-space floor
+    freed = sum(c["bytes"] for c in cameras)
+    # After a real pass the disk and the table already reflect what was freed
+    need = _disk_deficit(db, freed if dry_run else 0)
+    if settings.retention_total_quota_gb:
+        need = max(need, sum(usage.values()) - freed - int(settings.retention_total_quota_gb * GB))
+    overall = new_stats(need_bytes=max(0, need))
+    if need > 0:
+        for row in _oldest_first(db, None):
+            if need <= 0:
+                break
+            if row.id in chosen:
+                continue
+            if (row.camera_id, row.recording_date, row.hour) in protected:
+                overall["protected"] += 1
+                continue
+            take(row, overall)
+            need -= row.size_bytes or 0
+        if batch:
+            _evict(db, batch)
+
+    report = {
+        "dry_run": dry_run,
+        "recordings": sum(c["recordings"] for c in cameras) + overall["recordings"],
+        "bytes": freed + overall["bytes"],
+        "cameras": cameras,
+        "overall": overall,
+    }
+    if report["recordings"] and not dry_run:
+        log.info("retention_evicted", recordings=report["recordings"], bytes=report["bytes"])
+    return report
@@ -0,0 +1,223 @@
+"""Seek index — in-memory interval index of recordings per camera.
+
+Maps an instant (e.g. Event.start_time) to the recording covering it and the offset
+into that recording, in O(log n). A camera's index is loaded on first use and then
+kept current by the code paths that insert, update or delete recordings. Loading runs
+outside the global lock; changes made meanwhile are queued and replayed onto the
+loaded index before it is installed.
+
+A recording file covers [hour start, hour start + duration). A Frigate hour is
+indexed from its MM.SS.mp4 segment names instead, as one span per run of
+consecutive segments, so gaps while the camera was offline resolve to nothing and
+offsets count only recorded time, as in the remuxed /play stream.
+"""
+
+import bisect
+import os
+import threading
+import uuid
+from collections.abc import Callable
+from datetime import date, datetime, time
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.recording import Recording
+from app.services.recording_store import FRIGATE_SEGMENT_SECONDS, is_frigate_recording, recording_path, segment_files
+
+settings = get_settings()
+
+# Recordings without a known duration are assumed to span their whole hour
+DEFAULT_DURATION_SECONDS = 3600.0
+
+Span = tuple[float, float, float]  # (start, end, offset into the recording at start)
+
+
+class _CameraIndex:
+    """Spans of one camera's recordings sorted by start: parallel lists for bisect."""
+
+    __slots__ = ("starts", "entries", "positions", "days")
+
+    def __init__(self):
+        self.starts: list[float] = []
+        self.entries: list[tuple[float, float, uuid.UUID, float]] = []  # (start, end, recording_id, offset)
+        self.positions: dict[uuid.UUID, list[float]] = {}  # recording_id -> span starts
+        self.days: dict[uuid.UUID, date] = {}  # recording_id -> recording_date
+
+    def add(self, rec_id: uuid.UUID, day: date, spans: list[Span]) -> None:
+        self.remove(rec_id)
+        for start, end, offset in spans:
+            i = bisect.bisect_right(self.starts, start)
+            self.starts.insert(i, start)
+            self.entries.insert(i, (start, end, rec_id, offset))
+        if spans:
+            self.positions[rec_id] = [s for s, _, _ in spans]
+            self.days[rec_id] = day
+
+    def replace_day(self, day: date, recordings: dict[uuid.UUID, list[Span]]) -> None:
+        """Make the recordings of one day exactly `recordings` (recording_id -> spans)."""
+        for rec_id in [r for r, d in self.days.items() if d == day and r not in recordings]:
+            self.remove(rec_id)
+        for rec_id, spans in recordings.items():
+            self.add(rec_id, day, spans)
+
+    def remove(self, rec_id: uuid.UUID) -> None:
+        self.days.pop(rec_id, None)
+        for start in self.positions.pop(rec_id, ()):
+            i = bisect.bisect_left(self.starts, start)
+            while self.entries[i][2] != rec_id:
+                i += 1
+            del self.starts[i]
+            del self.entries[i]
+
+    def find(self, ts: float) -> tuple[uuid.UUID, float] | None:
+        i = bisect.bisect_right(self.starts, ts) - 1
+        # Check a couple of predecessors in case of overlapping rows
+        for j in range(i, max(i - 2, -1), -1):
+            start, end, rec_id, offset = self.entries[j]
+            if start <= ts < end:
+                return rec_id, offset + ts - start
+        return None
+
+
+_indexes: dict[uuid.UUID, _CameraIndex] = {}
+# Changes to a camera that is being loaded, replayed onto the result; popped by drop()
+_loading: dict[uuid.UUID, list[Callable[[_CameraIndex], None]]] = {}
+_lock = threading.Lock()  # guards the dicts above and index mutation; never held across I/O
+_load_locks: dict[uuid.UUID, threading.Lock] = {}  # one loader per camera
+
+
+def segment_spans(hour_start: float, offsets: list[int]) -> list[Span]:
+    """
+    Spans of a Frigate hour from its segment start offsets (seconds into the hour,
+    sorted). A segment lasts until the next one starts, or FRIGATE_SEGMENT_SECONDS
+    at most; consecutive segments are merged into one span.
+    """
+    spans: list[Span] = []
+    recorded = 0.0
+    for i, off in enumerate(offsets):
+        length = FRIGATE_SEGMENT_SECONDS
+        if i + 1 < len(offsets):
+            length = min(float(offsets[i + 1] - off), FRIGATE_SEGMENT_SECONDS)
+        start = hour_start + off
+        if spans and spans[-1][1] >= start:
+            spans[-1] = (spans[-1][0], start + length, spans[-1][2])
+        else:
+            spans.append((start, start + length, recorded))
+        recorded += length
+    return spans
+
+
+def _spans(filename: str, recording_date: date, hour: int, duration_seconds: float | None) -> list[Span]:
+    start = datetime.combine(recording_date, time(hour), tzinfo=ZoneInfo(settings.tz)).timestamp()
+    if is_frigate_recording(filename):
+        names = (os.path.basename(p) for p in segment_files(recording_path(filename)))
+        return segment_spans(start, [int(n[:2]) * 60 + int(n[3:5]) for n in names])
+    return [(start, start + (duration_seconds or DEFAULT_DURATION_SECONDS), 0.0)]
+
+
+def _load(db: Session, camera_id: uuid.UUID) -> _CameraIndex:
+    idx = _CameraIndex()
+    rows = (
+        db.query(Recording.id, Recording.filename, Recording.recording_date, Recording.hour, Recording.duration_seconds)
+        .filter(Recording.camera_id == camera_id)
+        .all()
+    )
+    spans = sorted((start, end, rid, offset) for rid, *rest in rows for start, end, offset in _spans(*rest))
+    idx.starts = [s for s, _, _, _ in spans]
+    idx.entries = spans
+    for s, _, rid, _ in spans:
+        idx.positions.setdefault(rid, []).append(s)
+    idx.days = {rid: rec_date for rid, _, rec_date, _, _ in rows if rid in idx.positions}
+    return idx
+
+
+def _tracked(camera_id: uuid.UUID) -> bool:
+    with _lock:
+        return camera_id in _indexes or camera_id in _loading
+
+
+def _apply(camera_id: uuid.UUID, change: Callable[[_CameraIndex], None]) -> None:
+    """Apply a change to the camera's index, or queue it if the index is being loaded."""
+    with _lock:
+        idx = _indexes.get(camera_id)
+        if idx is not None:
+            change(idx)
+        elif camera_id in _loading:
+            _loading[camera_id].append(change)
+
+
+def add(camera_id: uuid.UUID, recording_id: uuid.UUID, filename: str, recording_date: date, hour: int,
+        duration_seconds: float | None) -> None:
+    """Insert or update one recording in its camera's index (no-op if not loaded yet)."""
+    if not _tracked(camera_id):
+        return
+    spans = _spans(filename, recording_date, hour, duration_seconds)
+    _apply(camera_id, lambda idx: idx.add(recording_id, recording_date, spans))
+
+
+def add_rows(rows: list[dict]) -> None:
+    """Index bulk-inserted Recording rows (dicts with camera_id/id/filename/recording_date/hour)."""
+    for r in rows:
+        add(r["camera_id"], r["id"], r["filename"], r["recording_date"], r["hour"], r.get("duration_seconds"))
+
+
+def remove(camera_id: uuid.UUID, recording_id: uuid.UUID) -> None:
+    _apply(camera_id, lambda idx: idx.remove(recording_id))
+
+
+def refresh_day(db: Session, camera_id: uuid.UUID, day: date) -> None:
+    """Re-read one camera-day from the database (no-op if not loaded). For changes made by another process."""
+    if not _tracked(camera_id):
+        return
+    rows = (
+        db.query(Recording.id, Recording.filename, Recording.recording_date, Recording.hour, Recording.duration_seconds)
+        .filter(Recording.camera_id == camera_id, Recording.recording_date == day)
+        .all()
+    )
+    recordings = {rid: _spans(*rest) for rid, *rest in rows}
+    _apply(camera_id, lambda idx: idx.replace_day(day, recordings))
+
+
+def drop(camera_id: uuid.UUID | None = None) -> None:
+    """Forget one camera's index (or all); reloaded on next use. For changes made by another process."""
+    with _lock:
+        # A load in flight sees its queue gone and does not install its now stale result
+        if camera_id is None:
+            _indexes.clear()
+            _loading.clear()
+        else:
+            _indexes.pop(camera_id, None)
+            _loading.pop(camera_id, None)
+
+
+def resolve(db: Session, camera_id: uuid.UUID, at: datetime) -> tuple[uuid.UUID, float] | None:
+    """(recording_id, offset_seconds) of the recording covering `at`, or None."""
+    ts = at.timestamp()
+    with _lock:
+        idx = _indexes.get(camera_id)
+        if idx is not None:
+            return idx.find(ts)
+        load_lock = _load_locks.setdefault(camera_id, threading.Lock())
+    # Other cameras keep resolving while this one loads; callers for it wait here
+    with load_lock:
+        with _lock:
+            idx = _indexes.get(camera_id)
+            if idx is not None:
+                return idx.find(ts)
+            queued = _loading[camera_id] = []
+        try:
+            idx = _load(db, camera_id)
+        except Exception:
+            with _lock:
+                if _loading.get(camera_id) is queued:
+                    del _loading[camera_id]
+            raise
+        with _lock:
+            for change in queued:
+                change(idx)
+            if _loading.get(camera_id) is queued:
+                del _loading[camera_id]
+                _indexes[camera_id] = idx
+            return idx.find(ts)
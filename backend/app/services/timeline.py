@@ -0,0 +1,125 @@
+"""Camera timeline — recorded-hour bitmaps and merged event intervals per day.
+
+Built with one recordings query and one events query over the requested range, then
+a single pass. Days that can no longer change are cached in-process.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.event import Event
+from app.models.recording import Recording
+
+settings = get_settings()
+
+MAX_CACHED_DAYS = 4096
+# Events of the same label closer than this are shown as one interval
+MERGE_GAP_SECONDS = 5
+
+_cache: OrderedDict[tuple[uuid.UUID, date], dict] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def invalidate(camera_id: uuid.UUID | None = None, day: date | None = None) -> None:
+    """Drop cached days (all, one camera, or one camera-day) after recordings change."""
+    with _cache_lock:
+        if camera_id is None:
+            _cache.clear()
+            return
+        for key in [k for k in _cache if k[0] == camera_id and (day is None or k[1] == day)]:
+            del _cache[key]
+
+
+def _is_closed(day: date, today: date) -> bool:
+    # Yesterday can still change (simulation target, late Frigate events)
+    return day < today - timedelta(days=1)
+
+
+def _merge(intervals: list[list[int]], start: int, end: int) -> None:
+    """Append [start, end] to a start-sorted interval list, merging with the last one."""
+    if intervals and start <= intervals[-1][1] + MERGE_GAP_SECONDS:
+        intervals[-1][1] = max(intervals[-1][1], end)
+    else:
+        intervals.append([start, end])
+
+
+def _build(db: Session, camera_id: uuid.UUID, days: list[date], tz: ZoneInfo) -> dict[date, dict]:
+    first, last = days[0], days[-1]
+    out = {d: {"date": d, "hours": 0, "events": {}} for d in days}
+
+    for rec_date, hour in (
+        db.query(Recording.recording_date, Recording.hour)
+        .filter(
+            Recording.camera_id == camera_id,
+            Recording.recording_date >= first,
+            Recording.recording_date <= last,
+        )
+        .all()
+    ):
+        if rec_date in out:
+            out[rec_date]["hours"] |= 1 << hour
+
+    range_start = datetime.combine(first, time(), tzinfo=tz)
+    range_end = datetime.combine(last + timedelta(days=1), time(), tzinfo=tz)
+    for label, start, end in (
+        db.query(Event.label, Event.start_time, Event.end_time)
+        .filter(
+            Event.camera_id == camera_id,
+            Event.start_time >= range_start - timedelta(days=1),  # events spilling over midnight
+            Event.start_time < range_end,
+        )
+        .order_by(Event.start_time.asc())
+        .all()
+    ):
+        start = max(start.astimezone(tz), range_start)
+        end = min((end or start).astimezone(tz), range_end)
+        # Split across local midnights so each day holds offsets within [0, 86400]
+        while start <= end and start < range_end:
+            midnight = datetime.combine(start.date(), time(), tzinfo=tz)
+            day_end = min(end, midnight + timedelta(days=1))
+            entry = out.get(start.date())
+            if entry is not None:
+                _merge(
+                    entry["events"].setdefault(label, []),
+                    int((start - midnight).total_seconds()),
+                    int((day_end - midnight).total_seconds()),
+                )
+            if day_end >= end:
+                break
+            start = day_end
+    return out
+
+
+def camera_timeline(db: Session, camera_id: uuid.UUID, from_date: date, to_date: date) -> list[dict]:
+    """Per-day coverage for a camera: hour bitmap (bit h = hour h recorded) + label intervals."""
+    tz = ZoneInfo(settings.tz)
+    today = datetime.now(timezone.utc).astimezone(tz).date()
+    days = [from_date + timedelta(days=i) for i in range((to_date - from_date).days + 1)]
+
+    result: dict[date, dict] = {}
+    with _cache_lock:
+        for d in days:
+            hit = _cache.get((camera_id, d))
+            if hit is not None:
+                _cache.move_to_end((camera_id, d))
+                result[d] = hit
+
+    missing = [d for d in days if d not in result]
+    if missing:
+        built = _build(db, camera_id, missing, tz)
+        with _cache_lock:
+            for d, entry in built.items():
+                if d in missing:
+                    result[d] = entry
+                    if _is_closed(d, today):
+                        _cache[(camera_id, d)] = entry
+            while len(_cache) > MAX_CACHED_DAYS:
+                _cache.popitem(last=False)
+
+    return [result[d] for d in days]
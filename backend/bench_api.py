@@ -0,0 +1,126 @@
+"""Throughput/latency benchmark for hot API endpoints at rising concurrency.
+
+Runs against a live server. While each load runs, a probe requests /api/health
+every 50 ms; its latency shows whether handlers stall the event loop or exhaust the
+threadpool. Save a run with --json and pass it to --compare on the next revision to
+get before/after ratios.
+
+    python bench_api.py --base-url http://localhost:8000 --concurrency 1,16,64,256 --json after.json \\
+        --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from app.config import get_settings
+
+DEFAULT_PATHS = ["/api/events?limit=50", "/api/recordings?limit=200", "/api/cameras"]
+
+
+def _pct(samples: list[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+
+async def _worker(client: httpx.AsyncClient, path: str, deadline: float, lat: list[float], errors: list[int]):
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        try:
+            resp = await client.get(path)
+            ok = resp.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        lat.append(time.monotonic() - start)
+        if not ok:
+            errors[0] += 1
+
+
+async def _probe(client: httpx.AsyncClient, deadline: float, lat: list[float]):
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        try:
+            await client.get("/api/health")
+        except httpx.HTTPError:
+            pass
+        lat.append(time.monotonic() - start)
+        await asyncio.sleep(0.05)
+
+
+async def _run(base_url: str, token: str, path: str, concurrency: int, seconds: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        await client.get(path)  # warm caches and the connection pool
+        lat: list[float] = []
+        probe: list[float] = []
+        errors = [0]
+        deadline = time.monotonic() + seconds
+        started = time.monotonic()
+        await asyncio.gather(
+            _probe(client, deadline, probe),
+            *(_worker(client, path, deadline, lat, errors) for _ in range(concurrency)),
+        )
+        elapsed = time.monotonic() - started
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "requests": len(lat),
+        "errors": errors[0],
+        "rps": round(len(lat) / elapsed, 1),
+        "p50_ms": round(_pct(lat, 0.50), 1),
+        "p99_ms": round(_pct(lat, 0.99), 1),
+        "health_p50_ms": round(statistics.median(probe) * 1000, 1) if probe else None,
+        "health_p99_ms": round(_pct(probe, 0.99), 1),
+    }
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", default=settings.seed_admin_email)
+    parser.add_argument("--password", default=settings.seed_admin_password)
+    parser.add_argument("--path", action="append", help=f"endpoint to load (default: {', '.join(DEFAULT_PATHS)})")
+    parser.add_argument("--concurrency", default="1,16,64,256")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--json", dest="json_out", help="write results here")
+    parser.add_argument("--compare", help="results file of a previous run")
+    args = parser.parse_args()
+
+    login = httpx.post(
+        f"{args.base_url}/api/auth/login", data={"username": args.email, "password": args.password}, timeout=30
+    )
+    login.raise_for_status()
+    token = login.json()["access_token"]
+
+    before = {}
+    if args.compare:
+        with open(args.compare) as f:
+            before = {(r["path"], r["concurrency"]): r for r in json.load(f)}
+
+    results = []
+    print(f"{'path':32} {'conc':>5} {'rps':>8} {'p50':>8} {'p99':>8} {'err':>5} {'health p99':>11} {'vs before':>10}")
+    for path in args.path or DEFAULT_PATHS:
+        for c in (int(x) for x in args.concurrency.split(",")):
+            r = asyncio.run(_run(args.base_url, token, path, c, args.seconds))
+            results.append(r)
+            prev = before.get((path, c))
+            ratio = f"{r['rps'] / prev['rps']:.2f}x" if prev and prev["rps"] else "-"
+            print(
+                f"{path[:32]:32} {c:5} {r['rps']:8} {r['p50_ms']:8} {r['p99_ms']:8} {r['errors']:5} "
+                f"{r['health_p99_ms']:11} {ratio:>10}"
+            )
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
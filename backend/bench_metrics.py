@@ -0,0 +1,108 @@
+"""Overhead of the Prometheus instrumentation (app/core/metrics.py), in process.
+
+Times the same work with and without each hook, alternating, and prints the best
+of --rounds per operation:
+- HTTP: a FastAPI route called directly over ASGI, bare vs. wrapped in MetricsMiddleware;
+- queries: SELECT 1 on SQLite, bare engine vs. instrument()ed engine;
+- pool: connection checkout/checkin, QueuePool vs. TimedQueuePool plus the checkout hooks.
+Run it with and without PROMETHEUS_MULTIPROC_DIR set to see the multiprocess-mode cost.
+
+    python bench_metrics.py --iterations 20000 --rounds 5
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.core import metrics
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id, "name": "x" * 64}
+
+    return app
+
+
+async def _asgi_loop(app, n: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/api/items/7", "raw_path": b"/api/items/7", "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / n
+
+
+def _query_loop(engine, n: int) -> float:
+    stmt = text("SELECT 1")
+    with engine.connect() as conn:
+        for _ in range(200):
+            conn.execute(stmt)
+        started = time.perf_counter()
+        for _ in range(n):
+            conn.execute(stmt)
+        return (time.perf_counter() - started) / n
+
+
+def _checkout_loop(engine, n: int) -> float:
+    for _ in range(200):
+        engine.connect().close()
+    started = time.perf_counter()
+    for _ in range(n):
+        engine.connect().close()
+    return (time.perf_counter() - started) / n
+
+
+def _report(name: str, bare: float, instrumented: float) -> None:
+    delta = instrumented - bare
+    print(f"{name:<10} {bare * 1e6:>9.1f} {instrumented * 1e6:>13.1f} {delta * 1e6:>+9.1f} {delta / bare:>+8.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    n = args.iterations
+
+    print(f"multiprocess={metrics.MULTIPROCESS} iterations={n} rounds={args.rounds}")
+    print(f"{'':<10} {'bare µs':>9} {'measured µs':>13} {'delta µs':>9} {'':>8}")
+
+    app = _app()
+    measured_app = metrics.MetricsMiddleware(app)
+    plain = create_engine("sqlite://", poolclass=QueuePool)
+    timed = create_engine("sqlite://", poolclass=metrics.TimedQueuePool, pool_logging_name="bench")
+    metrics.instrument(timed, "bench")
+    cases = [
+        ("http", lambda: asyncio.run(_asgi_loop(app, n)), lambda: asyncio.run(_asgi_loop(measured_app, n))),
+        ("query", lambda: _query_loop(plain, n), lambda: _query_loop(timed, n)),
+        ("checkout", lambda: _checkout_loop(plain, n), lambda: _checkout_loop(timed, n)),
+    ]
+    for name, run_bare, run_measured in cases:
+        bare = measured = float("inf")
+        for _ in range(args.rounds):
+            bare = min(bare, run_bare())
+            measured = min(measured, run_measured())
+        _report(name, bare, measured)
+
+
+if __name__ == "__main__":
+    main()
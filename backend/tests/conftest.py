@@ -0,0 +1,133 @@
+"""Shared fixtures.
+
+Unit tests need no services. Tests using `client` run the app in-process against a
+disposable database: set TEST_DATABASE_URL to any Postgres database the tests may
+connect to (e.g. postgresql+psycopg://postgres@localhost/postgres); a fresh
+nvr_test_<random> database is created next to it, seeded, and dropped at the end.
+Without TEST_DATABASE_URL those tests are skipped.
+"""
+
+import os
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.engine import make_url
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+_TEST_DB = f"nvr_test_{uuid.uuid4().hex[:8]}"
+
+# Before anything imports app.config: settings and engines are built at import time
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = make_url(TEST_DATABASE_URL).set(database=_TEST_DB).render_as_string(
+        hide_password=False
+    )
+    os.environ["DATABASE_REPLICA_URL"] = ""
+os.environ["QUERY_COUNT_HEADER"] = "true"
+
+ROWS_PER_TABLE = 5
+
+
+def _admin_conn():
+    import psycopg
+
+    url = make_url(TEST_DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+    return psycopg.connect(url, autocommit=True)
+
+
+def _seed_rows() -> None:
+    """A few rows in every listed table, so a per-row query shows up in statement counts."""
+    from app.core import hash_password
+    from app.database import SessionLocal
+    from app.models.camera import Camera
+    from app.models.event import Event
+    from app.models.evidence import EvidenceExport
+    from app.models.recording import Recording
+    from app.models.user import User, UserRole
+    from app.services import audit_sink
+
+    db = SessionLocal()
+    try:
+        admin = db.query(User).first()
+        cameras = db.query(Camera).all()
+        start = datetime.now(timezone.utc) - timedelta(days=1)
+        for i in range(ROWS_PER_TABLE):
+            db.add(User(
+                tenant_id=admin.tenant_id, email=f"viewer{i}@nvr.local", password_hash=hash_password("x"),
+                role=UserRole.READONLY.value, is_active=True,
+            ))
+        for cam in cameras:
+            for hour in range(ROWS_PER_TABLE):
+                db.add(Recording(
+                    camera_id=cam.id, recording_date=date.today(), hour=hour,
+                    filename=f"{date.today().isoformat()}/{cam.frigate_name}_H{hour:02d}.mp4",
+                    duration_seconds=3600.0, size_bytes=1024, status="available",
+                ))
+            for i in range(ROWS_PER_TABLE):
+                event = Event(
+                    site_id=cam.site_id, camera_id=cam.id, frigate_event_id=f"{cam.frigate_name}-{i}",
+                    label="person", start_time=start + timedelta(minutes=i), has_clip=True,
+                )
+                db.add(event)
+                db.flush()
+                db.add(EvidenceExport(
+                    event_id=event.id, requested_by=admin.id, object_store_uri=f"/evidence/{event.id}.mp4",
+                    sha256="0" * 64, size_bytes=1024,
+                ))
+        db.commit()
+        # No writer thread here: the sink writes inline, through the hash chain
+        for i in range(ROWS_PER_TABLE):
+            audit_sink.submit({"action": "seed", "actor_user_id": admin.id, "meta": {"i": i}})
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set")
+    with _admin_conn() as conn:
+        conn.execute(f'CREATE DATABASE "{_TEST_DB}"')
+    try:
+        from app.database import SessionLocal, engine
+        from app.main import Base, _seed_data, ensure_partitions
+
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        try:
+            ensure_partitions(db)
+        finally:
+            db.close()
+        _seed_data()
+        _seed_rows()
+        yield
+    finally:
+        from app.database import async_engine, engine
+
+        engine.dispose()
+        async_engine.sync_engine.dispose()
+        with _admin_conn() as conn:
+            conn.execute(f'DROP DATABASE IF EXISTS "{_TEST_DB}" WITH (FORCE)')
+
+
+@pytest.fixture(scope="session")
+def client(seeded_db):
+    """TestClient without lifespan (no scheduler, listeners or Frigate polling)."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    from app.config import get_settings
+
+    settings = get_settings()
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": settings.seed_admin_email, "password": settings.seed_admin_password},
+    )
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
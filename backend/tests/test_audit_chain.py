@@ -0,0 +1,43 @@
+import hashlib
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.services.audit_chain import GENESIS, entry_hash, merkle_root
+
+
+def _row(seq: int, **overrides) -> dict:
+    row = {
+        "seq": seq, "id": uuid.UUID(int=seq), "created_at": datetime(2026, 10, 1, tzinfo=timezone.utc),
+        "site_id": None, "actor_user_id": None, "action": "login", "resource_type": None,
+        "resource_id": None, "ip": "10.0.0.1", "user_agent": "test", "meta": {"a": 1},
+    }
+    row.update(overrides)
+    return row
+
+
+def _sha(a: str, b: str) -> str:
+    return hashlib.sha256(bytes.fromhex(a) + bytes.fromhex(b)).hexdigest()
+
+
+def test_entry_hash_binds_previous_hash_and_content():
+    h = entry_hash(GENESIS, _row(1))
+    assert h == entry_hash(GENESIS, _row(1))
+    assert h != entry_hash("1" * 64, _row(1))
+    assert h != entry_hash(GENESIS, _row(1, action="logout"))
+    assert h != entry_hash(GENESIS, _row(2))
+
+
+def test_entry_hash_normalizes_timezones():
+    utc = _row(1)
+    local = _row(1, created_at=utc["created_at"].astimezone(timezone(timedelta(hours=-6))))
+    assert entry_hash(GENESIS, utc) == entry_hash(GENESIS, local)
+
+
+def test_merkle_root():
+    a, b, c = (hashlib.sha256(x).hexdigest() for x in (b"a", b"b", b"c"))
+    assert merkle_root([]) == GENESIS
+    assert merkle_root([a]) == a
+    assert merkle_root([a, b]) == _sha(a, b)
+    # Odd levels duplicate their last node
+    assert merkle_root([a, b, c]) == _sha(_sha(a, b), _sha(c, c))
+    assert merkle_root([a, b, c]) != merkle_root([a, c, b])
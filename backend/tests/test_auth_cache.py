@@ -0,0 +1,53 @@
+import pytest
+
+from app.core import auth_cache
+from app.core.auth_cache import _TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(auth_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_get_put_and_expiry(clock):
+    cache = _TTLCache(max_entries=10)
+    cache.put("k", "v", ttl=5)
+    assert cache.get("k") == "v"
+    clock[0] += 5
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_bound(clock):
+    cache = _TTLCache(max_entries=2)
+    cache.put("a", 1, ttl=60)
+    cache.put("b", 2, ttl=60)
+    cache.get("a")
+    cache.put("c", 3, ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_non_positive_ttl_or_size_is_not_stored(clock):
+    cache = _TTLCache(max_entries=10)
+    cache.put("k", "v", ttl=0)
+    assert cache.get("k") is None
+    disabled = _TTLCache(max_entries=0)
+    disabled.put("k", "v", ttl=60)
+    assert disabled.get("k") is None
+
+
+def test_pop_clear_and_stats(clock):
+    cache = _TTLCache(max_entries=10)
+    cache.put("a", 1, ttl=60)
+    cache.put("b", 2, ttl=60)
+    cache.pop("a")
+    cache.pop("missing")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats() == {"entries": 1, "max_entries": 10, "hits": 1, "misses": 1, "hit_rate": 0.5}
+    cache.clear()
+    assert cache.get("b") is None
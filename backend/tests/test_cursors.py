@@ -0,0 +1,30 @@
+import uuid
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import audit, recordings
+
+
+def test_recording_cursor_round_trip():
+    rec = SimpleNamespace(recording_date=date(2026, 10, 19), hour=7, camera_id=uuid.uuid4())
+    cursor = recordings._encode_cursor(rec)
+    assert "=" not in cursor
+    assert recordings._decode_cursor(cursor) == (rec.recording_date, rec.hour, rec.camera_id)
+
+
+def test_audit_cursor_round_trip():
+    row = {"created_at": datetime(2026, 10, 19, 12, 30, 1, 250, tzinfo=timezone.utc), "id": uuid.uuid4()}
+    assert audit._decode_cursor(audit._encode_cursor(row)) == (row["created_at"], row["id"])
+    obj = SimpleNamespace(**row)
+    assert audit._encode_cursor(obj) == audit._encode_cursor(row)
+
+
+@pytest.mark.parametrize("decode", [recordings._decode_cursor, audit._decode_cursor])
+@pytest.mark.parametrize("cursor", ["", "garbage", "Zm9vfGJhcg"])
+def test_invalid_cursor_is_400(decode, cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode(cursor)
+    assert exc.value.status_code == 400
@@ -0,0 +1,23 @@
+from app.config import get_settings
+from app.services.hls import segment_starts
+
+settings = get_settings()
+STEP = settings.hls_segment_seconds
+
+
+def test_nominal_grid_without_keyframes():
+    assert segment_starts(None, STEP * 2.5) == [0.0, STEP, STEP * 2]
+    assert segment_starts([], 1.0) == [0.0]
+
+
+def test_cuts_at_first_keyframe_past_each_multiple():
+    keyframes = [t + 0.5 for t in range(0, 4 * STEP, 4)]  # offset start, 4 s GOP
+    starts = segment_starts(keyframes, 4 * STEP)
+    assert starts[0] == 0.0
+    for n, start in enumerate(starts[1:], 1):
+        assert start >= n * STEP
+        assert start - 4 < n * STEP
+
+
+def test_ignores_keyframes_past_the_duration():
+    assert segment_starts([0.0, STEP, 2 * STEP], STEP + 1) == [0.0, float(STEP)]
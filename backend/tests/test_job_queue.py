@@ -0,0 +1,19 @@
+import pytest
+
+from app.config import get_settings
+from app.services.job_queue import backoff_seconds
+
+settings = get_settings()
+
+
+@pytest.mark.parametrize("attempt", [0, 1, 2, 3, 4])
+def test_backoff_doubles_with_jitter(attempt):
+    base = settings.job_backoff_base_seconds * 2 ** max(0, attempt - 1)
+    for _ in range(50):
+        delay = backoff_seconds(attempt)
+        assert min(settings.job_backoff_max_seconds, 0.8 * base) <= delay
+        assert delay <= min(settings.job_backoff_max_seconds, 1.2 * base)
+
+
+def test_backoff_capped():
+    assert backoff_seconds(100) <= settings.job_backoff_max_seconds
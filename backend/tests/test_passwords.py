@@ -0,0 +1,12 @@
+from app.config import get_settings
+from app.core.passwords import needs_rehash
+
+settings = get_settings()
+
+
+def test_needs_rehash():
+    rounds = settings.bcrypt_rounds
+    assert not needs_rehash(f"$2b${rounds:02d}$" + "x" * 53)
+    assert needs_rehash(f"$2b${rounds + 1:02d}$" + "x" * 53)
+    assert needs_rehash("not-a-bcrypt-hash")
+    assert needs_rehash("")
@@ -0,0 +1,71 @@
+"""SQL statements per request on the read endpoints — catches N+1 regressions.
+
+Each request's statement count (X-Query-Count) must stay within query_budgets.json,
+and a list endpoint's count must not depend on its page size. After an intended
+change, record the new counts with:
+
+    UPDATE_QUERY_BUDGETS=1 TEST_DATABASE_URL=... pytest tests/test_query_budget.py
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+BUDGET_FILE = Path(__file__).with_name("query_budgets.json")
+
+# name -> (path, params)
+ENDPOINTS = {
+    "users": ("/api/users", {"limit": 200}),
+    "cameras": ("/api/cameras", {}),
+    "events": ("/api/events", {"limit": 200}),
+    "recordings": ("/api/recordings", {"limit": 500}),
+    "evidence": ("/api/evidence", {}),
+    "audit": ("/api/audit", {"limit": 1000, "include_archived": False}),
+    "retention_policies": ("/api/retention/policies", {}),
+    "backups": ("/api/backups/runs", {}),
+    "cold_tier": ("/api/recordings/cold-tier", {}),
+}
+# Same endpoint at page size 1 vs. full page: the count must not change
+PAGE_SIZE_INVARIANT = {
+    "users": {"limit": 1},
+    "events": {"limit": 1},
+    "recordings": {"limit": 1},
+    "audit": {"limit": 1, "include_archived": False},
+}
+
+
+def _count(client, headers: dict, path: str, params: dict) -> int:
+    from app.core import auth_cache
+
+    # Cold auth cache: every request pays the same user lookup
+    auth_cache.clear()
+    resp = client.get(path, params=params, headers=headers)
+    assert resp.status_code == 200, f"{path}: HTTP {resp.status_code} {resp.text[:200]}"
+    return int(resp.headers["X-Query-Count"])
+
+
+@pytest.fixture(scope="module")
+def counts(client, admin_headers) -> dict[str, int]:
+    counts = {name: _count(client, admin_headers, path, params) for name, (path, params) in ENDPOINTS.items()}
+    if os.environ.get("UPDATE_QUERY_BUDGETS"):
+        BUDGET_FILE.write_text(json.dumps(counts, indent=2, sort_keys=True) + "\n")
+    return counts
+
+
+@pytest.fixture(scope="module")
+def budgets() -> dict[str, int]:
+    return json.loads(BUDGET_FILE.read_text())
+
+
+@pytest.mark.parametrize("name", sorted(ENDPOINTS))
+def test_within_budget(name, counts, budgets):
+    assert name in budgets, f"no budget for {name}: run with UPDATE_QUERY_BUDGETS=1"
+    assert counts[name] <= budgets[name], f"{name}: {counts[name]} statements, budget {budgets[name]}"
+
+
+@pytest.mark.parametrize("name", sorted(PAGE_SIZE_INVARIANT))
+def test_count_independent_of_page_size(name, counts, client, admin_headers):
+    small = _count(client, admin_headers, ENDPOINTS[name][0], PAGE_SIZE_INVARIANT[name])
+    assert small == counts[name], f"{name}: {small} statements at page size 1, {counts[name]} at full page"
@@ -0,0 +1,99 @@
+import uuid
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.services import seek_index
+from app.services.recording_store import FRIGATE_SEGMENT_SECONDS
+from app.services.seek_index import _CameraIndex, segment_spans
+
+HOUR = 1_000_000.0
+DAY = date(2024, 1, 1)
+
+
+def test_consecutive_segments_form_one_span():
+    assert segment_spans(HOUR, [0, 10, 20]) == [(HOUR, HOUR + 20 + FRIGATE_SEGMENT_SECONDS, 0.0)]
+
+
+def test_gap_splits_spans_and_offsets_count_recorded_time():
+    spans = segment_spans(HOUR, [0, 10, 300, 310])
+    assert spans == [
+        (HOUR, HOUR + 20, 0.0),
+        (HOUR + 300, HOUR + 310 + FRIGATE_SEGMENT_SECONDS, 20.0),
+    ]
+
+
+def test_short_segments_end_at_the_next_start():
+    assert segment_spans(HOUR, [0, 4, 9]) == [(HOUR, HOUR + 9 + FRIGATE_SEGMENT_SECONDS, 0.0)]
+
+
+def test_no_segments():
+    assert segment_spans(HOUR, []) == []
+
+
+def test_find_resolves_offsets_and_gaps():
+    idx = _CameraIndex()
+    frigate, upload = uuid.uuid4(), uuid.uuid4()
+    idx.add(frigate, DAY, segment_spans(HOUR, [0, 10, 300]))
+    idx.add(upload, DAY, [(HOUR + 3600, HOUR + 5400, 0.0)])
+    assert idx.find(HOUR + 5) == (frigate, 5.0)
+    assert idx.find(HOUR + 100) is None
+    assert idx.find(HOUR + 305) == (frigate, pytest.approx(25.0))
+    assert idx.find(HOUR + 3600 + 60) == (upload, 60.0)
+    assert idx.find(HOUR + 5400) is None
+
+
+def test_re_add_and_remove():
+    idx = _CameraIndex()
+    rec = uuid.uuid4()
+    idx.add(rec, DAY, segment_spans(HOUR, [0, 300]))
+    idx.add(rec, DAY, [(HOUR, HOUR + 3600, 0.0)])
+    assert len(idx.entries) == 1
+    assert idx.find(HOUR + 100) == (rec, 100.0)
+    idx.remove(rec)
+    assert idx.entries == [] and idx.starts == [] and idx.positions == {} and idx.days == {}
+
+
+def test_replace_day_keeps_other_days():
+    idx = _CameraIndex()
+    kept, stale, fresh, other = uuid.uuid4(), uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    idx.add(kept, DAY, [(HOUR, HOUR + 100, 0.0)])
+    idx.add(stale, DAY, [(HOUR + 100, HOUR + 200, 0.0)])
+    idx.add(other, date(2024, 1, 2), [(HOUR + 86400, HOUR + 86500, 0.0)])
+    idx.replace_day(DAY, {kept: [(HOUR, HOUR + 150, 0.0)], fresh: [(HOUR + 200, HOUR + 300, 0.0)]})
+    assert idx.find(HOUR + 120) == (kept, 120.0)
+    assert idx.find(HOUR + 250) == (fresh, 50.0)
+    assert idx.find(HOUR + 86450) == (other, 50.0)
+    assert stale not in idx.days and len(idx.entries) == 3
+
+
+def _fake_load(idx, during):
+    def load(db, camera_id):
+        during()
+        return idx
+    return load
+
+
+def test_changes_during_load_are_replayed(monkeypatch):
+    camera, old, new = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    loaded = _CameraIndex()
+    loaded.add(old, DAY, [(HOUR, HOUR + 100, 0.0)])
+
+    def during():
+        seek_index.remove(camera, old)
+        seek_index.add(camera, new, "upload.mp4", DAY, 0, 60.0)
+
+    monkeypatch.setattr(seek_index, "_load", _fake_load(loaded, during))
+    assert seek_index.resolve(None, camera, datetime.fromtimestamp(HOUR + 10, timezone.utc)) is None
+    assert old not in loaded.days and new in loaded.days
+    assert seek_index._indexes[camera] is loaded
+    seek_index.drop(camera)
+
+
+def test_drop_during_load_discards_the_result(monkeypatch):
+    camera, rec = uuid.uuid4(), uuid.uuid4()
+    loaded = _CameraIndex()
+    loaded.add(rec, DAY, [(HOUR, HOUR + 100, 0.0)])
+    monkeypatch.setattr(seek_index, "_load", _fake_load(loaded, lambda: seek_index.drop(camera)))
+    assert seek_index.resolve(None, camera, datetime.fromtimestamp(HOUR + 10, timezone.utc)) == (rec, 10.0)
+    assert camera not in seek_index._indexes and camera not in seek_index._loading
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import auth
+from app.core import throttle
+from app.core.throttle import TokenBucketLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(throttle.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_burst_then_wait(clock):
+    limiter = TokenBucketLimiter(burst=3, per_minute=60)
+    assert [limiter.take("ip") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.take("ip") == pytest.approx(1.0)
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_refills_at_rate(clock):
+    limiter = TokenBucketLimiter(burst=1, per_minute=30)
+    assert limiter.take("ip") == 0.0
+    assert limiter.take("ip") == pytest.approx(2.0)
+    clock[0] += 2.0
+    assert limiter.take("ip") == 0.0
+
+
+def test_refill_capped_at_burst(clock):
+    limiter = TokenBucketLimiter(burst=2, per_minute=60)
+    limiter.take("ip")
+    clock[0] += 3600
+    assert [limiter.take("ip") for _ in range(3)][-1] > 0
+
+
+def test_keys_are_independent(clock):
+    limiter = TokenBucketLimiter(burst=1, per_minute=1)
+    assert limiter.take("a") == 0.0
+    assert limiter.take("b") == 0.0
+    assert limiter.take("a") > 0
+
+
+def test_evicts_least_recent_key(clock):
+    limiter = TokenBucketLimiter(burst=1, per_minute=1, max_keys=2)
+    limiter.take("a")
+    limiter.take("b")
+    limiter.take("c")
+    assert limiter.stats()["keys"] == 2
+    # "a" was forgotten, so it starts with a full bucket again
+    assert limiter.take("a") == 0.0
+
+
+def test_zero_burst_disables(clock):
+    limiter = TokenBucketLimiter(burst=0, per_minute=1)
+    assert all(limiter.take("ip") == 0.0 for _ in range(10))
+
+
+def test_login_throttle_with_zero_rate_sends_finite_retry_after(monkeypatch):
+    monkeypatch.setattr(auth, "_ip_limiter", TokenBucketLimiter(burst=1, per_minute=0))
+    request = SimpleNamespace(client=SimpleNamespace(host="10.0.0.1"))
+    auth._throttle(request, "a@b.c")
+    with pytest.raises(HTTPException) as exc:
+        auth._throttle(request, "a@b.c")
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == str(auth.MAX_RETRY_AFTER_SECONDS)
@@ -0,0 +1,35 @@
+"""Verify the audit_log hash chain; exits 1 and prints the first broken link if tampered.
+
+    python verify_audit.py [--from 2026-01-01] [--to 2026-02-01] [--deep] [--checkpoint]
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+
+from app.database import SessionLocal
+from app.services.audit_chain import build_checkpoints, verify
+
+
+def _dt(value: str) -> datetime:
+    dt = datetime.fromisoformat(value)
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument("--from", dest="from_dt", type=_dt)
+parser.add_argument("--to", dest="to_dt", type=_dt)
+parser.add_argument("--deep", action="store_true", help="rehash every entry instead of block boundaries")
+parser.add_argument("--checkpoint", action="store_true", help="seal complete blocks before verifying")
+args = parser.parse_args()
+
+db = SessionLocal()
+try:
+    if args.checkpoint:
+        print(f"checkpoints built: {build_checkpoints(db)}", file=sys.stderr)
+    report = verify(db, args.from_dt, args.to_dt, deep=args.deep)
+finally:
+    db.close()
+
+print(json.dumps(report, indent=2, default=str))
+sys.exit(0 if report["ok"] else 1)
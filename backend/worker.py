@@ -0,0 +1,56 @@
+"""Background job worker — runs queued jobs outside the API processes.
+
+Claims jobs from the durable queue (app/services/job_queue.py) for the given
+queues, or all queues in JOB_QUEUES. Run as many as needed, on any host: per-queue
+limits hold across all of them. SIGTERM stops claiming and waits for running jobs;
+a worker killed outright has its jobs requeued once their heartbeat goes stale.
+Prometheus metrics (Frigate client, sync, DB) are served on WORKER_METRICS_PORT.
+
+    python worker.py [--queues media,evidence]
+"""
+import argparse
+import signal
+import threading
+
+import structlog
+from prometheus_client import start_http_server
+
+from app.config import get_settings
+from app.core import metrics
+from app.database import engine
+from app.services import audit_sink, job_queue
+
+log = structlog.get_logger()
+settings = get_settings()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queues", help="comma-separated queues to serve (default: all in JOB_QUEUES)")
+    args = parser.parse_args()
+
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        log.info("job_worker_signal", signal=signal.Signals(signum).name)
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    if settings.metrics_enabled:
+        metrics.instrument(engine, "primary")
+        if settings.worker_metrics_port:
+            start_http_server(settings.worker_metrics_port, registry=metrics.registry())
+
+    # Handlers audit (evidence exports) through the same batching sink as the API
+    audit_sink.start()
+    try:
+        queues = [q.strip() for q in args.queues.split(",") if q.strip()] if args.queues else None
+        job_queue.run_worker(queues, stopping)
+    finally:
+        audit_sink.stop()
+
+
+if __name__ == "__main__":
+    main()
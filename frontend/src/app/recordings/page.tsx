@@ -3,7 +3,7 @@
 import { useEffect, useState, useMemo } from 'react';
 import AppLayout from '@/components/AppLayout';
 import SecurityPlayer from '@/components/SecurityPlayer';
-import { getRecordings, simulateRecording, deleteRecording, getCameras, getRecordingPlayUrl } from '@/lib/api';
+import { getRecordings, simulateRecording, getRecordingJob, deleteRecording, getCameras, getRecordingPlayUrl } from '@/lib/api';
 
 interface Recording {
   id: string;
@@ -22,6 +22,7 @@ export default function RecordingsPage() {
   const [cameras, setCameras] = useState<any[]>([]);
   const [loading, setLoading] = useState(true);
   const [simulating, setSimulating] = useState(false);
+  const [simProgress, setSimProgress] = useState('');
   const [filter, setFilter] = useState({ camera_id: '', from_date: '', to_date: '', hour_from: '', hour_to: '' });
   const [playerData, setPlayerData] = useState<{ recordings: Recording[]; cameraName: string; date: string } | null>(null);
   const [expandedGroup, setExpandedGroup] = useState<string | null>(null);
@@ -61,13 +62,20 @@ export default function RecordingsPage() {
     if (!confirm('¿Simular grabación de 24 horas? Esto creará 24 segmentos por hora para cada cámara habilitada (fecha de ayer).')) return;
     setSimulating(true);
     try {
-      const result = await simulateRecording();
-      alert(`✅ Simulación completa: ${result.count} segmentos creados`);
+      let job = await simulateRecording();
+      while (job.status === 'queued' || job.status === 'running') {
+        setSimProgress(`${job.done}/${job.total}`);
+        await new Promise(r => setTimeout(r, 2000));
+        job = await getRecordingJob(job.id);
+      }
+      if (job.status === 'error') throw new Error(job.error || 'job failed');
+      alert(`✅ Simulación completa: ${job.created} segmentos creados`);
       await loadRecordings();
     } catch (e: any) {
       alert('Error al simular: ' + e.message);
     }
     setSimulating(false);
+    setSimProgress('');
   };
 
   const getCameraName = (cameraId: string) => {
@@ -140,7 +148,7 @@ export default function RecordingsPage() {
             disabled={simulating}
             className="px-4 py-2 bg-primary-600 hover:bg-primary-700 disabled:opacity-50 text-white rounded-lg text-sm font-medium transition-colors"
           >
-            {simulating ? '⏳ Simulando 24h...' : '🎬 Simular Día Completo (24h)'}
+            {simulating ? `⏳ Simulando 24h... ${simProgress}` : '🎬 Simular Día Completo (24h)'}
           </button>
         </div>
 
@@ -73,6 +73,14 @@ export function getEvent(id: string) {
   return apiFetch(`/events/${id}`);
 }
 
+export function getEventRecording(eventId: string) {
+  return apiFetch(`/events/${eventId}/recording`);
+}
+
+export function resolveEventRecordings(eventIds: string[]) {
+  return apiFetch('/events/recordings', { method: 'POST', body: JSON.stringify({ event_ids: eventIds }) });
+}
+
 export function syncEvents() {
   return apiFetch('/events/sync', { method: 'POST' });
 }
@@ -90,6 +98,12 @@ export function getCameras() {
   return apiFetch('/cameras');
 }
 
+export function getCameraTimeline(cameraId: string, fromDate: string, toDate?: string) {
+  const params = new URLSearchParams({ from_date: fromDate });
+  if (toDate) params.set('to_date', toDate);
+  return apiFetch(`/cameras/${cameraId}/timeline?${params.toString()}`);
+}
+
 // --- Users ---
 export function getUsers() {
   return apiFetch('/users');
@@ -154,10 +168,34 @@ export function getRecordingPlayUrl(id: string) {
   return `${API_BASE}/recordings/${id}/play${qs}`;
 }
 
+export function getRecordingHlsUrl(id: string) {
+  const token = typeof window !== 'undefined' ? localStorage.getItem('access_token') : null;
+  const qs = token ? `?token=${encodeURIComponent(token)}` : '';
+  return `${API_BASE}/recordings/${id}/hls/index.m3u8${qs}`;
+}
+
+export function getRecordingPreviewUrl(id: string, name: 'poster.jpg' | 'sprite.jpg' | 'thumbs.vtt') {
+  const token = typeof window !== 'undefined' ? localStorage.getItem('access_token') : null;
+  const qs = token ? `?token=${encodeURIComponent(token)}` : '';
+  return `${API_BASE}/recordings/${id}/previews/${name}${qs}`;
+}
+
+export function getCameraHlsUrl(cameraId: string, fromDate: string, toDate?: string) {
+  const token = typeof window !== 'undefined' ? localStorage.getItem('access_token') : null;
+  const params = new URLSearchParams({ from_date: fromDate });
+  if (toDate) params.set('to_date', toDate);
+  if (token) params.set('token', token);
+  return `${API_BASE}/recordings/hls/camera/${cameraId}/index.m3u8?${params.toString()}`;
+}
+
 export function simulateRecording() {
   return apiFetch('/recordings/simulate', { method: 'POST' });
 }
 
+export function getRecordingJob(jobId: string) {
+  return apiFetch(`/recordings/jobs/${jobId}`);
+}
+
 export function deleteRecording(id: string) {
   return apiFetch(`/recordings/${id}`, { method: 'DELETE' });
 }